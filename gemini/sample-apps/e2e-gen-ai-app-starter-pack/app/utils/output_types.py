@@ -12,8 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from concurrent.futures import ThreadPoolExecutor
+import contextvars
 from functools import wraps
+import threading
 from types import GeneratorType
 from typing import Any, AsyncGenerator, Callable, Dict, List, Literal, Union
 import uuid
@@ -86,17 +89,37 @@ class EndEvent(BaseModel):
     event: Literal["end"] = "end"
 
 
+class _ProducerError:
+    """Wraps an exception raised by the wrapped function's generator."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_STREAM_END = object()
+
+
 class CustomChain:
     """A custom chain class that wraps a callable function."""
 
-    def __init__(self, func: Callable):
-        """Initialize the CustomChain with a callable function."""
+    def __init__(self, func: Callable, max_buffered_events: int = 64):
+        """
+        Initialize the CustomChain with a callable function.
+
+        max_buffered_events bounds how many events a stream produces ahead of
+        its consumer before the producer thread blocks.
+        """
         self.func = func
+        self.max_buffered_events = max_buffered_events
 
     async def astream_events(self, *args: Any, **kwargs: Any) -> AsyncGenerator:
         """
         Asynchronously stream events from the wrapped function.
         Applies Traceloop workflow decorator if Traceloop SDK is initialized.
+
+        The synchronous generator runs in a background thread which feeds a
+        bounded asyncio queue, so the event loop keeps serving other streams
+        while this one generates, and a slow consumer applies backpressure.
         """
 
         if hasattr(TracerWrapper, "instance"):
@@ -104,10 +127,45 @@ class CustomChain:
         else:
             func = self.func
 
-        gen: GeneratorType = func(*args, **kwargs)
-
-        for event in gen:
-            yield event.model_dump()
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_buffered_events)
+        stopped = threading.Event()
+
+        def put(item: Any) -> None:
+            # Blocks this thread while the queue is full
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def produce() -> None:
+            try:
+                gen: GeneratorType = func(*args, **kwargs)
+                for event in gen:
+                    if stopped.is_set():
+                        gen.close()
+                        return
+                    put(event.model_dump())
+                put(_STREAM_END)
+            except BaseException as e:  # pylint: disable=broad-exception-caught
+                if not stopped.is_set():
+                    put(_ProducerError(e))
+
+        # A dedicated thread per stream, so streams never wait for a pool slot,
+        # running in a copy of the context to keep the tracing context
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(produce,), daemon=True).start()
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, _ProducerError):
+                    raise item.error
+                yield item
+        finally:
+            # Unblock and stop the producer if the consumer went away early
+            stopped.set()
+            while not queue.empty():
+                queue.get_nowait()
 
     def invoke(self, *args: Any, **kwargs: Any) -> AIMessage:
         """
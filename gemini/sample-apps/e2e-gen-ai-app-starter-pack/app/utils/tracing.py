@@ -12,15 +12,59 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import Future, ThreadPoolExecutor
 import json
 import logging
-from typing import Any, Optional, Sequence
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 from google.cloud import logging as google_cloud_logging
 from google.cloud import storage
 from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
 from opentelemetry.sdk.trace import ReadableSpan
 from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.sdk.util import ns_to_iso_str
+from opentelemetry.trace import SpanContext
+
+# Cloud Logging entries are limited to 256KB, larger attributes go to GCS
+MAX_LOG_PAYLOAD_BYTES = 255 * 1024
+# Cloud Logging write requests are limited to 10MB, keep a margin for metadata
+MAX_LOG_REQUEST_BYTES = 9 * 1024 * 1024
+MAX_LOG_REQUEST_ENTRIES = 1000
+
+
+def _format_time(time_ns: Optional[int]) -> Optional[str]:
+    """Format a timestamp in nanoseconds like ReadableSpan.to_json."""
+    return ns_to_iso_str(time_ns) if time_ns is not None else None
+
+
+def _format_context(context: SpanContext) -> Dict[str, str]:
+    """Format a span context like ReadableSpan.to_json."""
+    return {
+        "trace_id": f"0x{context.trace_id:032x}",
+        "span_id": f"0x{context.span_id:016x}",
+        "trace_state": repr(context.trace_state),
+    }
+
+
+def _format_attributes(attributes: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Copy span attributes, with sequence values as JSON lists."""
+    if not attributes:
+        return {}
+    return {
+        key: list(value) if isinstance(value, tuple) else value
+        for key, value in attributes.items()
+    }
+
+
+class _FlushRequest:
+    """Queue marker set by the worker once every span queued before it is exported."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
 
 
 class CloudTraceLoggingSpanExporter(CloudTraceSpanExporter):
@@ -30,6 +74,12 @@ class CloudTraceLoggingSpanExporter(CloudTraceSpanExporter):
 
     This class helps bypass the 256 character limit of Cloud Trace for attribute values
     by leveraging Cloud Logging (which has a 256KB limit) and Cloud Storage for larger payloads.
+
+    Spans are queued and exported by a background worker, so the caller never waits
+    on Cloud Logging, Cloud Storage or Cloud Trace. The worker writes each batch of
+    log entries in as few requests as the Cloud Logging request limits allow, and
+    uploads large payloads concurrently. When the queue is full, new spans are
+    dropped and counted in dropped_spans.
     """
 
     def __init__(
@@ -38,6 +88,13 @@ class CloudTraceLoggingSpanExporter(CloudTraceSpanExporter):
         storage_client: Optional[storage.Client] = None,
         bucket_name: Optional[str] = None,
         debug: bool = False,
+        max_queue_size: int = 2048,
+        max_export_batch_size: int = 512,
+        schedule_delay_millis: int = 1000,
+        max_upload_workers: int = 8,
+        bucket_check_interval: float = 300.0,
+        max_log_request_bytes: int = MAX_LOG_REQUEST_BYTES,
+        max_log_request_entries: int = MAX_LOG_REQUEST_ENTRIES,
         **kwargs: Any,
     ) -> None:
         """
@@ -47,6 +104,13 @@ class CloudTraceLoggingSpanExporter(CloudTraceSpanExporter):
         :param storage_client: Google Cloud Storage client
         :param bucket_name: Name of the GCS bucket to store large payloads
         :param debug: Enable debug mode for additional logging
+        :param max_queue_size: Maximum number of spans waiting to be exported
+        :param max_export_batch_size: Maximum number of spans exported in one batch
+        :param schedule_delay_millis: Maximum time a span waits for its batch to fill
+        :param max_upload_workers: Maximum number of concurrent GCS uploads
+        :param bucket_check_interval: Seconds before re-checking a missing bucket
+        :param max_log_request_bytes: Maximum serialized size of one logging write
+        :param max_log_request_entries: Maximum number of entries in one logging write
         :param kwargs: Additional arguments to pass to the parent class
         """
         super().__init__(**kwargs)
@@ -58,35 +122,289 @@ class CloudTraceLoggingSpanExporter(CloudTraceSpanExporter):
         self.storage_client = storage_client or storage.Client(project=self.project_id)
         self.bucket_name = bucket_name or f"{self.project_id}-logs-data"
         self.bucket = self.storage_client.bucket(self.bucket_name)
+        self.bucket_check_interval = bucket_check_interval
+        self._bucket_exists: Optional[bool] = None
+        self._bucket_checked_at = 0.0
+        self._bucket_lock = threading.Lock()
+
+        self.max_export_batch_size = max_export_batch_size
+        self.max_log_request_bytes = max_log_request_bytes
+        self.max_log_request_entries = max_log_request_entries
+        self.schedule_delay_millis = schedule_delay_millis
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._upload_pool = ThreadPoolExecutor(
+            max_workers=max_upload_workers, thread_name_prefix="span-upload"
+        )
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._worker_lock = threading.Lock()
+        self._shutdown = threading.Event()
+
+        self._stats_lock = threading.Lock()
+        self.exported_spans = 0
+        self.dropped_spans = 0
+        self.failed_spans = 0
+
+    @property
+    def backlog(self) -> int:
+        """Number of spans queued and not yet exported."""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the exporter counters."""
+        with self._stats_lock:
+            return {
+                "exported_spans": self.exported_spans,
+                "dropped_spans": self.dropped_spans,
+                "failed_spans": self.failed_spans,
+                "backlog": self.backlog,
+            }
 
     def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
         """
-        Export the spans to Google Cloud Logging and Cloud Trace.
+        Queue the spans for export to Google Cloud Logging and Cloud Trace.
 
         :param spans: A sequence of spans to export
         :return: The result of the export operation
         """
+        if self._shutdown.is_set():
+            return SpanExportResult.FAILURE
+        self._ensure_worker()
+
+        dropped = 0
         for span in spans:
-            span_context = span.get_span_context()
-            trace_id = format(span_context.trace_id, "x")
-            span_id = format(span_context.span_id, "x")
-            span_dict = json.loads(span.to_json())
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                dropped += 1
+        if dropped:
+            with self._stats_lock:
+                if not self.dropped_spans:
+                    logging.warning("Span export queue is full, dropping spans.")
+                self.dropped_spans += dropped
+        return SpanExportResult.SUCCESS
 
-            span_dict["trace"] = f"projects/{self.project_id}/traces/{trace_id}"
-            span_dict["span_id"] = span_id
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """
+        Wait until every span queued so far has been exported.
 
-            span_dict = self._process_large_attributes(
-                span_dict=span_dict, span_id=span_id
+        :param timeout_millis: Maximum time to wait
+        :return: Whether the queued spans were exported in time
+        """
+        if self._worker is None or not self._worker.is_alive():
+            return self._queue.empty()
+        deadline = time.monotonic() + timeout_millis / 1000
+        flush_request = _FlushRequest()
+        try:
+            self._queue.put(flush_request, timeout=timeout_millis / 1000)
+        except queue.Full:
+            return False
+        return flush_request.done.wait(max(deadline - time.monotonic(), 0))
+
+    def shutdown(self) -> None:
+        """Export the queued spans, then stop the worker and the parent exporter."""
+        if self._shutdown.is_set():
+            return
+        self.force_flush()
+        self._shutdown.set()
+        if self._worker is not None:
+            self._worker.join()
+        self._upload_pool.shutdown()
+        super().shutdown()
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread, again in a forked child process."""
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+        with self._worker_lock:
+            if self._worker_pid != pid:
+                self._worker = threading.Thread(
+                    target=self._run_worker, name="span-exporter", daemon=True
+                )
+                self._worker.start()
+                self._worker_pid = pid
+
+    def _run_worker(self) -> None:
+        """Export batches of queued spans until shutdown."""
+        timeout = self.schedule_delay_millis / 1000
+        while not (self._shutdown.is_set() and self._queue.empty()):
+            batch: List[ReadableSpan] = []
+            flush_requests: List[_FlushRequest] = []
+            deadline = time.monotonic() + timeout
+            while len(batch) < self.max_export_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if isinstance(item, _FlushRequest):
+                    flush_requests.append(item)
+                    break
+                batch.append(item)
+
+            if batch:
+                self._export_batch(batch)
+            for flush_request in flush_requests:
+                flush_request.done.set()
+
+    def _export_batch(self, spans: List[ReadableSpan]) -> None:
+        """
+        Export a batch of spans to Google Cloud Logging and Cloud Trace.
+
+        :param spans: The spans to export
+        """
+        failed = 0
+        try:
+            span_dicts: List[Union[Tuple[dict, int], Future]] = []
+            for span in spans:
+                span_dict = self._to_span_dict(span)
+                size = len(json.dumps(span_dict).encode())
+                if size > MAX_LOG_PAYLOAD_BYTES:
+                    span_dicts.append(
+                        self._upload_pool.submit(
+                            self._process_large_span, span_dict=span_dict
+                        )
+                    )
+                else:
+                    span_dicts.append((span_dict, size))
+
+            failed = self._log_span_dicts(
+                [
+                    item if isinstance(item, tuple) else item.result()
+                    for item in span_dicts
+                ]
             )
 
-            if self.debug:
-                print(span_dict)
+            # Export spans to Google Cloud Trace using the parent class method
+            if super().export(spans) != SpanExportResult.SUCCESS:
+                failed = len(spans)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.error("Failed to export %d spans: %s", len(spans), e)
+            failed = len(spans)
+
+        with self._stats_lock:
+            self.exported_spans += len(spans) - failed
+            self.failed_spans += failed
 
-            # Log the span data to Google Cloud Logging
-            self.logger.log_struct(span_dict, severity="INFO")
+    def _log_span_dicts(self, span_dicts: List[Tuple[dict, int]]) -> int:
+        """
+        Log span dictionaries to Google Cloud Logging, in as few requests as the
+        request size and entry count limits allow.
+
+        :param span_dicts: The span dictionaries with their serialized sizes
+        :return: The number of spans which could not be logged
+        """
+        chunks: List[List[dict]] = []
+        chunk_bytes = 0
+        for span_dict, size in span_dicts:
+            if (
+                not chunks
+                or len(chunks[-1]) >= self.max_log_request_entries
+                or chunk_bytes + size > self.max_log_request_bytes
+            ):
+                chunks.append([])
+                chunk_bytes = 0
+            chunks[-1].append(span_dict)
+            chunk_bytes += size
 
-        # Export spans to Google Cloud Trace using the parent class method
-        return super().export(spans)
+        failed = 0
+        for chunk in chunks:
+            log_batch = self.logger.batch()
+            for span_dict in chunk:
+                if self.debug:
+                    print(span_dict)
+                log_batch.log_struct(span_dict, severity="INFO")
+            try:
+                log_batch.commit()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logging.error("Failed to log %d spans: %s", len(chunk), e)
+                failed += len(chunk)
+        return failed
+
+    def _process_large_span(self, span_dict: dict) -> Tuple[dict, int]:
+        """
+        Move the attributes of a span too large to log to GCS.
+
+        :param span_dict: The span data dictionary
+        :return: The updated span dictionary and its serialized size
+        """
+        span_dict = self._process_large_attributes(
+            span_dict=span_dict, span_id=span_dict["span_id"]
+        )
+        return span_dict, len(json.dumps(span_dict).encode())
+
+    def _to_span_dict(self, span: ReadableSpan) -> dict:
+        """
+        Convert a span to the dictionary logged to Google Cloud Logging.
+
+        The dictionary has the fields of ReadableSpan.to_json, built directly
+        from the span rather than by serializing and parsing it again.
+
+        :param span: The span to convert
+        :return: The span dictionary
+        """
+        span_context = span.get_span_context()
+        trace_id = format(span_context.trace_id, "x")
+        span_id = format(span_context.span_id, "x")
+
+        span_dict: Dict[str, Any] = {
+            "name": span.name,
+            "context": _format_context(span_context),
+            "kind": str(span.kind),
+            "parent_id": (
+                f"0x{span.parent.span_id:016x}" if span.parent is not None else None
+            ),
+            "start_time": _format_time(span.start_time),
+            "end_time": _format_time(span.end_time),
+            "status": {"status_code": span.status.status_code.name},
+            "attributes": _format_attributes(span.attributes),
+            "events": [
+                {
+                    "name": event.name,
+                    "timestamp": _format_time(event.timestamp),
+                    "attributes": _format_attributes(event.attributes),
+                }
+                for event in span.events
+            ],
+            "links": [
+                {
+                    "context": _format_context(link.context),
+                    "attributes": _format_attributes(link.attributes),
+                }
+                for link in span.links
+            ],
+            "resource": {
+                "attributes": _format_attributes(span.resource.attributes),
+                "schema_url": span.resource.schema_url,
+            },
+        }
+        if span.status.description is not None:
+            span_dict["status"]["description"] = span.status.description
+
+        span_dict["trace"] = f"projects/{self.project_id}/traces/{trace_id}"
+        span_dict["span_id"] = span_id
+        return span_dict
+
+    def _bucket_available(self) -> bool:
+        """
+        Check whether the GCS bucket exists, caching the answer.
+
+        A missing bucket is checked again after bucket_check_interval seconds.
+        """
+        with self._bucket_lock:
+            now = time.monotonic()
+            if self._bucket_exists is None or (
+                not self._bucket_exists
+                and now - self._bucket_checked_at > self.bucket_check_interval
+            ):
+                self._bucket_exists = bool(self.bucket.exists())
+                self._bucket_checked_at = now
+            return self._bucket_exists
 
     def store_in_gcs(self, content: str, span_id: str) -> str:
         """
@@ -96,7 +414,7 @@ class CloudTraceLoggingSpanExporter(CloudTraceSpanExporter):
         :param span_id: The ID of the span
         :return: The  GCS URI of the stored content
         """
-        if not self.storage_client.bucket(self.bucket_name).exists():
+        if not self._bucket_available():
             logging.warning(
                 f"Bucket {self.bucket_name} not found. "
                 "Unable to store span attributes in GCS."
@@ -120,7 +438,7 @@ class CloudTraceLoggingSpanExporter(CloudTraceSpanExporter):
         :return: The updated span dictionary
         """
         attributes = span_dict["attributes"]
-        if len(json.dumps(attributes).encode()) > 255 * 1024:  # 250 KB
+        if len(json.dumps(attributes).encode()) > MAX_LOG_PAYLOAD_BYTES:
             # Separate large payload from other attributes
             attributes_payload = {
                 k: v
@@ -0,0 +1,214 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Throughput benchmark of CloudTraceLoggingSpanExporter against an in-memory sink.
+
+The Cloud Logging, Cloud Storage and Cloud Trace clients are replaced by
+in-memory fakes which sleep for a fixed latency per request. The benchmark
+compares exporting every span inline, one request per span as on the request
+path, with the background pipeline which queues spans and exports them in
+batches. It reports the time spent by the caller per export call, the total
+throughput and the exporter counters.
+
+Usage:
+    poetry run python tests/load_test/span_exporter_benchmark.py
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from typing import Any, Dict, List
+
+from app.utils.tracing import CloudTraceLoggingSpanExporter
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.trace import SpanContext, TraceFlags
+
+
+class InMemorySink:
+    """Counts the requests and entries received by the fake clients."""
+
+    def __init__(self, request_latency: float) -> None:
+        self.request_latency = request_latency
+        self.requests: Dict[str, int] = {}
+        self.entries = 0
+        self._lock = threading.Lock()
+
+    def request(self, name: str, entries: int = 0) -> None:
+        time.sleep(self.request_latency)
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+            self.entries += entries
+
+
+class FakeLogBatch:
+    def __init__(self, sink: InMemorySink) -> None:
+        self.sink = sink
+        self.entries: List[dict] = []
+
+    def log_struct(self, info: dict, **kwargs: Any) -> None:
+        self.entries.append(info)
+
+    def commit(self) -> None:
+        if self.entries:
+            self.sink.request("logging.write", len(self.entries))
+
+
+class FakeLogger:
+    def __init__(self, sink: InMemorySink) -> None:
+        self.sink = sink
+
+    def log_struct(self, info: dict, **kwargs: Any) -> None:
+        self.sink.request("logging.write", 1)
+
+    def batch(self) -> FakeLogBatch:
+        return FakeLogBatch(self.sink)
+
+
+class FakeLoggingClient:
+    def __init__(self, sink: InMemorySink) -> None:
+        self.sink = sink
+
+    def logger(self, name: str) -> FakeLogger:
+        return FakeLogger(self.sink)
+
+
+class FakeBlob:
+    def __init__(self, sink: InMemorySink) -> None:
+        self.sink = sink
+
+    def upload_from_string(self, content: str, content_type: str) -> None:
+        self.sink.request("storage.upload")
+
+
+class FakeBucket:
+    def __init__(self, sink: InMemorySink) -> None:
+        self.sink = sink
+
+    def exists(self) -> bool:
+        self.sink.request("storage.exists")
+        return True
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self.sink)
+
+
+class FakeStorageClient:
+    def __init__(self, sink: InMemorySink) -> None:
+        self.sink = sink
+
+    def bucket(self, name: str) -> FakeBucket:
+        return FakeBucket(self.sink)
+
+
+class FakeTraceClient:
+    def __init__(self, sink: InMemorySink) -> None:
+        self.sink = sink
+
+    def batch_write_spans(self, **kwargs: Any) -> None:
+        self.sink.request("trace.batch_write_spans")
+
+
+def make_spans(
+    count: int, attribute_bytes: int, large_every: int
+) -> List[ReadableSpan]:
+    """Create spans with one text attribute, every large_every-th one above 256KB."""
+    spans = []
+    for i in range(count):
+        size = 300 * 1024 if large_every and i % large_every == 0 else attribute_bytes
+        context = SpanContext(
+            trace_id=i + 1,
+            span_id=i + 1,
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+        )
+        spans.append(
+            ReadableSpan(
+                name="llm.completion",
+                context=context,
+                attributes={
+                    "gen_ai.prompt.0.content": "a" * size,
+                    "traceloop.association.properties.session_id": "session",
+                },
+                start_time=time.time_ns(),
+                end_time=time.time_ns(),
+            )
+        )
+    return spans
+
+
+def make_exporter(
+    sink: InMemorySink, args: argparse.Namespace
+) -> CloudTraceLoggingSpanExporter:
+    return CloudTraceLoggingSpanExporter(
+        project_id="benchmark-project",
+        client=FakeTraceClient(sink),
+        logging_client=FakeLoggingClient(sink),
+        storage_client=FakeStorageClient(sink),
+        bucket_name="benchmark-bucket",
+        max_queue_size=args.max_queue_size,
+        max_export_batch_size=args.max_export_batch_size,
+    )
+
+
+def run(mode: str, spans: List[ReadableSpan], args: argparse.Namespace) -> None:
+    sink = InMemorySink(args.request_latency)
+    exporter = make_exporter(sink, args)
+    call_times = []
+
+    start = time.perf_counter()
+    for span in spans:
+        call_start = time.perf_counter()
+        if mode == "inline":
+            exporter._export_batch([span])  # pylint: disable=protected-access
+            # Checking the bucket for every large span, as before caching
+            exporter._bucket_exists = None  # pylint: disable=protected-access
+        else:
+            exporter.export([span])
+        call_times.append(time.perf_counter() - call_start)
+    exporter.force_flush()
+    total = time.perf_counter() - start
+    stats = exporter.stats()
+    exporter.shutdown()
+
+    call_times.sort()
+    p99 = call_times[int(len(call_times) * 0.99) - 1]
+    print(
+        f"{mode:<12}{len(spans) / total:>12.0f}"
+        f"{statistics.median(call_times) * 1e6:>14.1f}{p99 * 1e6:>14.1f}"
+        f"{sum(sink.requests.values()):>10}{stats['dropped_spans']:>9}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--spans", type=int, default=2000)
+    parser.add_argument("--attribute-bytes", type=int, default=2048)
+    parser.add_argument("--large-every", type=int, default=100)
+    parser.add_argument("--request-latency", type=float, default=0.005)
+    parser.add_argument("--max-queue-size", type=int, default=4096)
+    parser.add_argument("--max-export-batch-size", type=int, default=512)
+    args = parser.parse_args()
+
+    spans = make_spans(args.spans, args.attribute_bytes, args.large_every)
+    print(
+        f"{'mode':<12}{'spans/s':>12}{'call p50 (us)':>14}"
+        f"{'call p99 (us)':>14}{'requests':>10}{'dropped':>9}"
+    )
+    for mode in ("inline", "background"):
+        run(mode, spans, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of concurrent CustomChain.astream_events streams on one event loop.
+
+A fake LLM blocks for a fixed latency before each token, like a synchronous
+SDK call. For each concurrency level the benchmark reports the median and
+worst time-to-first-event and the total wall time, for the background
+producer used by CustomChain and for iterating the generator inline on the
+event loop, which is what astream_events did before.
+
+Usage:
+    poetry run python tests/load_test/stream_concurrency_benchmark.py
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, List
+
+from app.utils.output_types import (
+    ChatModelStreamData,
+    CustomChain,
+    OnChatModelStreamEvent,
+    custom_chain,
+)
+from langchain_core.messages import AIMessageChunk
+
+
+def make_fake_llm(
+    first_token_latency: float, token_latency: float, num_tokens: int
+) -> CustomChain:
+    """Returns a chain streaming num_tokens tokens from a blocking fake LLM."""
+
+    @custom_chain
+    def fake_llm(message: str) -> Generator[OnChatModelStreamEvent, None, None]:
+        time.sleep(first_token_latency)
+        for i in range(num_tokens):
+            if i:
+                time.sleep(token_latency)
+            yield OnChatModelStreamEvent(
+                data=ChatModelStreamData(chunk=AIMessageChunk(content=f"{message} "))
+            )
+
+    return fake_llm
+
+
+async def inline_astream_events(
+    chain: CustomChain, *args: Any
+) -> AsyncGenerator[Dict, None]:
+    """Iterates the generator on the event loop, blocking it for every token."""
+    for event in chain.func(*args):
+        yield event.model_dump()
+
+
+async def consume(stream: AsyncGenerator[Dict, None], start: float) -> float:
+    """Drains a stream and returns its time-to-first-event in seconds from start."""
+    first_event_at = None
+    async for _ in stream:
+        if first_event_at is None:
+            first_event_at = time.perf_counter() - start
+    return first_event_at if first_event_at is not None else float("nan")
+
+
+async def run_level(
+    open_stream: Callable[[], AsyncGenerator[Dict, None]], concurrency: int
+) -> Dict[str, float]:
+    # All streams are measured from one start, so time spent waiting for the
+    # event loop before a stream is first iterated counts towards its TTFE
+    start = time.perf_counter()
+    ttfe: List[float] = await asyncio.gather(
+        *(consume(open_stream(), start) for _ in range(concurrency))
+    )
+    return {
+        "ttfe_p50": statistics.median(ttfe),
+        "ttfe_max": max(ttfe),
+        "total": time.perf_counter() - start,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    chain = make_fake_llm(args.first_token_latency, args.token_latency, args.tokens)
+    modes = {
+        "inline": lambda: inline_astream_events(chain, "hello"),
+        "background": lambda: chain.astream_events("hello"),
+    }
+
+    print(
+        f"{'mode':<12}{'streams':>8}{'ttfe p50 (s)':>14}"
+        f"{'ttfe max (s)':>14}{'total (s)':>12}"
+    )
+    for concurrency in args.concurrency:
+        for mode, open_stream in modes.items():
+            result = await run_level(open_stream, concurrency)
+            print(
+                f"{mode:<12}{concurrency:>8}{result['ttfe_p50']:>14.3f}"
+                f"{result['ttfe_max']:>14.3f}{result['total']:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--first-token-latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
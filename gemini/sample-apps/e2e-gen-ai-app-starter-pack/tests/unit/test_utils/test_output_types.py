@@ -0,0 +1,97 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Generator
+
+from app.utils.output_types import CustomChain, custom_chain
+import pytest
+
+
+class FakeEvent:
+    """Minimal event exposing model_dump like the pydantic events."""
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def model_dump(self) -> Dict[str, Any]:
+        return {"event": "on_chat_model_stream", "index": self.index}
+
+
+@custom_chain
+def slow_chain(num_events: int, delay: float) -> Generator[FakeEvent, None, None]:
+    """Blocking generator simulating a synchronous LLM SDK."""
+    for i in range(num_events):
+        time.sleep(delay)
+        yield FakeEvent(i)
+
+
+async def collect(chain: CustomChain, *args: Any) -> list:
+    return [event async for event in chain.astream_events(*args)]
+
+
+@pytest.mark.asyncio
+async def test_astream_events_yields_all_events_in_order() -> None:
+    """Test that the async bridge yields every event in order."""
+    events = await collect(slow_chain, 5, 0)
+    assert [event["index"] for event in events] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_astream_events_streams_concurrently() -> None:
+    """Test that concurrent streams do not block each other."""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(collect(slow_chain, 5, 0.05) for _ in range(10)))
+    elapsed = time.perf_counter() - start
+
+    assert all(len(events) == 5 for events in results)
+    # Serially, 10 streams of 5 events of 50ms would take 2.5s
+    assert elapsed < 1.5
+
+
+@pytest.mark.asyncio
+async def test_astream_events_propagates_errors() -> None:
+    """Test that errors raised by the wrapped function reach the consumer."""
+
+    @custom_chain
+    def failing_chain() -> Generator[FakeEvent, None, None]:
+        yield FakeEvent(0)
+        raise RuntimeError("LLM failure")
+
+    events = []
+    with pytest.raises(RuntimeError, match="LLM failure"):
+        async for event in failing_chain.astream_events():
+            events.append(event)
+    assert len(events) == 1
+
+
+@pytest.mark.asyncio
+async def test_astream_events_stops_producer_on_early_exit() -> None:
+    """Test that closing the stream early stops the producer thread."""
+    threads_before = threading.active_count()
+    chain = CustomChain(slow_chain.func, max_buffered_events=2)
+
+    stream = chain.astream_events(1000, 0.001)
+    async for event in stream:
+        if event["index"] == 3:
+            break
+    await stream.aclose()
+
+    for _ in range(100):
+        if threading.active_count() <= threads_before:
+            break
+        await asyncio.sleep(0.01)
+    assert threading.active_count() <= threads_before
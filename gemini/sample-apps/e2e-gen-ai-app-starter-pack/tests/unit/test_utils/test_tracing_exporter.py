@@ -13,13 +13,18 @@
 # limitations under the License.
 # pylint: disable=W0621, W0613, W0212
 
-from typing import Any, Generator
+import json
+import queue
+from typing import Any, Dict, Generator, List
 from unittest.mock import Mock, patch
 
 from app.utils.tracing import CloudTraceLoggingSpanExporter
 from google.cloud import logging as google_cloud_logging
 from google.cloud import storage
+from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
 from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.trace import SpanContext
 import pytest
 
 
@@ -75,6 +80,8 @@ def exporter(
         storage_client=mock_storage_client,
         bucket_name="test-bucket",
     )
+    # Keep the spans exported to Cloud Trace in memory
+    exporter.client = Mock()
     return exporter
 
 
@@ -124,19 +131,133 @@ def test_process_large_attributes_large_payload(
     assert "traceloop.association.properties.key2" in result["attributes"]
 
 
+def make_span(attributes: Dict[str, Any], span_id: int = 456) -> ReadableSpan:
+    """Create a finished span with the given attributes."""
+    return ReadableSpan(
+        name="test-span",
+        context=SpanContext(trace_id=123, span_id=span_id, is_remote=False),
+        attributes=attributes,
+        start_time=1_000_000_000,
+        end_time=2_000_000_000,
+    )
+
+
+def test_store_in_gcs_caches_bucket_check(
+    exporter: CloudTraceLoggingSpanExporter,
+) -> None:
+    """Test that the bucket existence is only checked once."""
+    exporter.store_in_gcs("content-1", "span-1")
+    exporter.store_in_gcs("content-2", "span-2")
+    exporter.bucket.exists.assert_called_once()
+
+
 @patch.object(CloudTraceLoggingSpanExporter, "_process_large_attributes")
 def test_export(
     mock_process_large_attributes: Mock, exporter: CloudTraceLoggingSpanExporter
 ) -> None:
     """Test the export method of CloudTraceLoggingSpanExporter."""
-    mock_span = Mock(spec=ReadableSpan)
-    mock_span.get_span_context.return_value.trace_id = 123
-    mock_span.get_span_context.return_value.span_id = 456
-    mock_span.to_json.return_value = '{"key": "value"}'
+    span = make_span({"key": "a" * (256 * 1024)})
 
     mock_process_large_attributes.return_value = {"processed": "data"}
 
-    exporter.export([mock_span])
+    exporter.export([span])
+    assert exporter.force_flush()
 
     mock_process_large_attributes.assert_called_once()
-    exporter.logger.log_struct.assert_called_once()
+    log_batch = exporter.logger.batch.return_value
+    log_batch.log_struct.assert_called_once_with({"processed": "data"}, severity="INFO")
+    log_batch.commit.assert_called_once()
+
+
+@patch.object(CloudTraceLoggingSpanExporter, "_process_large_attributes")
+def test_export_small_span(
+    mock_process_large_attributes: Mock, exporter: CloudTraceLoggingSpanExporter
+) -> None:
+    """Test that small spans are logged without processing their attributes."""
+    exporter.export([make_span({"key": "value", "tags": ("a", "b")})])
+    assert exporter.force_flush()
+
+    mock_process_large_attributes.assert_not_called()
+    log_batch = exporter.logger.batch.return_value
+    log_batch.log_struct.assert_called_once()
+    span_dict = log_batch.log_struct.call_args.args[0]
+    assert span_dict["name"] == "test-span"
+    assert span_dict["attributes"] == {"key": "value", "tags": ["a", "b"]}
+    assert span_dict["context"]["span_id"] == "0x00000000000001c8"
+    assert span_dict["trace"] == "projects/test-project/traces/7b"
+    assert span_dict["span_id"] == "1c8"
+    json.dumps(span_dict)
+
+
+def test_export_coalesces_log_writes(exporter: CloudTraceLoggingSpanExporter) -> None:
+    """Test that a batch of spans is logged in a single write."""
+    exporter.export([make_span({"key": "value"}, span_id=i + 1) for i in range(10)])
+    assert exporter.force_flush()
+
+    exporter.logger.batch.assert_called_once()
+    log_batch = exporter.logger.batch.return_value
+    assert log_batch.log_struct.call_count == 10
+    log_batch.commit.assert_called_once()
+    assert exporter.backlog == 0
+
+
+def test_export_splits_log_writes_by_size(
+    exporter: CloudTraceLoggingSpanExporter,
+) -> None:
+    """Test that near-limit spans are logged in writes below the request size limit."""
+    exporter.max_log_request_bytes = 1024 * 1024
+    log_batches: List[Mock] = []
+
+    def new_log_batch() -> Mock:
+        log_batch = Mock()
+        log_batch.entries = []
+        log_batch.log_struct.side_effect = lambda entry, **_: log_batch.entries.append(
+            entry
+        )
+        log_batches.append(log_batch)
+        return log_batch
+
+    exporter.logger.batch.side_effect = new_log_batch
+
+    spans = [make_span({"key": "a" * (250 * 1024)}, span_id=i + 1) for i in range(10)]
+    exporter.export(spans)
+    assert exporter.force_flush()
+
+    assert len(log_batches) == 3
+    assert sum(len(log_batch.entries) for log_batch in log_batches) == 10
+    for log_batch in log_batches:
+        log_batch.commit.assert_called_once()
+        assert len(json.dumps(log_batch.entries).encode()) <= 1024 * 1024
+
+
+def test_export_counts_failed_log_writes(
+    exporter: CloudTraceLoggingSpanExporter,
+) -> None:
+    """Test that only the spans of a rejected write are counted as failed."""
+    exporter.max_log_request_entries = 2
+    log_batches = [Mock(), Mock()]
+    log_batches[0].commit.side_effect = RuntimeError("request too large")
+    exporter.logger.batch.side_effect = log_batches
+
+    with patch.object(
+        CloudTraceSpanExporter, "export", return_value=SpanExportResult.SUCCESS
+    ):
+        exporter.export([make_span({"key": "value"}, span_id=i + 1) for i in range(4)])
+        assert exporter.force_flush()
+
+    stats = exporter.stats()
+    assert stats["failed_spans"] == 2
+    assert stats["exported_spans"] == 2
+
+
+def test_export_drops_spans_when_queue_full(
+    exporter: CloudTraceLoggingSpanExporter,
+) -> None:
+    """Test that spans beyond the queue size are dropped and counted."""
+    exporter._queue = queue.Queue(maxsize=2)
+    with patch.object(exporter, "_ensure_worker"):
+        exporter.export([make_span({"key": "value"}) for _ in range(5)])
+
+    stats = exporter.stats()
+    assert stats["dropped_spans"] == 3
+    assert stats["backlog"] == 2
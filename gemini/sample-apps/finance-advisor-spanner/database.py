@@ -1,11 +1,16 @@
 """This file is for database operations done by the application"""
 
 # pylint: disable=line-too-long
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import os
 
 from dotenv import load_dotenv
 from google.api_core.client_options import ClientOptions
 from google.cloud import spanner
+from google.cloud.spanner_v1.snapshot import Snapshot
+from google.cloud.spanner_v1.streamed import StreamedResultSet
 import pandas as pd
 import streamlit as st
 from streamlit_extras.stylable_container import stylable_container
@@ -15,6 +20,13 @@ load_dotenv()
 instance_id = os.getenv("instance_id")
 database_id = os.getenv("database_id")
 api_endpoint = os.getenv("api_endpoint")
+# Result and embedding caches, shared by all Streamlit sessions of the server
+query_cache_ttl_seconds = int(os.getenv("query_cache_ttl_seconds", "300"))
+query_cache_max_entries = int(os.getenv("query_cache_max_entries", "256"))
+embedding_cache_max_entries = int(os.getenv("embedding_cache_max_entries", "1024"))
+# Rows per page of the interactive tables, and optional cap on the graph edges
+table_page_size = int(os.getenv("table_page_size", "100"))
+graph_max_edges = int(os.getenv("graph_max_edges", "0"))
 
 options = ClientOptions(api_endpoint=api_endpoint)
 spanner_client = spanner.Client(client_options=options)
@@ -23,67 +35,214 @@ instance = spanner_client.instance(instance_id)
 database = instance.database(database_id)
 
 
-def spanner_read_data(query: str, *vector_input: list) -> pd.DataFrame:
-    """This function helps read data from Spanner"""
+# Spanner types of the query parameters used by the search queries
+QUERY_PARAM_TYPES = {
+    "strategy": spanner.param_types.STRING,
+    "second_strategy": spanner.param_types.STRING,
+    "manager": spanner.param_types.STRING,
+    "content": spanner.param_types.STRING,
+    "sector": spanner.param_types.STRING,
+    "threshold": spanner.param_types.FLOAT64,
+    "vector": spanner.param_types.Array(spanner.param_types.FLOAT64),
+    "page_limit": spanner.param_types.INT64,
+    "page_offset": spanner.param_types.INT64,
+}
+
+# One fixed SQL text per search mode, so Spanner can reuse the query plans
+FTS_QUERY = "SELECT DISTINCT fund_name,investment_strategy,investment_managers,fund_trailing_return_ytd,top5_holdings FROM EU_MutualFunds WHERE SEARCH(investment_strategy_Tokens, @strategy) order by fund_name;"
+
+FTS_MANAGER_QUERY = "SELECT DISTINCT fund_name, manager, strategy, score FROM (SELECT fund_name , investment_managers AS manager, investment_strategy as strategy, SCORE_NGRAMS(investment_managers_Substring_Tokens_NGRAM, @manager) AS score FROM EU_MutualFunds WHERE SEARCH_NGRAMS(investment_managers_Substring_Tokens_NGRAM, @manager, min_ngrams=>1) AND SEARCH(investment_strategy_Tokens, @strategy) ) ORDER BY score DESC, fund_name;"
+
+SEMANTIC_QUERY = "SELECT fund_name, investment_strategy,investment_managers, COSINE_DISTANCE( investment_strategy_Embedding, (SELECT embeddings. VALUES FROM ML.PREDICT( MODEL EmbeddingsModel, (SELECT @strategy AS content) ) ) ) AS distance FROM EU_MutualFunds WHERE investment_strategy_Embedding is not NULL  ORDER BY distance LIMIT 10;"
+
+SEMANTIC_MANAGER_QUERY = "SELECT fund_name, investment_strategy,investment_managers, COSINE_DISTANCE( investment_strategy_Embedding, (SELECT embeddings. VALUES FROM ML.PREDICT( MODEL EmbeddingsModel, (SELECT @strategy AS content) ) ) ) AS distance FROM EU_MutualFunds WHERE investment_strategy_Embedding is not NULL  AND  search_substring(investment_managers_substring_tokens, @manager)ORDER BY distance LIMIT 10;"
+
+EMBEDDING_QUERY = "SELECT embeddings. VALUES as vector FROM ML.PREDICT( MODEL EmbeddingsModel, (SELECT @content AS content) ) ;"
+
+ANN_QUERY = "SELECT fund_name, investment_strategy, investment_managers, APPROX_EUCLIDEAN_DISTANCE(investment_strategy_Embedding_vector, @vector, options => JSON '{\"num_leaves_to_search\": 10}') AS distance FROM EU_MutualFunds @{force_index = InvestmentStrategyEmbeddingIndex} WHERE investment_strategy_Embedding_vector IS NOT NULL ORDER BY distance LIMIT 100;"
+
+ANN_MANAGER_QUERY = "SELECT funds.fund_name, funds.investment_strategy, funds.investment_managers FROM (SELECT NewMFSequence, APPROX_EUCLIDEAN_DISTANCE(investment_strategy_Embedding_vector, @vector, options => JSON '{\"num_leaves_to_search\": 10}') AS distance FROM EU_MutualFunds @{force_index = InvestmentStrategyEmbeddingIndex} WHERE investment_strategy_Embedding_vector IS NOT NULL ORDER BY distance LIMIT 500 ) AS ann JOIN EU_MutualFunds AS funds ON ann.NewMFSequence = funds.NewMFSequence WHERE SEARCH_NGRAMS(funds.investment_managers_Substring_Tokens_NGRAM, @manager,min_ngrams=>1)  ORDER BY SCORE_NGRAMS(funds.investment_managers_Substring_Tokens_NGRAM, @manager) desc;"
+
+# The boolean operator between the two strategy terms cannot be a parameter
+PRECISE_QUERIES = {
+    operator: " SELECT DISTINCT fund_name, investment_managers, investment_strategy FROM EU_MutualFunds WHERE investment_managers LIKE CONCAT('%', @manager, '%') AND ( investment_strategy LIKE CONCAT('%', @strategy, '%') "
+    + operator
+    + " investment_strategy LIKE CONCAT('%', @second_strategy, '%') ) ORDER BY fund_name;"
+    for operator in ("AND", "OR")
+}
+
+COMPLIANCE_QUERY = "GRAPH FundGraph MATCH (sector:Sector {sector_name: @sector})<-[:BELONGS_TO]-(company:Company)<-[h:HOLDS]-(fund:Fund) RETURN fund.fund_name, SUM(h.percentage) AS totalHoldings GROUP BY fund.fund_name NEXT FILTER totalHoldings > @threshold RETURN fund_name, totalHoldings"
+
+
+def spanner_read_data(query: str, params: dict | None = None) -> pd.DataFrame:
+    """This function helps read data from Spanner, binding the query parameters"""
     with database.snapshot() as snapshot:
-        if len(vector_input) != 0:
-            results = snapshot.execute_sql(
-                query,
-                params={"vector": vector_input[0]},
-            )
-        else:
-            results = snapshot.execute_sql(query)
-        rows = list(results)
-        cols = [x.name for x in results.fields]
-        return pd.DataFrame(rows, columns=cols)
-
-
-def fts_query(query_params: list) -> dict:
-    """This function runs Full Text Search Query"""
-    if query_params[1] == "":
-        fts_query_str = (
-            "SELECT DISTINCT fund_name,investment_strategy,investment_managers,fund_trailing_return_ytd,top5_holdings FROM EU_MutualFunds WHERE SEARCH(investment_strategy_Tokens, '"
-            + query_params[0]
-            + "') order by fund_name;"
+        return read_snapshot_data(snapshot, query, params)
+
+
+def read_snapshot_data(
+    snapshot: Snapshot, query: str, params: dict | None = None
+) -> pd.DataFrame:
+    """This function reads the results of a query in a snapshot into a DataFrame"""
+    results = execute_snapshot_sql(snapshot, query, params)
+    rows = list(results)
+    cols = [x.name for x in results.fields]
+    return pd.DataFrame(rows, columns=cols)
+
+
+def execute_snapshot_sql(
+    snapshot: Snapshot, query: str, params: dict | None = None
+) -> StreamedResultSet:
+    """This function starts a query in a snapshot, binding the query parameters"""
+    if params:
+        return snapshot.execute_sql(
+            query,
+            params=params,
+            param_types={name: QUERY_PARAM_TYPES[name] for name in params},
         )
-    else:
-        fts_query_str = (
-            "SELECT DISTINCT fund_name, manager, strategy, score FROM (SELECT fund_name , investment_managers AS manager, investment_strategy as strategy, SCORE_NGRAMS(investment_managers_Substring_Tokens_NGRAM, '"
-            + query_params[1]
-            + "') AS score FROM EU_MutualFunds WHERE SEARCH_NGRAMS(investment_managers_Substring_Tokens_NGRAM, '"
-            + query_params[1]
-            + "', min_ngrams=>1) AND SEARCH(investment_strategy_Tokens, '"
-            + query_params[0]
-            + "') ) ORDER BY score DESC;"
+    return snapshot.execute_sql(query)
+
+
+def read_snapshot_data_chunks(
+    snapshot: Snapshot,
+    query: str,
+    params: dict | None = None,
+    chunk_size: int = 1000,
+    max_rows: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """This function streams the results of a query in a snapshot as DataFrames of chunk_size rows
+
+    Rows are read from Spanner as the chunks are consumed, so memory stays
+    bounded by chunk_size. The read stops after max_rows rows, or as soon as
+    the caller stops iterating and closes the generator. An empty result still
+    yields one empty DataFrame with the result columns.
+    """
+    results = execute_snapshot_sql(snapshot, query, params)
+    rows_iter = islice(results, max_rows)
+    cols = None
+    while rows := list(islice(rows_iter, chunk_size)):
+        if cols is None:
+            # The result metadata is available once the first row is read
+            cols = [x.name for x in results.fields]
+        yield pd.DataFrame(rows, columns=cols)
+    if cols is None:
+        yield pd.DataFrame(columns=[x.name for x in results.fields])
+
+
+def spanner_read_data_chunks(
+    query: str,
+    params: dict | None = None,
+    chunk_size: int = 1000,
+    max_rows: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """This function streams the results of a query as DataFrames of chunk_size rows"""
+    with database.snapshot() as snapshot:
+        yield from read_snapshot_data_chunks(
+            snapshot, query, params, chunk_size, max_rows
+        )
+
+
+def read_snapshot_unique_rows(
+    snapshot: Snapshot,
+    query: str,
+    params: dict | None = None,
+    chunk_size: int = 1000,
+    max_rows: int | None = None,
+) -> pd.DataFrame:
+    """This function reads the distinct rows of a query chunk by chunk
+
+    Duplicates are dropped from every chunk as it arrives, so the full result
+    set is never held in memory at once.
+    """
+    chunks = [
+        chunk.drop_duplicates()
+        for chunk in read_snapshot_data_chunks(
+            snapshot, query, params, chunk_size, max_rows
         )
+    ]
+    return pd.concat(chunks).drop_duplicates(ignore_index=True)
+
+
+def spanner_read_page(
+    query: str,
+    params: dict | None = None,
+    page_size: int = 100,
+    page_token: str | None = None,
+) -> tuple[pd.DataFrame, str | None]:
+    """This function reads one page of the results of a query for interactive tables
+
+    The query must not have its own LIMIT, and needs an ORDER BY for the pages to
+    be stable. Returns the page and the token of the next page, or None on the
+    last page.
+    """
+    offset = int(page_token) if page_token else 0
+    page_query = f"{query.strip().rstrip(';')} LIMIT @page_limit OFFSET @page_offset"
+    page_params = {**(params or {}), "page_limit": page_size + 1, "page_offset": offset}
+    df = spanner_read_data(page_query, page_params)
+    if len(df) <= page_size:
+        return df, None
+    return df.iloc[:page_size], str(offset + page_size)
+
+
+@st.cache_data(
+    ttl=query_cache_ttl_seconds, max_entries=query_cache_max_entries, show_spinner=False
+)
+def cached_spanner_read_data(query: str, params: dict | None = None) -> pd.DataFrame:
+    """This function reads data from Spanner, caching results by query and parameters"""
+    return spanner_read_data(query, params)
+
+
+@st.cache_data(
+    ttl=query_cache_ttl_seconds, max_entries=query_cache_max_entries, show_spinner=False
+)
+def cached_spanner_read_page(
+    query: str,
+    params: dict | None = None,
+    page_size: int = 100,
+    page_token: str | None = None,
+) -> tuple[pd.DataFrame, str | None]:
+    """This function reads one page of the results of a query, caching pages by query, parameters and token"""
+    return spanner_read_page(query, params, page_size, page_token)
+
+
+@st.cache_data(max_entries=embedding_cache_max_entries, show_spinner=False)
+def get_query_embedding(content: str) -> list:
+    """This function embeds the search text with the Spanner embeddings model, caching the vectors by text"""
+    embedding_df = spanner_read_data(EMBEDDING_QUERY, {"content": content})
+    return embedding_df.values.tolist()[0][0]
+
+
+def fts_query(query_params: list, page_token: str | None = None) -> dict:
+    """This function runs Full Text Search Query, returning one page of results"""
+    if query_params[1] == "":
+        fts_query_str = FTS_QUERY
+        params = {"strategy": query_params[0]}
+    else:
+        fts_query_str = FTS_MANAGER_QUERY
+        params = {"strategy": query_params[0], "manager": query_params[1]}
 
     return_vals = {}
     return_vals["query"] = fts_query_str
-    df = spanner_read_data(fts_query_str)
+    df, next_page_token = cached_spanner_read_page(
+        fts_query_str, params, table_page_size, page_token
+    )
 
     return_vals["data"] = df
+    return_vals["next_page_token"] = next_page_token
     return return_vals
 
 
 def semantic_query(query_params: list) -> dict:
     """This function runs Semantic Text Search Query"""
     if query_params[1].strip() != "":
-        semantic_query_string = (
-            "SELECT fund_name, investment_strategy,investment_managers, COSINE_DISTANCE( investment_strategy_Embedding, (SELECT embeddings. VALUES FROM ML.PREDICT( MODEL EmbeddingsModel, (SELECT '"
-            + query_params[0]
-            + "' AS content) ) ) ) AS distance FROM EU_MutualFunds WHERE investment_strategy_Embedding is not NULL  AND  search_substring(investment_managers_substring_tokens, '"
-            + query_params[1]
-            + "')ORDER BY distance LIMIT 10;"
-        )
+        semantic_query_string = SEMANTIC_MANAGER_QUERY
+        params = {"strategy": query_params[0], "manager": query_params[1]}
     else:
-        semantic_query_string = (
-            "SELECT fund_name, investment_strategy,investment_managers, COSINE_DISTANCE( investment_strategy_Embedding, (SELECT embeddings. VALUES FROM ML.PREDICT( MODEL EmbeddingsModel, (SELECT '"
-            + query_params[0]
-            + "' AS content) ) ) ) AS distance FROM EU_MutualFunds WHERE investment_strategy_Embedding is not NULL  ORDER BY distance LIMIT 10;"
-        )
+        semantic_query_string = SEMANTIC_QUERY
+        params = {"strategy": query_params[0]}
     return_vals = {}
     return_vals["query"] = semantic_query_string
-    df = spanner_read_data(semantic_query_string)
+    df = cached_spanner_read_data(semantic_query_string, params)
 
     return_vals["data"] = df
     return return_vals
@@ -92,27 +251,15 @@ def semantic_query(query_params: list) -> dict:
 def semantic_query_ann(query_params: list) -> dict:
     """This function runs Semantic Text Search ANN Query"""
 
-    embedding_query = (
-        'SELECT embeddings. VALUES as vector FROM ML.PREDICT( MODEL EmbeddingsModel, (SELECT "'
-        + query_params[0]
-        + '" AS content) ) ;'
-    )
-    vector_input = spanner_read_data(embedding_query).values.tolist()
+    vector_input = get_query_embedding(query_params[0])
 
     if query_params[1].strip() != "":
-        ann_query = (
-            "SELECT funds.fund_name, funds.investment_strategy, funds.investment_managers FROM (SELECT NewMFSequence, APPROX_EUCLIDEAN_DISTANCE(investment_strategy_Embedding_vector, @vector, options => JSON '{\"num_leaves_to_search\": 10}') AS distance FROM EU_MutualFunds @{force_index = InvestmentStrategyEmbeddingIndex} WHERE investment_strategy_Embedding_vector IS NOT NULL ORDER BY distance LIMIT 500 ) AS ann JOIN EU_MutualFunds AS funds ON ann.NewMFSequence = funds.NewMFSequence WHERE SEARCH_NGRAMS(funds.investment_managers_Substring_Tokens_NGRAM, '"
-            + query_params[1]
-            + "',min_ngrams=>1)  ORDER BY SCORE_NGRAMS(funds.investment_managers_Substring_Tokens_NGRAM, '"
-            + query_params[1]
-            + "') desc;"
-        )
+        ann_query = ANN_MANAGER_QUERY
+        params = {"vector": vector_input, "manager": query_params[1]}
     else:
-        ann_query = "SELECT fund_name, investment_strategy, investment_managers, APPROX_EUCLIDEAN_DISTANCE(investment_strategy_Embedding_vector, @vector, options => JSON '{\"num_leaves_to_search\": 10}') AS distance FROM EU_MutualFunds @{force_index = InvestmentStrategyEmbeddingIndex} WHERE investment_strategy_Embedding_vector IS NOT NULL ORDER BY distance LIMIT 100;"
-    results_df = spanner_read_data(ann_query, vector_input[0][0])
-    results_df = spanner_read_data(ann_query, vector_input[0][0])
-    results_df = spanner_read_data(ann_query, vector_input[0][0])
-    results_df = spanner_read_data(ann_query, vector_input[0][0])
+        ann_query = ANN_QUERY
+        params = {"vector": vector_input}
+    results_df = cached_spanner_read_data(ann_query, params)
 
     return_vals = {}
     return_vals["query"] = ann_query
@@ -120,80 +267,122 @@ def semantic_query_ann(query_params: list) -> dict:
     return return_vals
 
 
-def like_query(query_params: list) -> dict:
-    """This function runs Precise Text Search Query"""
+def like_query(query_params: list, page_token: str | None = None) -> dict:
+    """This function runs Precise Text Search Query, returning one page of results"""
 
     if query_params[1] == "EXCLUDE":
         query_params[1] = "AND"
-    precise_query = (
-        " SELECT DISTINCT fund_name, investment_managers, investment_strategy FROM EU_MutualFunds WHERE investment_managers LIKE ('%"
-        + query_params[3]
-        + "%') AND ( investment_strategy LIKE ('%"
-        + query_params[0]
-        + "%') "
-        + query_params[1]
-        + " investment_strategy LIKE ('%"
-        + query_params[2]
-        + "%') ) ORDER BY fund_name;"
-    )
+    precise_query = PRECISE_QUERIES[query_params[1]]
+    params = {
+        "strategy": query_params[0],
+        "second_strategy": query_params[2],
+        "manager": query_params[3],
+    }
     return_vals = {}
     return_vals["query"] = precise_query
-    df = spanner_read_data(precise_query)
+    df, next_page_token = cached_spanner_read_page(
+        precise_query, params, table_page_size, page_token
+    )
 
     return_vals["data"] = df
+    return_vals["next_page_token"] = next_page_token
     return return_vals
 
 
 def compliance_query(query_params: list) -> dict:
     """This function runs Compliance Graph  Search Query"""
-    graph_compliance_query = (
-        "GRAPH FundGraph MATCH (sector:Sector {sector_name: '"
-        + query_params[0]
-        + "'})<-[:BELONGS_TO]-(company:Company)<-[h:HOLDS]-(fund:Fund) RETURN fund.fund_name, SUM(h.percentage) AS totalHoldings GROUP BY fund.fund_name NEXT FILTER totalHoldings > "
-        + query_params[1]
-        + " RETURN fund_name, totalHoldings"
-    )
+    graph_compliance_query = COMPLIANCE_QUERY
+    params = {"sector": query_params[0], "threshold": float(query_params[1])}
 
     return_vals = {}
     return_vals["query"] = graph_compliance_query
-    df = spanner_read_data(graph_compliance_query)
+    df = cached_spanner_read_data(graph_compliance_query, params)
     return_vals["data"] = df
     return return_vals
 
 
-def graph_dtls_query() -> dict:
-    """This function runs Graph Details  Query"""
-    company_query = "select CompanySeq,name from  Companies;"
-
-    return_vals = {}
-    df_companies = spanner_read_data(company_query)
-    return_vals["Companies"] = df_companies
-
-    sector_query = "select * from  Sectors;"
-    df_sectors = spanner_read_data(sector_query)
-    return_vals["Sectors"] = df_sectors
-
-    managers_query = "select * from  Managers LIMIT 100;"
-    df_managers = spanner_read_data(managers_query)
-    return_vals["Managers"] = df_managers
-
-    company_belong_sector_query = "SELECT * from CompanyBelongsSector;"
-    df_comp_sec_edge = spanner_read_data(company_belong_sector_query)
-    return_vals["CompanySectorRelation"] = df_comp_sec_edge
-
-    mgr_fund_edge_query = " SELECT mgrs.NewMFSequence,fund_name,ManagerSeq from ManagerManagesFund mgrs JOIN EU_MutualFunds funds ON mgrs.NewMFSequence =  funds.NewMFSequence where ManagerSeq in (select ManagerSeq from Managers LIMIT 100);"
-    mgr_fund_edge = spanner_read_data(mgr_fund_edge_query)
-    return_vals["ManagerFundRelation"] = mgr_fund_edge
-
-    funds_node_query = "select fund_name, NewMFSequence from EU_MutualFunds where NewMFSequence in (SELECT NewMFSequence FROM FundHoldsCompany);"
-    funds_node = spanner_read_data(funds_node_query)
-    return_vals["Funds"] = funds_node
+# Reads of the Graph Visualization page, by the key they are returned under
+GRAPH_DETAIL_QUERIES = {
+    "Companies": "select CompanySeq,name from  Companies;",
+    "Sectors": "select * from  Sectors;",
+    "Managers": "select * from  Managers LIMIT 100;",
+    "CompanySectorRelation": "SELECT CompanySeq, SectorSeq from CompanyBelongsSector;",
+    "ManagerFundRelation": " SELECT mgrs.NewMFSequence,fund_name,ManagerSeq from ManagerManagesFund mgrs JOIN EU_MutualFunds funds ON mgrs.NewMFSequence =  funds.NewMFSequence where ManagerSeq in (select ManagerSeq from Managers LIMIT 100);",
+    "Funds": "select fund_name, NewMFSequence from EU_MutualFunds where NewMFSequence in (SELECT NewMFSequence FROM FundHoldsCompany);",
+    "FundsHoldsCompaniesRelation": "SELECT NewMFSequence, CompanySeq FROM FundHoldsCompany;",
+}
+
+# The edge tables grow with the funds, so they are streamed in chunks. When
+# graph_max_edges is set, they are capped in the order of these columns.
+GRAPH_EDGE_ORDER = {
+    "CompanySectorRelation": "CompanySeq, SectorSeq",
+    "FundsHoldsCompaniesRelation": "NewMFSequence, CompanySeq",
+}
+
+
+def read_graph_edges(snapshot: Snapshot, name: str) -> tuple[pd.DataFrame, bool]:
+    """This function reads one of the Graph Details edge tables in a snapshot
+
+    Returns the edges and whether they were truncated to graph_max_edges rows.
+    """
+    query = GRAPH_DETAIL_QUERIES[name]
+    if graph_max_edges <= 0:
+        return read_snapshot_unique_rows(snapshot, query), False
+    capped_query = (
+        f"{query.strip().rstrip(';')} ORDER BY {GRAPH_EDGE_ORDER[name]}"
+        " LIMIT @page_limit"
+    )
+    # One row past the cap tells whether the table was truncated
+    df = read_snapshot_data(snapshot, capped_query, {"page_limit": graph_max_edges + 1})
+    truncated = len(df) > graph_max_edges
+    return df.iloc[:graph_max_edges].drop_duplicates(ignore_index=True), truncated
+
+
+def read_graph_detail(snapshot: Snapshot, name: str) -> tuple[pd.DataFrame, bool]:
+    """This function reads one of the Graph Details queries in a snapshot
+
+    Returns the rows and whether they were truncated to graph_max_edges rows.
+    """
+    if name in GRAPH_EDGE_ORDER:
+        return read_graph_edges(snapshot, name)
+    return read_snapshot_data(snapshot, GRAPH_DETAIL_QUERIES[name]), False
+
+
+def graph_dtls_query(parallel: bool = True) -> dict:
+    """This function runs Graph Details  Query
+
+    With parallel, the reads run concurrently within one multi-use read-only
+    snapshot, so they all see the same consistent state of the database.
+    The edge tables are read in chunks. The names of the tables truncated to
+    graph_max_edges rows are returned under "TruncatedTables".
+    """
+    if not parallel:
+        reads = {}
+        for name in GRAPH_DETAIL_QUERIES:
+            with database.snapshot() as snapshot:
+                reads[name] = read_graph_detail(snapshot, name)
+    else:
+        with database.snapshot(multi_use=True) as snapshot:
+            # A multi-use snapshot needs its transaction before concurrent reads
+            snapshot.begin()
+            with ThreadPoolExecutor(max_workers=len(GRAPH_DETAIL_QUERIES)) as executor:
+                futures = {
+                    name: executor.submit(read_graph_detail, snapshot, name)
+                    for name in GRAPH_DETAIL_QUERIES
+                }
+                reads = {name: future.result() for name, future in futures.items()}
+
+    return_vals: dict = {name: df for name, (df, _) in reads.items()}
+    return_vals["TruncatedTables"] = [
+        name for name, (_, truncated) in reads.items() if truncated
+    ]
+    return return_vals
 
-    funds_hold_company_edge_query = "SELECT * FROM FundHoldsCompany;"
-    funds_hold_company_edge = spanner_read_data(funds_hold_company_edge_query)
-    return_vals["FundsHoldsCompaniesRelation"] = funds_hold_company_edge
 
-    return return_vals
+@st.cache_data(ttl=query_cache_ttl_seconds, max_entries=1, show_spinner=False)
+def cached_graph_dtls_query() -> dict:
+    """This function runs the Graph Details Query, caching the results"""
+    return graph_dtls_query()
 
 
 def display_spanner_query(spanner_query: str) -> None:
@@ -2,49 +2,99 @@
 
 # pylint: disable=import-error, line-too-long, unused-variable
 
-from database import graph_dtls_query
+import hashlib
+
+from database import cached_graph_dtls_query, graph_max_edges
+import pandas as pd
+from pyvis.edge import Edge
 from pyvis.network import Network
+import streamlit as st
+
+
+def graph_data_fingerprint(return_vals: dict) -> str:
+    """This function hashes the contents of the graph tables"""
+    digest = hashlib.sha256()
+    for name, df in return_vals.items():
+        digest.update(name.encode("utf-8"))
+        if not isinstance(df, pd.DataFrame):
+            digest.update(repr(df).encode("utf-8"))
+            continue
+        try:
+            row_hashes = pd.util.hash_pandas_object(df, index=False).values
+            digest.update(row_hashes.tobytes())
+        except TypeError:  # unhashable cells, such as arrays
+            digest.update(df.to_json().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def add_nodes(
+    graph: Network, df: pd.DataFrame, id_col: str, label_col: str, **options
+) -> None:
+    """This function adds one node per unique id of a DataFrame, without iterrows"""
+    df = df.drop_duplicates(subset=id_col)
+    for node_id, label in zip(df[id_col].astype(str), df[label_col]):
+        graph.add_node(node_id, label=label, title=label, **options)
+
 
+def add_edges(
+    graph: Network, df: pd.DataFrame, from_col: str, to_col: str, title: str
+) -> None:
+    """This function adds the unique edges of a DataFrame between existing nodes"""
+    edges = pd.DataFrame(
+        {"from": df[from_col].astype(str), "to": df[to_col].astype(str)}
+    ).drop_duplicates()
+    node_ids = set(graph.node_map)
+    edges = edges[edges["from"].isin(node_ids) & edges["to"].isin(node_ids)]
+    # Network.add_edge scans all nodes and edges on every call, so append directly
+    graph.edges.extend(
+        Edge(source, dest, title=title).options
+        for source, dest in zip(edges["from"], edges["to"])
+    )
 
-def generate_graph() -> None:
-    """This function is for generating the Graph Visualization"""
 
+@st.cache_data(max_entries=2, show_spinner=False)
+def build_graph_html(data_fingerprint: str, _return_vals: dict) -> str:
+    """This function builds the graph and serializes it to HTML, once per table contents"""
     graph = Network("900px", "900px", notebook=True, heading="")
-    return_vals = graph_dtls_query()
-    companies = return_vals.get("Companies")
-    for index, row in companies.iterrows():  # type: ignore[union-attr]  # might ignore other potential errors
-        graph.add_node(
-            str(row["CompanySeq"]),
-            label=row["name"],
-            title=row["name"],
-            shape="triangle",
-        )
-
-    sectors = return_vals.get("Sectors")
-    for index, row in sectors.iterrows():  # type: ignore[union-attr]  # might ignore other potential errors
-        graph.add_node(
-            str(row["SectorSeq"]),
-            label=row["sector_name"],
-            shape="square",
-            color="red",
-            title=row["sector_name"],
-        )
-
-    funds = return_vals.get("Funds")
-    for index, row in funds.iterrows():  # type: ignore[union-attr]  # might ignore other potential errors
-        graph.add_node(
-            str(row["NewMFSequence"]),
-            label=row["fund_name"],
-            color="green",
-            title=row["fund_name"],
-        )
-
-    comp_sector_relation = return_vals.get("CompanySectorRelation")
-    for index, row in comp_sector_relation.iterrows():  # type: ignore[union-attr]  # might ignore other potential errors
-        graph.add_edge(str(row["CompanySeq"]), str(row["SectorSeq"]), title="BELONGS")
-
-    fund_hold_company_relation = return_vals.get("FundsHoldsCompaniesRelation")
-    for index, row in fund_hold_company_relation.iterrows():  # type: ignore[union-attr]  # might ignore other potential errors
-        graph.add_edge(str(row["NewMFSequence"]), str(row["CompanySeq"]), title="HOLDS")
+
+    add_nodes(graph, _return_vals["Companies"], "CompanySeq", "name", shape="triangle")
+    add_nodes(
+        graph,
+        _return_vals["Sectors"],
+        "SectorSeq",
+        "sector_name",
+        shape="square",
+        color="red",
+    )
+    add_nodes(graph, _return_vals["Funds"], "NewMFSequence", "fund_name", color="green")
+
+    add_edges(
+        graph,
+        _return_vals["CompanySectorRelation"],
+        "CompanySeq",
+        "SectorSeq",
+        title="BELONGS",
+    )
+    add_edges(
+        graph,
+        _return_vals["FundsHoldsCompaniesRelation"],
+        "NewMFSequence",
+        "CompanySeq",
+        title="HOLDS",
+    )
 
     graph.show("graph_viz.html")
+    with open("graph_viz.html", encoding="utf-8") as html_file:
+        return html_file.read()
+
+
+def generate_graph() -> tuple[str, list[str]]:
+    """This function is for generating the Graph Visualization
+
+    The graph is only rebuilt when the contents of the underlying tables change.
+    Returns the graph HTML and the names of the edge tables truncated to
+    graph_max_edges rows.
+    """
+    return_vals = cached_graph_dtls_query()
+    html = build_graph_html(graph_data_fingerprint(return_vals), return_vals)
+    return html, return_vals["TruncatedTables"]
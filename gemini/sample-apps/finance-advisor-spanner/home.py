@@ -33,3 +33,28 @@ def table_columns_layout_setup() -> dict:
     if buttons:
         it_args["buttons"] = buttons
     return it_args
+
+
+def table_page_token(key: str) -> str | None:
+    """This function returns the page token of the table page being viewed"""
+    return st.session_state.get(f"{key}_page_tokens", [None])[-1]
+
+
+def reset_table_pages(key: str) -> None:
+    """This function goes back to the first page of a table, for a new search"""
+    st.session_state[f"{key}_page_tokens"] = [None]
+
+
+def table_page_navigation(key: str, next_page_token: str | None) -> None:
+    """This function shows the Previous and Next buttons of a paginated table"""
+    page_tokens = st.session_state.setdefault(f"{key}_page_tokens", [None])
+    previous_col, page_col, next_col = st.columns([0.15, 0.70, 0.15])
+    if previous_col.button(
+        "Previous", key=f"{key}_previous", disabled=len(page_tokens) == 1
+    ):
+        page_tokens.pop()
+        st.rerun()
+    page_col.caption(f"Page {len(page_tokens)}")
+    if next_col.button("Next", key=f"{key}_next", disabled=next_page_token is None):
+        page_tokens.append(next_page_token)
+        st.rerun()
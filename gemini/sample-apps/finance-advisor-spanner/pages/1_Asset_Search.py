@@ -3,7 +3,12 @@
 # pylint: disable=line-too-long,import-error,invalid-name
 
 from database import display_spanner_query, fts_query, like_query
-from home import table_columns_layout_setup
+from home import (
+    reset_table_pages,
+    table_columns_layout_setup,
+    table_page_navigation,
+    table_page_token,
+)
 from itables.streamlit import interactive_table
 import streamlit as st
 
@@ -18,16 +23,18 @@ def asset_search_common(query_parameters: list, query_type: str) -> None:
     st.header("FinVest Fund Advisor")
     st.subheader("Asset Search")
 
+    page_token = table_page_token("asset_search")
     with st.spinner("Querying Spanner..."):
         if query_type == "PRECISE":
-            return_vals = like_query(query_parameters)
+            return_vals = like_query(query_parameters, page_token)
         else:
-            return_vals = fts_query(query_parameters)
+            return_vals = fts_query(query_parameters, page_token)
         spanner_query = return_vals.get("query")
         data = return_vals.get("data")
         display_spanner_query(str(spanner_query))
 
     interactive_table(data, caption="", **table_columns_layout_setup())
+    table_page_navigation("asset_search", return_vals.get("next_page_token"))
 
 
 with st.sidebar:
@@ -65,7 +72,11 @@ if asset_search_submitted:
             investment_strategy_pt2.strip(),
             investment_manager.strip(),
         ]
-        asset_search_common(query_params, "PRECISE")
+        st.session_state["asset_search"] = (query_params, "PRECISE")
     else:
         query_params = [investment_strategy, investment_manager]
-        asset_search_common(query_params, "FTS")
+        st.session_state["asset_search"] = (query_params, "FTS")
+    reset_table_pages("asset_search")
+# The search is kept in the session, so paging through the results reruns it
+if "asset_search" in st.session_state:
+    asset_search_common(*st.session_state["asset_search"])
@@ -11,10 +11,12 @@ st.subheader("Show me the Relationships between Funds ,Companies and Sectors")
 st.logo(
     "https://storage.googleapis.com/github-repo/generative-ai/sample-apps/finance-advisor-spanner/images/investments.png"
 )
-graph_viz.generate_graph()
-
-with open("graph_viz.html", encoding="utf-8") as html_file:
-    source_code = html_file.read()
+source_code, truncated_tables = graph_viz.generate_graph()
+if truncated_tables:
+    st.warning(
+        f"Graph truncated: only the first {graph_viz.graph_max_edges} edges of "
+        f"{', '.join(truncated_tables)} are shown."
+    )
 components.html(source_code, height=950, width=900)
 
 with st.sidebar:
@@ -1,5 +1,10 @@
+import asyncio
+from contextlib import asynccontextmanager
+import hashlib
+import json
 import os
-from typing import Any, Dict, List, cast
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, cast
 
 import google.auth
 import google.auth.transport.requests
@@ -9,15 +14,20 @@ from llama_index.core import (
     SimpleDirectoryReader,
     StorageContext,
     VectorStoreIndex,
+    load_index_from_storage,
 )
 from llama_index.core.base.base_query_engine import BaseQueryEngine
-from llama_index.core.indices.query.query_transform.base import (
-    StepDecomposeQueryTransform,
+from llama_index.core.indices.utils import (
+    default_format_node_batch_fn,
+    default_parse_choice_select_answer_fn,
 )
 from llama_index.core.llms import LLM
 from llama_index.core.node_parser import SentenceSplitter
-from llama_index.core.postprocessor.llm_rerank import LLMRerank
 from llama_index.core.prompts import PromptTemplate
+from llama_index.core.prompts.default_prompts import (
+    DEFAULT_CHOICE_SELECT_PROMPT,
+    DEFAULT_STEP_DECOMPOSE_QUERY_TRANSFORM_PROMPT,
+)
 from llama_index.core.response_synthesizers import (
     ResponseMode,
     get_response_synthesizer,
@@ -74,6 +84,224 @@ llm = Vertex(
 Settings.embed_model = embedding_model
 Settings.llm = llm
 
+INDEX_PERSIST_DIR = os.environ.get("INDEX_PERSIST_DIR", "/app/storage")
+INDEX_REFRESH_INTERVAL = float(os.environ.get("INDEX_REFRESH_INTERVAL", "300"))
+MANIFEST_FILENAME = "file_manifest.json"
+
+
+class ReadWriteLock:
+    """
+    Asyncio lock held by any number of readers, or by a single writer.
+
+    Waiting writers block new readers, so a refresh is not starved by a steady
+    stream of queries. Must be created in the event loop it is used from.
+    """
+
+    def __init__(self) -> None:
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writing = False
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: not self._writing and not self._writers_waiting
+            )
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[None]:
+        async with self._condition:
+            self._writers_waiting += 1
+            try:
+                await self._condition.wait_for(
+                    lambda: not self._writing and not self._readers
+                )
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class PersistentIndex:
+    """
+    Vector Store Index over the files of a data directory, shared across workflow runs.
+
+    The index is built once, or loaded from the storage context persisted in
+    `persist_dir`, and then refreshed at most every `refresh_interval` seconds.
+    A refresh only re-reads and re-embeds the files whose modification time and
+    content hash changed, and removes the documents of deleted files.
+
+    The refresh updates the index in place, so queries must run inside
+    `read_index`, which keeps the index from being refreshed until they finish.
+    """
+
+    def __init__(
+        self, dirname: Optional[str], persist_dir: str, refresh_interval: float
+    ) -> None:
+        self.dirname = dirname
+        self.persist_dir = persist_dir
+        self.refresh_interval = refresh_interval
+        self.index: Optional[VectorStoreIndex] = None
+        # file path -> {"mtime": float, "sha256": str, "doc_ids": [str]}
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self.refreshed_at: Optional[float] = None
+        self._lock: Optional[ReadWriteLock] = None
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.persist_dir, MANIFEST_FILENAME)
+
+    def get_docstore(self) -> FirestoreDocumentStore:
+        return FirestoreDocumentStore.from_database(
+            project=os.environ.get("PROJECT_ID"),
+            database=os.environ.get("FIRESTORE_DATABASE_ID"),
+        )
+
+    def load_or_create(self) -> VectorStoreIndex:
+        """Load the persisted index, or create an empty one"""
+        docstore = self.get_docstore()
+        if os.path.exists(self.manifest_path):
+            storage_context = StorageContext.from_defaults(
+                docstore=docstore, persist_dir=self.persist_dir
+            )
+            self.index = load_index_from_storage(storage_context)
+            with open(self.manifest_path) as manifest_file:
+                self.manifest = json.load(manifest_file)
+            print(f"Vector Store Index loaded with {len(self.manifest)} files")
+        else:
+            storage_context = StorageContext.from_defaults(docstore=docstore)
+            self.index = VectorStoreIndex(nodes=[], storage_context=storage_context)
+            self.manifest = {}
+            print("Empty Vector Store Index created")
+        return self.index
+
+    def persist(self, index: VectorStoreIndex) -> None:
+        os.makedirs(self.persist_dir, exist_ok=True)
+        index.storage_context.persist(persist_dir=self.persist_dir)
+        # The manifest is written last, so it never references unpersisted nodes
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as manifest_file:
+            json.dump(self.manifest, manifest_file)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def remove_file(self, index: VectorStoreIndex, path: str) -> None:
+        for doc_id in self.manifest.pop(path, {}).get("doc_ids", []):
+            index.delete_ref_doc(doc_id, delete_from_docstore=True)
+
+    def refresh(self) -> None:
+        """Index new and changed files and drop the documents of deleted files"""
+        index = self.index if self.index is not None else self.load_or_create()
+
+        paths = {str(path) for path in SimpleDirectoryReader(self.dirname).input_files}
+        changed = False
+
+        for path in set(self.manifest) - paths:
+            print(f"Removing deleted file from index: {path}")
+            self.remove_file(index, path)
+            changed = True
+
+        for path in sorted(paths):
+            mtime = os.path.getmtime(path)
+            entry = self.manifest.get(path)
+            if entry and entry["mtime"] == mtime:
+                continue
+
+            sha256 = self.file_hash(path)
+            if entry and entry["sha256"] == sha256:
+                entry["mtime"] = mtime
+                changed = True
+                continue
+
+            print(f"Indexing new or changed file: {path}")
+            self.remove_file(index, path)
+            documents = SimpleDirectoryReader(
+                input_files=[path], filename_as_id=True
+            ).load_data()
+            for document in documents:
+                index.insert(document)
+            self.manifest[path] = {
+                "mtime": mtime,
+                "sha256": sha256,
+                "doc_ids": [document.doc_id for document in documents],
+            }
+            changed = True
+
+        if changed:
+            self.persist(index)
+            print(f"Vector Store Index refreshed with {len(self.manifest)} files")
+
+    def _get_lock(self) -> ReadWriteLock:
+        if self._lock is None:
+            # Created lazily so it binds to the running event loop
+            self._lock = ReadWriteLock()
+        return self._lock
+
+    def _refresh_due(self) -> bool:
+        return (
+            self.refreshed_at is None
+            or time.monotonic() - self.refreshed_at >= self.refresh_interval
+        )
+
+    async def refresh_if_due(self) -> None:
+        """Refresh the index when the refresh interval has elapsed"""
+        if not self.dirname or not self._refresh_due():
+            return
+
+        async with self._get_lock().write():
+            if self._refresh_due():
+                # Reading and embedding files is blocking I/O
+                await asyncio.to_thread(self.refresh)
+                self.refreshed_at = time.monotonic()
+
+    async def get_index(self) -> Optional[VectorStoreIndex]:
+        """
+        Return the shared index, refreshing it first when the refresh interval
+        has elapsed. Returns None when no data directory is configured.
+
+        The index may be refreshed again as soon as this returns, use
+        `read_index` to query it.
+        """
+        await self.refresh_if_due()
+        return self.index
+
+    @asynccontextmanager
+    async def read_index(self) -> AsyncIterator[Optional[VectorStoreIndex]]:
+        """
+        Like `get_index`, but the index is not refreshed until the context exits.
+        """
+        await self.refresh_if_due()
+        async with self._get_lock().read():
+            yield self.index
+
+
+persistent_index = PersistentIndex(
+    dirname=os.environ.get("DATA_DIRECTORY"),
+    persist_dir=INDEX_PERSIST_DIR,
+    refresh_interval=INDEX_REFRESH_INTERVAL,
+)
+
 
 class RetrieverEvent(Event):
     """Result of running retrieval"""
@@ -167,17 +395,57 @@ DEFAULT_CITATION_CHUNK_OVERLAP = 20
 class RAGWorkflow(Workflow):
     """Defines Workflow class that architects complex Retrieval Augmented Generation (RAG) workflow using Gemini models and Firestore databases."""
 
-    def combine_queries(
+    async def acombine_queries(
         self,
         query_bundle: QueryBundle,
         prev_reasoning: str,
         llm_inner: LLM,
     ) -> QueryBundle:
-        """Combine queries using StepDecomposeQueryTransform."""
-        transform_metadata = {"prev_reasoning": prev_reasoning}
-        return StepDecomposeQueryTransform(llm=llm_inner)(
-            query_bundle, metadata=transform_metadata
+        """Combine queries with the StepDecomposeQueryTransform prompt."""
+        fmt_prev_reasoning = f"\n{prev_reasoning}" if prev_reasoning else "None"
+        new_query_str = await llm_inner.apredict(
+            DEFAULT_STEP_DECOMPOSE_QUERY_TRANSFORM_PROMPT,
+            prev_reasoning=fmt_prev_reasoning,
+            query_str=query_bundle.query_str,
+            context_str="None",
         )
+        return QueryBundle(
+            query_str=new_query_str, custom_embedding_strs=[new_query_str]
+        )
+
+    async def arerank_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_str: str,
+        llm_inner: LLM,
+        choice_batch_size: int = 5,
+        top_n: int = 10,
+    ) -> List[NodeWithScore]:
+        """Rerank nodes like LLMRerank, running the choice batches concurrently."""
+
+        async def select_choices(nodes_batch: List[Any]) -> List[NodeWithScore]:
+            raw_response = await llm_inner.apredict(
+                DEFAULT_CHOICE_SELECT_PROMPT,
+                context_str=default_format_node_batch_fn(nodes_batch),
+                query_str=query_str,
+            )
+            raw_choices, relevances = default_parse_choice_select_answer_fn(
+                raw_response, len(nodes_batch)
+            )
+            choice_nodes = [nodes_batch[int(choice) - 1] for choice in raw_choices]
+            relevances = relevances or [1.0 for _ in choice_nodes]
+            return [
+                NodeWithScore(node=node, score=relevance)
+                for node, relevance in zip(choice_nodes, relevances)
+            ]
+
+        batches = []
+        for start in range(0, len(nodes), choice_batch_size):
+            end = start + choice_batch_size
+            batches.append([node.node for node in nodes[start:end]])
+        results = await asyncio.gather(*(select_choices(b) for b in batches))
+        reranked = [node for batch_result in results for node in batch_result]
+        return sorted(reranked, key=lambda x: x.score or 0.0, reverse=True)[:top_n]
 
     def default_stop_fn(self, stop_dict: Dict) -> bool:
         """Stop function for multi-step query combiner."""
@@ -187,36 +455,6 @@ class RAGWorkflow(Workflow):
 
         return "none" in query_bundle.query_str.lower()
 
-    def create_index(self, dirname: str | None) -> VectorStoreIndex:
-        """Create Vector Store Index from documents in Firestore Database"""
-
-        if not dirname:
-            return None
-
-        documents = SimpleDirectoryReader(dirname).load_data(show_progress=True)
-        print(len(documents))
-        print("Data loaded into Documents.")
-
-        # create (or load) docstore and add nodes
-        docstore = FirestoreDocumentStore.from_database(
-            project=os.environ.get("PROJECT_ID"),
-            database=os.environ.get("FIRESTORE_DATABASE_ID"),
-        )
-
-        docstore.add_documents(documents)
-        print("Firestore document store created with documents")
-
-        # create storage context
-        storage_context = StorageContext.from_defaults(docstore=docstore)
-
-        # setup index
-        index = VectorStoreIndex.from_documents(
-            documents=documents, storage_context=storage_context
-        )
-
-        print("Vector Store Index created")
-        return index
-
     async def multi_query_inner_loop(
         self, query_engine: BaseQueryEngine, query: str, num_steps: int, cur_steps: int
     ) -> tuple[list[str], list[NodeWithScore], Dict[str, Any]] | None:
@@ -227,7 +465,7 @@ class RAGWorkflow(Workflow):
         cur_response = None
         should_stop = False
 
-        final_response_metadata: Dict[str, Any] = {"sub_qa": []}
+        final_response_metadata: Dict[str, Any] = {"sub_qa": [], "timings": []}
         text_chunks: list[str] = []
         source_nodes: list[NodeWithScore] = []
         stop_fn = self.default_stop_fn
@@ -238,11 +476,13 @@ class RAGWorkflow(Workflow):
                 break
 
             print(llm)
-            updated_query_bundle = self.combine_queries(
+            step_start = time.perf_counter()
+            updated_query_bundle = await self.acombine_queries(
                 QueryBundle(query_str=query),
                 prev_reasoning,
                 llm_inner=Settings.llm,
             )
+            combine_seconds = time.perf_counter() - step_start
 
             print(
                 f"Created query for the step - {cur_steps} is: {updated_query_bundle}"
@@ -253,7 +493,15 @@ class RAGWorkflow(Workflow):
                 should_stop = True
                 break
 
-            cur_response = query_engine.query(updated_query_bundle)
+            query_start = time.perf_counter()
+            cur_response = await query_engine.aquery(updated_query_bundle)
+            final_response_metadata["timings"].append(
+                {
+                    "step": f"sub_qa_{cur_steps}",
+                    "combine_queries_seconds": combine_seconds,
+                    "query_seconds": time.perf_counter() - query_start,
+                }
+            )
 
             # append to response builder
             cur_qa_text = (
@@ -284,9 +532,6 @@ class RAGWorkflow(Workflow):
         """Entry point for RAG, triggered by a StartEvent with `query`. Execute multi-step query process."""
 
         query = ev.get("query")
-        dirname = os.environ.get("DATA_DIRECTORY")
-
-        index = self.create_index(dirname)
 
         cur_steps = 0
 
@@ -298,18 +543,18 @@ class RAGWorkflow(Workflow):
         # store the query in the global context
         await ctx.set("query", query)
 
-        # get the index from the global context
-        if index is None:
-            print("Index is empty, load some documents before querying!")
-            return None
-
         num_steps = ev.get("num_steps")
         print(num_steps)
-        query_engine = index.as_query_engine()
 
-        result = await self.multi_query_inner_loop(
-            query_engine, query, num_steps, cur_steps
-        )
+        async with persistent_index.read_index() as index:
+            if index is None:
+                print("Index is empty, load some documents before querying!")
+                return None
+
+            query_engine = index.as_query_engine()
+            result = await self.multi_query_inner_loop(
+                query_engine, query, num_steps, cur_steps
+            )
         if result is None:
             return None
 
@@ -329,12 +574,13 @@ class RAGWorkflow(Workflow):
         """Reranking the nodes based on the initial query."""
 
         print("Entered the rerank event")
+        query = await ctx.get("query", default=None)
+        print(query, flush=True)
         # Rerank the nodes
-        ranker = LLMRerank(choice_batch_size=5, top_n=10, llm=Settings.llm)
-        print(await ctx.get("query", default=None), flush=True)
+        rerank_start = time.perf_counter()
         try:
-            new_nodes = ranker.postprocess_nodes(
-                ev.nodes, query_str=await ctx.get("query", default=None)
+            new_nodes = await self.arerank_nodes(
+                ev.nodes, query_str=query, llm_inner=Settings.llm
             )
         except IndexError as ex:
             print(f"IndexError occurred during reranking: {ex}")
@@ -342,6 +588,9 @@ class RAGWorkflow(Workflow):
             new_nodes = ev.nodes
 
         print(f"Reranked nodes to {len(new_nodes)}")
+        ev.final_response_metadata.setdefault("timings", []).append(
+            {"step": "rerank", "seconds": time.perf_counter() - rerank_start}
+        )
         return RerankEvent(
             nodes=new_nodes,
             source_nodes=ev.source_nodes,
@@ -420,6 +669,9 @@ class RAGWorkflow(Workflow):
 async def main() -> None:
     """Deploys Workflow service."""
 
+    print("building or loading the vector store index")
+    await persistent_index.get_index()
+
     print("starting deploy workflow creation")
     await deploy_workflow(
         workflow=RAGWorkflow(timeout=200),
@@ -434,6 +686,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(main())
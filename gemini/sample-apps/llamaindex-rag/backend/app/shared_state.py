@@ -18,6 +18,8 @@ QA_ENDPOINT_NAME = config.get("qa_endpoint_name")
 FIRESTORE_DB_NAME = config.get("firestore_db_name")
 FIRESTORE_NAMESPACE = config.get("firestore_namespace")
 BUCKET_NAME = config.get("docstore_bucket_name")
+BM25_PERSIST_DIR = config.get("bm25_persist_dir")
+BM25_REFRESH_INTERVAL = config.get("bm25_refresh_interval", 300)
 
 # Initialize State of Prompts and Indexes
 
@@ -33,4 +35,6 @@ index_manager = IndexManager(
     firestore_db_name=FIRESTORE_DB_NAME,
     firestore_namespace=FIRESTORE_NAMESPACE,
     vs_bucket_name=BUCKET_NAME,
+    bm25_persist_dir=BM25_PERSIST_DIR,
+    bm25_refresh_interval=BM25_REFRESH_INTERVAL,
 )
@@ -1,7 +1,11 @@
 """Main state management class for indices and prompts for
 experimentation UI"""
 
+import hashlib
+import json
 import logging
+import os
+import time
 
 import Stemmer
 from backend.rag.async_extensions import (
@@ -10,6 +14,7 @@ from backend.rag.async_extensions import (
     AsyncTransformQueryEngine,
 )
 from backend.rag.claude_vertex import ClaudeVertexLLM
+from backend.rag.node_cache import NodeCache
 from backend.rag.node_reranker import CustomLLMRerank
 from backend.rag.parent_retriever import ParentRetriever
 from backend.rag.prompts import Prompts
@@ -23,6 +28,7 @@ from llama_index.core import (
     get_response_synthesizer,
 )
 from llama_index.core.agent import ReActAgent
+from llama_index.core.llms import LLM
 from llama_index.core.retrievers import AutoMergingRetriever, QueryFusionRetriever
 from llama_index.core.tools import QueryEngineTool, ToolMetadata
 from llama_index.embeddings.vertex import VertexTextEmbedding
@@ -59,6 +65,9 @@ class IndexManager:
         firestore_db_name: str | None,
         firestore_namespace: str | None,
         vs_bucket_name: str,
+        bm25_persist_dir: str | None = None,
+        bm25_refresh_interval: float = 300.0,
+        node_cache_max_bytes: int = 128 * 1024 * 1024,
     ):
         self.project_id = project_id
         self.location = location
@@ -70,6 +79,15 @@ class IndexManager:
         self.firestore_db_name = firestore_db_name
         self.firestore_namespace = firestore_namespace
         self.vs_bucket_name = vs_bucket_name
+        # Query engines are memoized by their configuration, and BM25
+        # retrievers by similarity_top_k for the current docstore contents
+        self.bm25_persist_dir = bm25_persist_dir
+        self.bm25_refresh_interval = bm25_refresh_interval
+        self.node_cache_max_bytes = node_cache_max_bytes
+        self._query_engines: dict[tuple, tuple[AsyncRetrieverQueryEngine, LLM]] = {}
+        self._bm25_retrievers: dict[int, BM25Retriever] = {}
+        self._docstore_fingerprint: str | None = None
+        self._docstore_checked_at: float | None = None
         self.embed_model = VertexTextEmbedding(
             model_name=self.embeddings_model_name,
             project=self.project_id,
@@ -90,6 +108,7 @@ class IndexManager:
             )
         else:
             self.qa_index = None
+        self._create_node_caches()
 
     def get_current_index_info(self) -> dict:
         """Return the indices currently being used"""
@@ -155,6 +174,99 @@ class IndexManager:
             )
         else:
             self.qa_index = None
+        self._create_node_caches()
+        self.clear_cache()
+
+    def _create_node_caches(self) -> None:
+        """Create the node caches for the docstores of the current indices"""
+        # Parent and source documents are large and reused across queries,
+        # so their caches are bounded in bytes as well as in entries
+        self.base_node_cache = NodeCache(
+            self.base_index.docstore, max_bytes=self.node_cache_max_bytes
+        )
+        self.qa_node_cache = (
+            NodeCache(self.qa_index.docstore, max_bytes=self.node_cache_max_bytes)
+            if self.qa_index
+            else None
+        )
+
+    def clear_cache(self) -> None:
+        """Drop the memoized query engines, BM25 retrievers and docstore nodes"""
+        self.base_node_cache.clear()
+        if self.qa_node_cache:
+            self.qa_node_cache.clear()
+        self._query_engines.clear()
+        self._bm25_retrievers.clear()
+        self._docstore_fingerprint = None
+        self._docstore_checked_at = None
+
+    def _get_docstore_fingerprint(self) -> str:
+        """
+        Returns a hash of the document hashes of the base docstore,
+        which changes whenever a document is added, updated or removed.
+        """
+        document_hashes = self.base_index.docstore.get_all_document_hashes()
+        return hashlib.sha256(
+            json.dumps(sorted(document_hashes.items())).encode("utf-8")
+        ).hexdigest()
+
+    def _refresh_bm25_retrievers(self) -> None:
+        """
+        Checks at most every bm25_refresh_interval seconds whether the base
+        docstore changed, and if so drops the outdated BM25 retrievers and the
+        query engines using them.
+        """
+        now = time.monotonic()
+        if (
+            self._docstore_checked_at is not None
+            and now - self._docstore_checked_at < self.bm25_refresh_interval
+        ):
+            return
+
+        self._docstore_checked_at = now
+        fingerprint = self._get_docstore_fingerprint()
+        if fingerprint != self._docstore_fingerprint:
+            if self._docstore_fingerprint is not None:
+                logger.info("Docstore changed, BM25 retrievers will be rebuilt")
+            self._docstore_fingerprint = fingerprint
+            self.base_node_cache.clear()
+            self._bm25_retrievers.clear()
+            self._query_engines.clear()
+
+    def get_bm25_retriever(self, similarity_top_k: int) -> BM25Retriever:
+        """
+        Returns a BM25 retriever over the base docstore. The corpus is only
+        tokenized once per docstore contents and similarity_top_k, and the
+        index is persisted to bm25_persist_dir when set.
+        """
+        self._refresh_bm25_retrievers()
+        if similarity_top_k in self._bm25_retrievers:
+            return self._bm25_retrievers[similarity_top_k]
+
+        persist_path = None
+        if self.bm25_persist_dir:
+            persist_path = os.path.join(
+                self.bm25_persist_dir,
+                f"{self.firestore_db_name}_{self.firestore_namespace}_"
+                f"{self._docstore_fingerprint[:16]}_{similarity_top_k}",
+            )
+
+        if persist_path and os.path.exists(persist_path):
+            logger.info(f"Loading BM25 retriever from {persist_path}")
+            bm25_retriever = BM25Retriever.from_persist_dir(persist_path)
+        else:
+            logger.info("Building BM25 retriever from docstore")
+            bm25_retriever = BM25Retriever.from_defaults(
+                docstore=self.base_index.docstore,
+                similarity_top_k=similarity_top_k,
+                stemmer=Stemmer.Stemmer("english"),
+                language="english",
+            )
+            if persist_path:
+                bm25_retriever.persist(persist_path)
+
+        self._bm25_retrievers[similarity_top_k] = bm25_retriever
+        return bm25_retriever
 
     def get_vector_index(
         self,
@@ -224,8 +336,30 @@ class IndexManager:
     ) -> AsyncRetrieverQueryEngine:
         """
         Creates a llamaindex QueryEngine given a
-        VectorStoreIndex and hyperparameters
+        VectorStoreIndex and hyperparameters.
+        Query engines are memoized by their configuration.
         """
+        if hybrid_retrieval:
+            self._refresh_bm25_retrievers()
+
+        cache_key = (
+            llm_name,
+            temperature,
+            similarity_top_k,
+            retrieval_strategy,
+            use_hyde,
+            use_refine,
+            use_node_rerank,
+            qa_followup,
+            hybrid_retrieval,
+            tuple(sorted(prompts.to_dict().items())),
+        )
+        if cache_key in self._query_engines:
+            query_engine, llm = self._query_engines[cache_key]
+            Settings.llm = llm
+            self.query_engine = query_engine
+            return query_engine
+
         llm = self.get_vertex_llm(
             llm_name=llm_name,
             temperature=temperature,
@@ -265,26 +399,25 @@ class IndexManager:
             )
         elif retrieval_strategy == "parent":
             retriever = ParentRetriever(
-                base_retriever, docstore=self.base_index.docstore
+                base_retriever,
+                docstore=self.base_index.docstore,
+                node_cache=self.base_node_cache,
             )
         elif retrieval_strategy == "baseline":
             retriever = base_retriever
 
         if qa_followup:
             qa_retriever = QARetriever(
-                qa_vector_retriever=qa_vector_retriever, docstore=self.qa_index.docstore
+                qa_vector_retriever=qa_vector_retriever,
+                docstore=self.qa_index.docstore,
+                node_cache=self.qa_node_cache,
             )
             retriever = QAFollowupRetriever(
                 qa_retriever=qa_retriever, base_retriever=retriever
             )
 
         if hybrid_retrieval:
-            bm25_retriever = BM25Retriever.from_defaults(
-                docstore=self.base_index.docstore,
-                similarity_top_k=similarity_top_k,
-                stemmer=Stemmer.Stemmer("english"),
-                language="english",
-            )
+            bm25_retriever = self.get_bm25_retriever(similarity_top_k)
             retriever = QueryFusionRetriever(
                 [retriever, bm25_retriever],
                 similarity_top_k=similarity_top_k,
@@ -328,6 +461,7 @@ class IndexManager:
                 query_engine=query_engine, query_transform=hyde
             )
 
+        self._query_engines[cache_key] = (query_engine, llm)
         self.query_engine = query_engine
         return query_engine
 
@@ -0,0 +1,97 @@
+"""In-process LRU cache for batched document store lookups"""
+
+import asyncio
+from collections import OrderedDict
+import logging
+import threading
+
+from llama_index.core.schema import BaseNode
+from llama_index.core.storage.docstore import BaseDocumentStore
+
+logging.basicConfig(encoding="utf-8", level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class NodeCache:
+    """Fetches nodes by id from a document store in a single batch,
+    serving repeated ids from a bounded in-process LRU cache."""
+
+    def __init__(
+        self,
+        docstore: BaseDocumentStore,
+        max_nodes: int = 1024,
+        max_bytes: int | None = None,
+    ) -> None:
+        """
+        Caches up to max_nodes nodes of the given document store, and up to
+        max_bytes of node text when set, evicting the least recently used
+        ones first
+        """
+        self._docstore = docstore
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self._nodes: OrderedDict[str, BaseNode] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self.size_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_cached(self, node_ids: list[str]) -> tuple[dict[str, BaseNode], list[str]]:
+        """Returns the cached nodes and the unique ids missing from the cache"""
+        cached = {}
+        missing = []
+        with self._lock:
+            for node_id in dict.fromkeys(node_ids):
+                node = self._nodes.get(node_id)
+                if node is None:
+                    missing.append(node_id)
+                else:
+                    self._nodes.move_to_end(node_id)
+                    cached[node_id] = node
+            self.hits += len(cached)
+            self.misses += len(missing)
+        return cached, missing
+
+    def _put(self, nodes: list[BaseNode]) -> None:
+        with self._lock:
+            for node in nodes:
+                size = len(node.get_content().encode("utf-8"))
+                if self.max_bytes is not None and size > self.max_bytes:
+                    continue
+                self.size_bytes += size - self._sizes.get(node.node_id, 0)
+                self._sizes[node.node_id] = size
+                self._nodes[node.node_id] = node
+                self._nodes.move_to_end(node.node_id)
+            while len(self._nodes) > self.max_nodes or (
+                self.max_bytes is not None and self.size_bytes > self.max_bytes
+            ):
+                node_id, _ = self._nodes.popitem(last=False)
+                self.size_bytes -= self._sizes.pop(node_id)
+
+    def get_nodes(self, node_ids: list[str]) -> list[BaseNode]:
+        """Returns the nodes for node_ids, in order, fetching misses in one batch"""
+        nodes, missing = self._get_cached(node_ids)
+        if missing:
+            fetched = self._docstore.get_nodes(missing)
+            self._put(fetched)
+            nodes.update({node.node_id: node for node in fetched})
+        return [nodes[node_id] for node_id in node_ids]
+
+    async def aget_nodes(self, node_ids: list[str]) -> list[BaseNode]:
+        """Async version of get_nodes, fetching misses concurrently"""
+        nodes, missing = self._get_cached(node_ids)
+        if missing:
+            # docstore.aget_nodes awaits each node in turn, so gather instead
+            fetched = await asyncio.gather(
+                *(self._docstore.aget_node(node_id) for node_id in missing)
+            )
+            self._put(fetched)
+            nodes.update({node.node_id: node for node in fetched})
+        return [nodes[node_id] for node_id in node_ids]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._nodes.clear()
+            self._sizes.clear()
+            self.size_bytes = 0
@@ -2,11 +2,16 @@
 
 import logging
 
+from backend.rag.node_cache import NodeCache
 from llama_index.core import QueryBundle
 from llama_index.core.retrievers import BaseRetriever, VectorIndexRetriever
-from llama_index.core.schema import NodeRelationship, NodeWithScore, TextNode
+from llama_index.core.schema import (
+    BaseNode,
+    NodeRelationship,
+    NodeWithScore,
+    TextNode,
+)
 from llama_index.storage.docstore.firestore import FirestoreDocumentStore
-import pandas as pd
 
 # Set the desired logging level
 logging.basicConfig(encoding="utf-8", level=logging.INFO)
@@ -18,37 +23,65 @@ class ParentRetriever(BaseRetriever):
     the source document associated with a node."""
 
     def __init__(
-        self, vector_retriever: VectorIndexRetriever, docstore: FirestoreDocumentStore
+        self,
+        vector_retriever: VectorIndexRetriever,
+        docstore: FirestoreDocumentStore,
+        node_cache: NodeCache | None = None,
     ) -> None:
         """
-        This retriever uses a vector store to do initial node retriever and a documentstore to retrieve nodes by id
+        This retriever uses a vector store to do initial node retriever and a documentstore to retrieve nodes by id.
+        Source documents are fetched in one batch through node_cache,
+        which should be bounded in bytes since they are large.
         """
 
         self._vector_retriever = vector_retriever
         self._docstore = docstore
+        self._node_cache = node_cache or NodeCache(docstore)
         super().__init__()
 
+    @staticmethod
+    def _get_source_id_scores(
+        initial_nodes: list[NodeWithScore],
+    ) -> list[tuple[str, float]]:
+        """Averages the scores of the retrieved nodes per source document id,
+        in order of first appearance"""
+        score_sums: dict[str, float] = {}
+        counts: dict[str, int] = {}
+        for n in initial_nodes:
+            source_id = n.node.relationships[NodeRelationship.SOURCE].node_id
+            score_sums[source_id] = score_sums.get(source_id, 0.0) + (n.score or 0.0)
+            counts[source_id] = counts.get(source_id, 0) + 1
+        return [
+            (source_id, score_sum / counts[source_id])
+            for source_id, score_sum in score_sums.items()
+        ]
+
+    @staticmethod
+    def _to_source_nodes(
+        source_id_scores: list[tuple[str, float]], source_docs: list[BaseNode]
+    ) -> list[NodeWithScore]:
+        return [
+            NodeWithScore(
+                node=TextNode(id_=source_id, text=source_doc.text), score=score
+            )
+            for (source_id, score), source_doc in zip(source_id_scores, source_docs)
+        ]
+
     def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
         """Expand retrieved nodes into all their source documents"""
         initial_nodes = self._vector_retriever.retrieve(query_bundle)
-        node_source_id_score_df = pd.DataFrame(
-            [
-                {
-                    "source_id": n.node.relationships[NodeRelationship.SOURCE].node_id,
-                    "score": n.score,
-                }
-                for n in initial_nodes
-            ]
-        )
-        final_df = (
-            node_source_id_score_df.groupby("source_id")["score"].mean().reset_index()
+        source_id_scores = self._get_source_id_scores(initial_nodes)
+        source_docs = self._node_cache.get_nodes(
+            [source_id for source_id, _ in source_id_scores]
         )
-        unique_source_doc_ids_scores = final_df.to_dict("records")
+        return self._to_source_nodes(source_id_scores, source_docs)
 
-        source_docs = []
-        for doc_score in unique_source_doc_ids_scores:
-            source_doc = self._docstore.get_document(doc_score["source_id"])
-            node = TextNode(id_=doc_score["source_id"], text=source_doc.text)
-            source_docs.append(NodeWithScore(node=node, score=doc_score["score"]))
-
-        return source_docs
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        """Expand retrieved nodes into all their source documents without
+        blocking the event loop"""
+        initial_nodes = await self._vector_retriever.aretrieve(query_bundle)
+        source_id_scores = self._get_source_id_scores(initial_nodes)
+        source_docs = await self._node_cache.aget_nodes(
+            [source_id for source_id, _ in source_id_scores]
+        )
+        return self._to_source_nodes(source_id_scores, source_docs)
@@ -1,8 +1,10 @@
 """Custom retriever which implements
 retrieval based on hypothetical questions"""
 
+import asyncio
 import logging
 
+from backend.rag.node_cache import NodeCache
 from llama_index.core import QueryBundle
 from llama_index.core.retrievers import BaseRetriever, VectorIndexRetriever
 from llama_index.core.schema import NodeRelationship, NodeWithScore
@@ -21,48 +23,44 @@ class QARetriever(BaseRetriever):
         self,
         qa_vector_retriever: VectorIndexRetriever,
         docstore: FirestoreDocumentStore,
+        node_cache: NodeCache | None = None,
     ) -> None:
         """
         This retriever uses a vector store to do
-        initial node retriever and a documentstore to retrieve nodes by id
+        initial node retriever and a documentstore to retrieve nodes by id.
+        Source nodes are fetched in one batch through node_cache.
         """
 
         self._qa_vector_retriever = qa_vector_retriever
         self._docstore = docstore
+        self._node_cache = node_cache or NodeCache(docstore)
         super().__init__()
 
-    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
-        qa_nodes = self._qa_vector_retriever.retrieve(query_bundle)
-        og_docs = []
+    @staticmethod
+    def _get_source_doc_ids(qa_nodes: list[NodeWithScore]) -> list[str]:
+        source_doc_ids = []
         for nodewscore in qa_nodes:
-            logger.info(nodewscore.node.text)
-            source_doc_id = nodewscore.node.relationships[
-                NodeRelationship.SOURCE
-            ].node_id
-            og_docs.append(
-                NodeWithScore(
-                    node=self._docstore.get_document(source_doc_id),
-                    score=nodewscore.score,
-                )
+            logger.info(f"Matched Question: {nodewscore.node.text}")
+            source_doc_ids.append(
+                nodewscore.node.relationships[NodeRelationship.SOURCE].node_id
             )
+        return source_doc_ids
 
-        return og_docs
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        qa_nodes = self._qa_vector_retriever.retrieve(query_bundle)
+        og_docs = self._node_cache.get_nodes(self._get_source_doc_ids(qa_nodes))
+        return [
+            NodeWithScore(node=og_doc, score=nodewscore.score)
+            for og_doc, nodewscore in zip(og_docs, qa_nodes)
+        ]
 
     async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
         qa_nodes = await self._qa_vector_retriever.aretrieve(query_bundle)
-        og_docs = []
-        for nodewscore in qa_nodes:
-            logger.info(f"Matched Question: {nodewscore.node.text}")
-            source_doc_id = nodewscore.node.relationships[
-                NodeRelationship.SOURCE
-            ].node_id
-            og_docs.append(
-                NodeWithScore(
-                    node=self._docstore.get_document(source_doc_id),
-                    score=nodewscore.score,
-                )
-            )
-        return og_docs
+        og_docs = await self._node_cache.aget_nodes(self._get_source_doc_ids(qa_nodes))
+        return [
+            NodeWithScore(node=og_doc, score=nodewscore.score)
+            for og_doc, nodewscore in zip(og_docs, qa_nodes)
+        ]
 
 
 class QAFollowupRetriever(BaseRetriever):
@@ -82,10 +80,10 @@ class QAFollowupRetriever(BaseRetriever):
         self._base_retriever = base_retriever
         super().__init__()
 
-    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
-        am_nodes = self._base_retriever.retrieve(query_bundle)
-        qa_nodes = self._qa_retriever.retrieve(query_bundle)
-
+    @staticmethod
+    def _combine(
+        am_nodes: list[NodeWithScore], qa_nodes: list[NodeWithScore]
+    ) -> list[NodeWithScore]:
         am_ids = {n.node.node_id for n in am_nodes}
         qa_ids = {n.node.node_id for n in qa_nodes}
         num_qa_ids = len(qa_ids)
@@ -98,18 +96,15 @@ class QAFollowupRetriever(BaseRetriever):
         retrieve_nodes = [combined_dict[rid] for rid in retrieve_ids]
         return retrieve_nodes
 
-    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
-        am_nodes = await self._base_retriever.aretrieve(query_bundle)
-        qa_nodes = await self._qa_retriever.aretrieve(query_bundle)
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        am_nodes = self._base_retriever.retrieve(query_bundle)
+        qa_nodes = self._qa_retriever.retrieve(query_bundle)
+        return self._combine(am_nodes, qa_nodes)
 
-        am_ids = {n.node.node_id for n in am_nodes}
-        qa_ids = {n.node.node_id for n in qa_nodes}
-        num_qa_ids = len(qa_ids)
-        num_am_ids = len(am_ids)
-        logger.info(f"number of nodes found with question matching {num_qa_ids}")
-        logger.info(f"number of nodes found with base retriever: {num_am_ids}")
-        combined_dict = {n.node.node_id: n for n in am_nodes}
-        combined_dict.update({n.node.node_id: n for n in qa_nodes})
-        retrieve_ids = am_ids.union(qa_ids)
-        retrieve_nodes = [combined_dict[rid] for rid in retrieve_ids]
-        return retrieve_nodes
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        # Both retrievals are independent round trips, so run them concurrently
+        am_nodes, qa_nodes = await asyncio.gather(
+            self._base_retriever.aretrieve(query_bundle),
+            self._qa_retriever.aretrieve(query_bundle),
+        )
+        return self._combine(am_nodes, qa_nodes)
@@ -1,6 +1,7 @@
 import os
 
 from backend.rag.index_manager import IndexManager
+from backend.rag.prompts import Prompts
 import yaml
 
 # Load configuration from config.yaml
@@ -59,3 +60,30 @@ def test_no_qa_vector_store():
     assert index_manager.qa_index == None
     assert index_manager.qa_endpoint_name == None
     assert index_manager.qa_index_name == None
+
+
+def test_query_engine_on_new_manager():
+    index_manager = IndexManager(
+        project_id=PROJECT_ID,
+        location=LOCATION,
+        embeddings_model_name=EMBEDDINGS_MODEL_NAME,
+        base_index_name=VECTOR_INDEX_NAME,
+        base_endpoint_name=INDEX_ENDPOINT_NAME,
+        qa_index_name=QA_INDEX_NAME,
+        qa_endpoint_name=QA_ENDPOINT_NAME,
+        firestore_db_name=FIRESTORE_DB_NAME,
+        firestore_namespace=FIRESTORE_NAMESPACE,
+        vs_bucket_name=BUCKET_NAME,
+    )
+    assert index_manager.base_node_cache is not None
+    query_engine = index_manager.get_query_engine(
+        prompts=Prompts(), retrieval_strategy="parent", hybrid_retrieval=False
+    )
+    assert query_engine is not None
+    assert (
+        index_manager.get_query_engine(
+            prompts=Prompts(), retrieval_strategy="parent", hybrid_retrieval=False
+        )
+        is query_engine
+    )
+    index_manager.clear_cache()
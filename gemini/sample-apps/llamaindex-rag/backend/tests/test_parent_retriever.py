@@ -0,0 +1,79 @@
+import asyncio
+
+from backend.rag.node_cache import NodeCache
+from backend.rag.parent_retriever import ParentRetriever
+from llama_index.core import QueryBundle
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import (
+    NodeRelationship,
+    NodeWithScore,
+    RelatedNodeInfo,
+    TextNode,
+)
+from llama_index.core.storage.docstore import SimpleDocumentStore
+
+
+class StaticRetriever(BaseRetriever):
+    def __init__(self, nodes: list[NodeWithScore]) -> None:
+        self._nodes = nodes
+        super().__init__()
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        return self._nodes
+
+
+def make_child(node_id: str, source_id: str, score: float) -> NodeWithScore:
+    node = TextNode(
+        id_=node_id,
+        text=node_id,
+        relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=source_id)},
+    )
+    return NodeWithScore(node=node, score=score)
+
+
+def make_retriever() -> tuple[ParentRetriever, NodeCache]:
+    docstore = SimpleDocumentStore()
+    docstore.add_documents(
+        [TextNode(id_="a", text="parent a"), TextNode(id_="b", text="parent b")]
+    )
+    children = [
+        make_child("a1", "a", 0.8),
+        make_child("b1", "b", 0.5),
+        make_child("a2", "a", 0.6),
+    ]
+    node_cache = NodeCache(docstore, max_bytes=1024)
+    retriever = ParentRetriever(
+        StaticRetriever(children), docstore=docstore, node_cache=node_cache
+    )
+    return retriever, node_cache
+
+
+def test_parent_retriever_averages_scores_per_source():
+    retriever, _ = make_retriever()
+    nodes = retriever.retrieve("query")
+    assert [(n.node.node_id, n.node.text) for n in nodes] == [
+        ("a", "parent a"),
+        ("b", "parent b"),
+    ]
+    assert [round(n.score, 2) for n in nodes] == [0.7, 0.5]
+
+
+def test_parent_retriever_async_uses_node_cache():
+    retriever, node_cache = make_retriever()
+    sync_nodes = retriever.retrieve("query")
+    async_nodes = asyncio.run(retriever.aretrieve("query"))
+    assert [n.node.text for n in async_nodes] == [n.node.text for n in sync_nodes]
+    assert node_cache.misses == 2
+    assert node_cache.hits == 2
+
+
+def test_node_cache_bounded_in_bytes():
+    docstore = SimpleDocumentStore()
+    docstore.add_documents([TextNode(id_=str(i), text="x" * 10) for i in range(5)])
+    node_cache = NodeCache(docstore, max_bytes=25)
+    node_cache.get_nodes(["0", "1", "2"])
+    assert node_cache.size_bytes == 20
+    node_cache.get_nodes(["1"])
+    assert node_cache.hits == 1
+    node_cache.get_nodes(["0"])
+    assert node_cache.misses == 4
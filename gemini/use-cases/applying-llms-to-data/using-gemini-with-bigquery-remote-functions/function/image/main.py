@@ -12,52 +12,100 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
+import threading
 
 import functions_framework
 import vertexai
+from response_cache import create_response_cache_from_env
 from vertexai.generative_models import GenerativeModel, Part
 
+VISION_MODEL_NAME = "gemini-1.0-pro-vision"
 
-@functions_framework.http
-def list_url(request) -> str | tuple[str, int]:
+# Upper bound on concurrent Gemini requests per remote-function batch
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", "8"))
+
+_vision_model: GenerativeModel | None = None
+_vision_model_lock = threading.Lock()
+
+# Descriptions are cached by a hash of the model name and image URI,
+# see response_cache
+response_cache = create_response_cache_from_env()
+
+
+def get_vision_model() -> GenerativeModel:
+    """Initializes Vertex AI and the vision model once per instance."""
+    global _vision_model
+    with _vision_model_lock:
+        if _vision_model is None:
+            project_id = os.environ.get("PROJECT_ID")
+            region = os.environ.get("REGION")
+            vertexai.init(project=project_id, location=region)
+            _vision_model = GenerativeModel(VISION_MODEL_NAME)
+            print(_vision_model)
+    return _vision_model
+
+
+def list_url(request) -> list[str]:
+    """Returns the image URL of every call in the batch, in order."""
     print(request)
-    try:
-        request_json = request.get_json()
-        calls = request_json["calls"]
-        for call in calls:
-            image_url = str(call[0])
-            print(image_url)
-        return image_url
-    except Exception as e:
-        return json.dumps({"errorMessage": str(e)}), 400
+    request_json = request.get_json()
+    return [str(call[0]) for call in request_json["calls"]]
 
 
 def analyze_image(image_file) -> str | None:
-    gemini_pro_vision_model = GenerativeModel("gemini-1.0-pro-vision")
-    print(gemini_pro_vision_model)
+    if response_cache:
+        cache_key = response_cache.make_key(VISION_MODEL_NAME, image_file)
+        cached_output = response_cache.get(cache_key)
+        if cached_output is not None:
+            return cached_output
+
     image = Part.from_uri(image_file, mime_type="image/jpeg")
     print(image)
     context = """Describe and summarize this image.
       Use no more than 5 sentences to do so"""
     prompt = [context, image]
     print(prompt)
-    response = gemini_pro_vision_model.generate_content(prompt, stream=False)
+    response = get_vision_model().generate_content(prompt, stream=False)
     print(response)
     output = " ".join(response.text.strip().split("\n"))
     print(output)
+    if response_cache and output:
+        response_cache.set(cache_key, output)
     return output
 
 
+def describe_image(image_url: str) -> str:
+    """Describes one image, or returns an error message for this row only."""
+    try:
+        return analyze_image(image_url) or "Unable to generate description"
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return f"Error: {e}"
+
+
+def analyze_images(image_urls: list[str]) -> list[str]:
+    """Describes every image, calling the model once per unique image URL."""
+    unique_urls = list(dict.fromkeys(image_urls))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        descriptions = dict(zip(unique_urls, executor.map(describe_image, unique_urls)))
+    log_batch_metrics(len(image_urls), len(unique_urls))
+    return [descriptions[image_url] for image_url in image_urls]
+
+
+def log_batch_metrics(num_calls: int, num_unique: int) -> None:
+    """Logs the batch size and response cache hit rate as a structured log."""
+    metrics = {"calls": num_calls, "unique_inputs": num_unique}
+    if response_cache:
+        metrics.update(response_cache.stats())
+    print(json.dumps({"message": "remote function batch", **metrics}))
+
+
+@functions_framework.http
 def run_it(request) -> str | tuple[str, int]:
     try:
-        project_id = os.environ.get("PROJECT_ID")
-        region = os.environ.get("REGION")
-        vertexai.init(project=project_id, location=region)
-        file_to_analyze = list_url(request)
-        image_description = analyze_image(file_to_analyze)
-        result = image_description or "Unable to generate description"
-        return json.dumps({"replies": [result]})
+        image_urls = list_url(request)
+        return json.dumps({"replies": analyze_images(image_urls)})
     except Exception as e:
         return json.dumps({"errorMessage": str(e)}), 400
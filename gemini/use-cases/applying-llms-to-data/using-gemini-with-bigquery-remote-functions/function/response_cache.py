@@ -0,0 +1,218 @@
+# Copyright 2023 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Content-hash keyed cache of model responses for the remote functions.
+
+The backend is chosen with the RESPONSE_CACHE_BACKEND environment variable:
+"memory" (in-process LRU, the default), "disk" (SQLite file), "redis"
+(any Redis-compatible store at REDIS_URL) or "none".
+
+The text and image functions share this module: Terraform packages it next to
+the main.py of each function.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+
+class CacheBackend(ABC):
+    """Stores string values by key with an expiry time."""
+
+    @abstractmethod
+    def get(self, key: str) -> str | None:
+        """Returns the value stored for key, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        """Stores value for key, expiring after ttl_seconds."""
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU cache holding at most max_entries values."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskCacheBackend(CacheBackend):
+    """SQLite cache on local disk holding at most max_entries values."""
+
+    def __init__(self, directory: str, max_entries: int) -> None:
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(
+            os.path.join(directory, "response_cache.sqlite"), check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return row[0]
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl_seconds, now),
+            )
+            self._connection.execute(
+                "DELETE FROM responses WHERE expires_at < ?", (now,)
+            )
+            self._connection.execute(
+                """DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache in a Redis-compatible store.
+
+    The client only needs `get(key)` and `set(key, value, ex=ttl_seconds)`, so
+    a local stand-in can replace Redis. The size bound is the store's
+    maxmemory eviction policy.
+    """
+
+    def __init__(self, client: Any, key_prefix: str = "response-cache:") -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def get(self, key: str) -> str | None:
+        value = self.client.get(self.key_prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self.client.set(self.key_prefix + key, value, ex=ttl_seconds)
+
+
+class ResponseCache:
+    """Caches model responses by a hash of the model name and inputs."""
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: int) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_name: str, *inputs: str) -> str:
+        payload = json.dumps([model_name, *inputs])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        try:
+            value = self.backend.get(key)
+        except Exception as e:  # the cache must never fail a request
+            print(f"Response cache get failed: {e}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        try:
+            self.backend.set(key, value, self.ttl_seconds)
+        except Exception as e:
+            print(f"Response cache set failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def create_response_cache_from_env() -> ResponseCache | None:
+    """Creates the response cache configured by the environment, if enabled."""
+    backend_name = os.environ.get("RESPONSE_CACHE_BACKEND", "memory").lower()
+    ttl_seconds = int(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+    max_entries = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+
+    if backend_name == "none":
+        return None
+    backend: CacheBackend
+    if backend_name == "memory":
+        backend = LRUCacheBackend(max_entries)
+    elif backend_name == "disk":
+        directory = os.environ.get("RESPONSE_CACHE_DIR", "/tmp/response_cache")
+        backend = DiskCacheBackend(directory, max_entries)
+    elif backend_name == "redis":
+        import redis  # only needed for the redis backend
+
+        backend = RedisCacheBackend(redis.Redis.from_url(os.environ["REDIS_URL"]))
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend_name}")
+
+    return ResponseCache(backend, ttl_seconds)
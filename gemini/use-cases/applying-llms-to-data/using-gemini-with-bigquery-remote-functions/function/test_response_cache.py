@@ -0,0 +1,142 @@
+# Copyright 2023 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the response cache shared by the remote functions."""
+
+from collections.abc import Callable
+from pathlib import Path
+import sys
+import time
+import types
+
+import pytest
+from response_cache import (
+    CacheBackend,
+    DiskCacheBackend,
+    LRUCacheBackend,
+    RedisCacheBackend,
+    ResponseCache,
+    create_response_cache_from_env,
+)
+
+
+class FakeRedis:
+    """Stores values in memory, returning bytes like redis-py."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.expiries: dict[str, int | None] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value.encode("utf-8")
+        self.expiries[key] = ex
+
+
+class FakeClock:
+    """Replaces time.time with a clock that only moves when advanced."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(time, "time", fake_clock)
+    return fake_clock
+
+
+@pytest.fixture(params=["memory", "disk"])
+def make_backend(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> Callable[[int], CacheBackend]:
+    def make(max_entries: int) -> CacheBackend:
+        if request.param == "memory":
+            return LRUCacheBackend(max_entries)
+        return DiskCacheBackend(str(tmp_path), max_entries)
+
+    return make
+
+
+def test_backend_expires_entries(
+    make_backend: Callable[[int], CacheBackend], clock: FakeClock
+) -> None:
+    backend = make_backend(10)
+    backend.set("key", "value", ttl_seconds=60)
+
+    clock.now += 59
+    assert backend.get("key") == "value"
+
+    clock.now += 2
+    assert backend.get("key") is None
+
+
+def test_backend_evicts_least_recently_used(
+    make_backend: Callable[[int], CacheBackend], clock: FakeClock
+) -> None:
+    backend = make_backend(2)
+    backend.set("a", "1", ttl_seconds=60)
+    clock.now += 1
+    backend.set("b", "2", ttl_seconds=60)
+    clock.now += 1
+    # Reading "a" makes "b" the least recently used entry
+    assert backend.get("a") == "1"
+    clock.now += 1
+    backend.set("c", "3", ttl_seconds=60)
+
+    assert backend.get("a") == "1"
+    assert backend.get("b") is None
+    assert backend.get("c") == "3"
+
+
+def test_redis_backend_round_trip() -> None:
+    client = FakeRedis()
+    cache = ResponseCache(RedisCacheBackend(client), ttl_seconds=60)
+    key = cache.make_key("gemini-pro", "prompt")
+
+    assert cache.get(key) is None
+    cache.set(key, "response")
+
+    assert cache.get(key) == "response"
+    assert client.expiries == {f"response-cache:{key}": 60}
+    assert cache.stats()["cache_hits"] == 1
+    assert cache.stats()["cache_misses"] == 1
+
+
+def test_redis_backend_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = FakeRedis()
+    fake_redis = types.SimpleNamespace(
+        Redis=types.SimpleNamespace(from_url=lambda url: client)
+    )
+    monkeypatch.setitem(sys.modules, "redis", fake_redis)
+    monkeypatch.setenv("RESPONSE_CACHE_BACKEND", "redis")
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+
+    cache = create_response_cache_from_env()
+    assert cache is not None
+    cache.set("key", "value")
+
+    assert isinstance(cache.backend, RedisCacheBackend)
+    assert cache.get("key") == "value"
+
+
+def test_cache_backend_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        CacheBackend()  # type: ignore[abstract]
@@ -12,46 +12,97 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
+import threading
 
 import functions_framework
 import vertexai
+from response_cache import create_response_cache_from_env
 from vertexai.generative_models import GenerativeModel
 
+TEXT_MODEL_NAME = "gemini-1.0-pro"
 
-@functions_framework.http
-def list_text_input(request) -> str | tuple[str, int]:
+# Upper bound on concurrent Gemini requests per remote-function batch
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", "8"))
+
+_text_model: GenerativeModel | None = None
+_text_model_lock = threading.Lock()
+
+# Responses are cached by a hash of the model name and prompt, see response_cache
+response_cache = create_response_cache_from_env()
+
+
+def get_text_model() -> GenerativeModel:
+    """Initializes Vertex AI and the text model once per instance."""
+    global _text_model
+    with _text_model_lock:
+        if _text_model is None:
+            project_id = os.environ.get("PROJECT_ID")
+            region = os.environ.get("REGION")
+            vertexai.init(project=project_id, location=region)
+            # this is the text-to-text model
+            _text_model = GenerativeModel(TEXT_MODEL_NAME)
+    return _text_model
+
+
+def list_text_input(request) -> list[str]:
+    """Returns the text prompt of every call in the batch, in order."""
     print(request)
-    try:
-        request_json = request.get_json()
-        calls = request_json["calls"]
-        for call in calls:
-            text_prompt = str(call[0])
-            print(text_prompt)
-        return text_prompt
-    except Exception as e:
-        return json.dumps({"errorMessage": str(e)}), 400
+    request_json = request.get_json()
+    return [str(call[0]) for call in request_json["calls"]]
 
 
 def generate_text_from_prompt(text_string) -> str | None:
-    # this is the text-to-text model
-    text_model = GenerativeModel("gemini-1.0-pro")
-    responses = text_model.generate_content(text_string, stream=False)
+    if response_cache:
+        cache_key = response_cache.make_key(TEXT_MODEL_NAME, text_string)
+        cached_output = response_cache.get(cache_key)
+        if cached_output is not None:
+            return cached_output
+
+    responses = get_text_model().generate_content(text_string, stream=False)
     print(responses)
     output = " ".join(responses.text.strip().split("\n"))
     print(output)
+    if response_cache and output:
+        response_cache.set(cache_key, output)
     return output
 
 
+def generate_reply(text_prompt: str) -> str:
+    """Generates the reply to one prompt, or an error message for this row only."""
+    try:
+        return (
+            generate_text_from_prompt(text_prompt) or "Unable to generate description"
+        )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return f"Error: {e}"
+
+
+def generate_replies(text_prompts: list[str]) -> list[str]:
+    """Generates one reply per prompt, calling the model once per unique prompt."""
+    unique_prompts = list(dict.fromkeys(text_prompts))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        outputs = dict(
+            zip(unique_prompts, executor.map(generate_reply, unique_prompts))
+        )
+    log_batch_metrics(len(text_prompts), len(unique_prompts))
+    return [outputs[text_prompt] for text_prompt in text_prompts]
+
+
+def log_batch_metrics(num_calls: int, num_unique: int) -> None:
+    """Logs the batch size and response cache hit rate as a structured log."""
+    metrics = {"calls": num_calls, "unique_inputs": num_unique}
+    if response_cache:
+        metrics.update(response_cache.stats())
+    print(json.dumps({"message": "remote function batch", **metrics}))
+
+
+@functions_framework.http
 def run_it(request) -> str | tuple[str, int]:
     try:
-        project_id = os.environ.get("PROJECT_ID")
-        region = os.environ.get("REGION")
-        vertexai.init(project=project_id, location=region)
-        text_to_analyze = list_text_input(request)
-        text_output = generate_text_from_prompt(text_to_analyze)
-        result = text_output or "Unable to generate description"
-        return json.dumps({"replies": [result]})
+        text_prompts = list_text_input(request)
+        return json.dumps({"replies": generate_replies(text_prompts)})
     except Exception as e:
         return json.dumps({"errorMessage": str(e)}), 400
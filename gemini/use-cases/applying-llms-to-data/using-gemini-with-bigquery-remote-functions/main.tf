@@ -68,14 +68,40 @@ resource "random_id" "id" {
 data "archive_file" "create_image_function_zip" {
   type        = "zip"
   output_path = "${path.root}/tmp/image_function_source.zip"
-  source_dir  = "${path.root}/function/image/"
+
+  source {
+    content  = file("${path.root}/function/image/main.py")
+    filename = "main.py"
+  }
+  source {
+    content  = file("${path.root}/function/image/requirements.txt")
+    filename = "requirements.txt"
+  }
+  # Shared by both functions
+  source {
+    content  = file("${path.root}/function/response_cache.py")
+    filename = "response_cache.py"
+  }
 }
 
 # Define/create zip file as a source for the image analysis Cloud Function
 data "archive_file" "create_text_function_zip" {
   type        = "zip"
   output_path = "${path.root}/tmp/text_function_source.zip"
-  source_dir  = "${path.root}/function/text/"
+
+  source {
+    content  = file("${path.root}/function/text/main.py")
+    filename = "main.py"
+  }
+  source {
+    content  = file("${path.root}/function/text/requirements.txt")
+    filename = "requirements.txt"
+  }
+  # Shared by both functions
+  source {
+    content  = file("${path.root}/function/response_cache.py")
+    filename = "response_cache.py"
+  }
 }
 
 # Wait until after the APIs are activated to being setting up infrastructure
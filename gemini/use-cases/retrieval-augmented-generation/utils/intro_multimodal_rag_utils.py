@@ -1,6 +1,13 @@
-from collections.abc import Iterable
+from abc import ABC, abstractmethod
+import atexit
+from collections.abc import Callable, Container, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 import glob
+import hashlib
+import json
 import os
+import sqlite3
+import threading
 import time
 from typing import Any
 
@@ -20,12 +27,223 @@ from vertexai.language_models import TextEmbeddingModel
 from vertexai.vision_models import Image as vision_model_Image
 from vertexai.vision_models import MultiModalEmbeddingModel
 
-text_embedding_model = TextEmbeddingModel.from_pretrained("textembedding-gecko@latest")
+TEXT_EMBEDDING_MODEL_NAME = "textembedding-gecko@latest"
+MULTIMODAL_EMBEDDING_MODEL_NAME = "multimodalembedding@001"
+
+text_embedding_model = TextEmbeddingModel.from_pretrained(TEXT_EMBEDDING_MODEL_NAME)
 multimodal_embedding_model = MultiModalEmbeddingModel.from_pretrained(
-    "multimodalembedding@001"
+    MULTIMODAL_EMBEDDING_MODEL_NAME
 )
 
 
+# Persistent cache for embeddings and Gemini responses
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed cache of embeddings and Gemini image descriptions.
+
+    Entries are keyed by the model name plus a SHA-256 hash of the model input and are
+    stored in a SQLite database, so re-indexing an unchanged PDF folder costs no API
+    calls. Once the stored values exceed `max_size_bytes`, the least recently used
+    entries are evicted. The cache is safe to share between threads, but not between
+    processes, as the total size of the values is tracked in memory.
+
+    Reads do not write to the database: access times are buffered and written in one
+    transaction every `access_flush_size` hits, before an eviction, and on `close()`.
+    The cache is closed at interpreter exit, or when used as a context manager.
+
+    Args:
+        cache_path: Path of the SQLite database file. Created if it does not exist.
+        max_size_bytes: Upper bound on the total size of the cached values.
+        access_flush_size: Number of buffered access times that triggers a write.
+    """
+
+    def __init__(
+        self,
+        cache_path: str = ".cache/multimodal_rag_cache.sqlite",
+        max_size_bytes: int = 1024**3,
+        access_flush_size: int = 256,
+    ) -> None:
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.cache_path = cache_path
+        self.max_size_bytes = max_size_bytes
+        self.access_flush_size = access_flush_size
+        self.hits = 0
+        self.misses = 0
+        self._pending_access: dict[str, float] = {}
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)"
+        )
+        self._connection.commit()
+        self._total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache"
+        ).fetchone()[0]
+        self._closed = False
+        atexit.register(self.close)
+
+    def __enter__(self) -> "EmbeddingCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def make_key(model_name: str, *inputs: str | bytes) -> str:
+        """Builds a cache key from the model name and a hash of the model inputs."""
+        digest = hashlib.sha256()
+        for model_input in inputs:
+            if isinstance(model_input, str):
+                model_input = model_input.encode("utf-8")
+            # Length-prefix each input so that ("ab", "c") and ("a", "bc") differ
+            digest.update(len(model_input).to_bytes(8, "big"))
+            digest.update(model_input)
+
+        return f"{model_name}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Any | None:
+        """Returns the cached value for `key`, or None on a miss."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._pending_access[key] = time.time()
+            if len(self._pending_access) >= self.access_flush_size:
+                self._flush_access()
+                self._connection.commit()
+
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Stores a JSON-serializable `value` under `key`, evicting LRU entries if full."""
+        data = json.dumps(value)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            self._pending_access.pop(key, None)
+            self._total_size += len(data) - (row[0] if row else 0)
+            if self._total_size > self.max_size_bytes:
+                self._evict()
+            self._connection.commit()
+
+    def _flush_access(self) -> None:
+        """Writes the buffered access times. The caller holds the lock and commits."""
+        if self._pending_access:
+            self._connection.executemany(
+                "UPDATE cache SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+
+    def _evict(self) -> None:
+        # The buffered access times decide which entries are least recently used
+        self._flush_access()
+        evicted_keys = []
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM cache ORDER BY last_access"
+        ):
+            if self._total_size <= self.max_size_bytes:
+                break
+            evicted_keys.append((key,))
+            self._total_size -= size
+
+        self._connection.executemany("DELETE FROM cache WHERE key = ?", evicted_keys)
+
+    def flush(self) -> None:
+        """Writes the buffered access times to the database."""
+        with self._lock:
+            self._flush_access()
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Writes the buffered access times and closes the database. Idempotent."""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_access()
+            self._connection.commit()
+            self._connection.close()
+            self._closed = True
+        atexit.unregister(self.close)
+
+    def stats(self) -> dict[str, Any]:
+        """Returns hit/miss counters and the current number and size of entries."""
+        with self._lock:
+            (entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM cache"
+            ).fetchone()
+            size_bytes = self._total_size
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size_bytes,
+        }
+
+    def clear(self) -> None:
+        """Removes all entries and resets the hit/miss counters."""
+        with self._lock:
+            self._connection.execute("DELETE FROM cache")
+            self._connection.commit()
+            self._pending_access.clear()
+            self._total_size = 0
+            self.hits = 0
+            self.misses = 0
+
+
+# Cache used by the embedding and Gemini helpers below. Disabled (None) by default.
+embedding_cache: EmbeddingCache | None = None
+
+
+def enable_embedding_cache(
+    cache_path: str = ".cache/multimodal_rag_cache.sqlite",
+    max_size_bytes: int = 1024**3,
+) -> EmbeddingCache:
+    """
+    Enables the persistent cache for text/image embeddings and Gemini responses.
+
+    Args:
+        cache_path: Path of the SQLite database file.
+        max_size_bytes: Upper bound on the total size of the cached values.
+
+    Returns:
+        The EmbeddingCache now in use, e.g. to inspect `stats()`.
+    """
+    global embedding_cache
+    if embedding_cache is not None:
+        embedding_cache.close()
+    embedding_cache = EmbeddingCache(cache_path, max_size_bytes)
+    return embedding_cache
+
+
 # Functions for getting text and image embeddings
 
 
@@ -46,8 +264,19 @@ def get_text_embedding_from_text_embedding_model(
                                The format (list or NumPy array) depends on the
                                value of the 'return_array' parameter.
     """
-    embeddings = text_embedding_model.get_embeddings([text])
-    text_embedding = [embedding.values for embedding in embeddings][0]
+    cache_key = None
+    text_embedding = None
+    cache = embedding_cache
+    if cache is not None:
+        cache_key = EmbeddingCache.make_key(TEXT_EMBEDDING_MODEL_NAME, text)
+        text_embedding = cache.get(cache_key)
+
+    if text_embedding is None:
+        embeddings = text_embedding_model.get_embeddings([text])
+        text_embedding = [embedding.values for embedding in embeddings][0]
+
+        if cache is not None and cache_key is not None:
+            cache.set(cache_key, text_embedding)
 
     if return_array:
         return np.fromiter(text_embedding, dtype=float)
@@ -56,6 +285,45 @@ def get_text_embedding_from_text_embedding_model(
     return text_embedding
 
 
+def get_text_embeddings_from_text_embedding_model(
+    texts: list[str], before_request: Callable[[], None] | None = None
+) -> list[list]:
+    """
+    Generates text embeddings for a batch of texts with a single call to the text embedding model.
+
+    Args:
+        texts: The input text strings to be embedded. The batch must fit within the
+               per-request instance and token limits of the embedding API.
+        before_request: Optional callable run just before the API request, e.g. to
+                        acquire a rate limiter token. Not run when every text is cached.
+
+    Returns:
+        list: One embedding (list of floats) per input text, in the same order.
+    """
+    if embedding_cache is None:
+        if before_request is not None:
+            before_request()
+        embeddings = text_embedding_model.get_embeddings(texts)
+        return [embedding.values for embedding in embeddings]
+
+    cache_keys = [
+        EmbeddingCache.make_key(TEXT_EMBEDDING_MODEL_NAME, text) for text in texts
+    ]
+    text_embeddings = [embedding_cache.get(cache_key) for cache_key in cache_keys]
+
+    # Only send the texts that are not cached yet
+    missing = [i for i, embedding in enumerate(text_embeddings) if embedding is None]
+    if missing:
+        if before_request is not None:
+            before_request()
+        embeddings = text_embedding_model.get_embeddings([texts[i] for i in missing])
+        for i, embedding in zip(missing, embeddings):
+            text_embeddings[i] = embedding.values
+            embedding_cache.set(cache_keys[i], embedding.values)
+
+    return text_embeddings
+
+
 def get_image_embedding_from_multimodal_embedding_model(
     image_uri: str,
     embedding_size: int = 512,
@@ -75,15 +343,39 @@ def get_image_embedding_from_multimodal_embedding_model(
     Returns:
         list: A list containing the image embedding values. If `return_array` is True, returns a NumPy array instead.
     """
-    image = vision_model_Image.load_from_file(image_uri)
-    embeddings = multimodal_embedding_model.get_embeddings(
-        image=image, contextual_text=text, dimension=embedding_size
-    )  # 128, 256, 512, 1408
+    cache_key = None
+    image_embedding = None
+    cache = embedding_cache
+    if cache is not None:
+        # Local images are keyed by content, remote ones by URI
+        if os.path.exists(image_uri):
+            with open(image_uri, "rb") as image_file:
+                image_key_input: str | bytes = image_file.read()
+        else:
+            image_key_input = image_uri
+
+        cache_key = EmbeddingCache.make_key(
+            MULTIMODAL_EMBEDDING_MODEL_NAME,
+            image_key_input,
+            text or "",
+            str(embedding_size),
+        )
+        image_embedding = cache.get(cache_key)
+
+    if image_embedding is None:
+        image = vision_model_Image.load_from_file(image_uri)
+        embeddings = multimodal_embedding_model.get_embeddings(
+            image=image, contextual_text=text, dimension=embedding_size
+        )  # 128, 256, 512, 1408
+        image_embedding = embeddings.image_embedding
+
+        if cache is not None and cache_key is not None:
+            cache.set(cache_key, image_embedding)
 
     if return_array:
-        return np.fromiter(embeddings.image_embedding, dtype=float)
+        return np.fromiter(image_embedding, dtype=float)
 
-    return embeddings.image_embedding
+    return image_embedding
 
 
 def get_text_overlapping_chunk(
@@ -259,6 +551,44 @@ def get_image_for_gemini(
     return image_for_gemini, image_name
 
 
+def get_gemini_response_cache_key(
+    generative_multimodal_model,
+    model_input: list,
+    generation_config: GenerationConfig | None,
+    safety_settings: dict | None,
+) -> str | None:
+    """
+    Builds the EmbeddingCache key of a Gemini request.
+
+    Args:
+        generative_multimodal_model: The Gemini model the request is sent to.
+        model_input: A list of strings and Gemini Image objects.
+        generation_config: The generation config of the request.
+        safety_settings: The safety settings of the request.
+
+    Returns:
+        The cache key, or None if the input contains parts that cannot be hashed.
+    """
+    key_inputs: list[str | bytes] = []
+    for part in model_input:
+        if isinstance(part, str):
+            key_inputs.append(part)
+        elif isinstance(part, Image):
+            key_inputs.append(part.data)
+        else:
+            return None
+
+    key_inputs.append(
+        json.dumps(generation_config.to_dict(), sort_keys=True)
+        if generation_config is not None
+        else ""
+    )
+    key_inputs.append(repr(safety_settings))
+
+    model_name = getattr(generative_multimodal_model, "_model_name", "gemini")
+    return EmbeddingCache.make_key(model_name, *key_inputs)
+
+
 def get_gemini_response(
     generative_multimodal_model,
     model_input: list[str],
@@ -283,6 +613,17 @@ def get_gemini_response(
     Returns:
         The generated text as a string.
     """
+    cache_key = None
+    cache = embedding_cache
+    if cache is not None:
+        cache_key = get_gemini_response_cache_key(
+            generative_multimodal_model, model_input, generation_config, safety_settings
+        )
+        if cache_key is not None:
+            cached_response = cache.get(cache_key)
+            if cached_response is not None:
+                return cached_response
+
     response = generative_multimodal_model.generate_content(
         model_input,
         generation_config=generation_config,
@@ -290,6 +631,7 @@ def get_gemini_response(
         safety_settings=safety_settings,
     )
     response_list = []
+    failed = False
 
     for chunk in response:
         try:
@@ -300,9 +642,14 @@ def get_gemini_response(
                 e,
             )
             response_list.append("Exception occurred")
+            failed = True
             continue
     response = "".join(response_list)
 
+    # Failed generations are not cached so that they are retried on the next run
+    if cache is not None and cache_key is not None and not failed:
+        cache.set(cache_key, response)
+
     return response
 
 
@@ -387,7 +734,7 @@ def get_image_metadata_df(
     return return_df
 
 
-def get_document_metadata(
+def iter_document_metadata(
     generative_multimodal_model,
     pdf_folder_path: str,
     image_save_dir: str,
@@ -404,25 +751,28 @@ def get_document_metadata(
     },
     add_sleep_after_page: bool = False,
     sleep_time_after_page: int = 2,
-) -> tuple[pd.DataFrame, pd.DataFrame]:
+    skip_pages: Container[tuple[str, int]] = (),
+) -> Iterator[tuple[str, int, list[dict], list[dict]]]:
     """
-    This function takes a PDF path, an image save directory, an image description prompt, an embedding size, and a text embedding text limit as input.
+    Lazily extracts the text and image metadata of the PDFs in a folder, one page at a time.
+
+    Only the page being processed is held in memory, so the records can be written to a
+    sink (see `ingest_document_metadata`) as they are produced.
 
     Args:
-        pdf_path: The path to the PDF document.
+        pdf_folder_path: The folder containing the PDF documents.
         image_save_dir: The directory where extracted images should be saved.
         image_description_prompt: A prompt to guide Gemini for generating image descriptions.
-        embedding_size: The dimensionality of the embedding vectors.
-        text_emb_text_limit: The maximum number of tokens for text embedding.
-
-    Returns:
-        A tuple containing two DataFrames:
-            * One DataFrame containing the extracted text metadata for each page of the PDF, including the page text, chunked text dictionaries, and chunk embedding dictionaries.
-            * Another DataFrame containing the extracted image metadata for each image in the PDF, including the image path, image description, image embeddings (with and without context), and image description text embedding.
+        embedding_size: The dimensionality of the image embedding vectors.
+        add_sleep_after_page: Whether to sleep after each page to avoid quota errors.
+        sleep_time_after_page: The number of seconds to sleep after each page.
+        skip_pages: (file name, page number) pairs to skip, e.g. pages already ingested.
+
+    Yields:
+        A tuple (file name, page number, text records, image records) per page, where the
+        records are dicts with the columns of the DataFrames of `get_document_metadata`.
     """
 
-    text_metadata_df_final, image_metadata_df_final = pd.DataFrame(), pd.DataFrame()
-
     for pdf_path in glob.glob(pdf_folder_path + "/*.pdf"):
         print(
             "\n\n",
@@ -436,13 +786,15 @@ def get_document_metadata(
 
         file_name = pdf_path.split("/")[-1]
 
-        text_metadata: dict[int | str, dict] = {}
-        image_metadata: dict[int | str, dict] = {}
+        # Images with the same description are only kept once per file
+        seen_image_descriptions: set[str] = set()
 
         for page_num, page in enumerate(doc):
+            if (file_name, page_num + 1) in skip_pages:
+                continue
+
             print(f"Processing page: {page_num + 1}")
 
-            text = page.get_text()
             (
                 text,
                 page_text_embeddings_dict,
@@ -450,19 +802,23 @@ def get_document_metadata(
                 chunk_embeddings_dict,
             ) = get_chunk_text_metadata(page, embedding_size=embedding_size)
 
-            text_metadata[page_num] = {
-                "text": text,
-                "page_text_embeddings": page_text_embeddings_dict,
-                "chunked_text_dict": chunked_text_dict,
-                "chunk_embeddings_dict": chunk_embeddings_dict,
-            }
+            text_records = [
+                {
+                    "file_name": file_name,
+                    "page_num": page_num + 1,
+                    "text": text,
+                    "text_embedding_page": page_text_embeddings_dict["text_embedding"],
+                    "chunk_number": chunk_number,
+                    "chunk_text": chunk_text,
+                    "text_embedding_chunk": chunk_embeddings_dict[chunk_number],
+                }
+                for chunk_number, chunk_text in chunked_text_dict.items()
+            ]
 
-            images = page.get_images()
-            image_metadata[page_num] = {}
+            image_records = []
 
-            for image_no, image in enumerate(images):
+            for image_no, image in enumerate(page.get_images()):
                 image_number = int(image_no + 1)
-                image_metadata[page_num][image_number] = {}
 
                 image_for_gemini, image_name = get_image_for_gemini(
                     doc, image, image_no, image_save_dir, file_name, page_num
@@ -480,6 +836,10 @@ def get_document_metadata(
                     stream=True,
                 )
 
+                if response in seen_image_descriptions:
+                    continue
+                seen_image_descriptions.add(response)
+
                 image_embedding = get_image_embedding_from_multimodal_embedding_model(
                     image_uri=image_name,
                     embedding_size=embedding_size,
@@ -489,14 +849,17 @@ def get_document_metadata(
                     get_text_embedding_from_text_embedding_model(text=response)
                 )
 
-                image_metadata[page_num][image_number] = {
-                    "img_num": image_number,
-                    "img_path": image_name,
-                    "img_desc": response,
-                    # "mm_embedding_from_text_desc_and_img": image_embedding_with_description,
-                    "mm_embedding_from_img_only": image_embedding,
-                    "text_embedding_from_image_description": image_description_text_embedding,
-                }
+                image_records.append(
+                    {
+                        "file_name": file_name,
+                        "page_num": page_num + 1,
+                        "img_num": image_number,
+                        "img_path": image_name,
+                        "img_desc": response,
+                        "mm_embedding_from_img_only": image_embedding,
+                        "text_embedding_from_image_description": image_description_text_embedding,
+                    }
+                )
 
             # Add sleep to reduce issues with Quota error on API
             if add_sleep_after_page:
@@ -507,26 +870,705 @@ def get_document_metadata(
                     """ sec before processing the next page to avoid quota issues. You can disable it: "add_sleep_after_page = False"  """,
                 )
 
-        text_metadata_df = get_text_metadata_df(file_name, text_metadata)
-        image_metadata_df = get_image_metadata_df(file_name, image_metadata)
+            yield file_name, page_num + 1, text_records, image_records
+
+        doc.close()
+
+
+def get_document_metadata(
+    generative_multimodal_model,
+    pdf_folder_path: str,
+    image_save_dir: str,
+    image_description_prompt: str,
+    embedding_size: int = 128,
+    generation_config: GenerationConfig | None = GenerationConfig(
+        temperature=0.2, max_output_tokens=2048
+    ),
+    safety_settings: dict | None = {
+        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+    },
+    add_sleep_after_page: bool = False,
+    sleep_time_after_page: int = 2,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    This function takes a PDF path, an image save directory, an image description prompt, an embedding size, and a text embedding text limit as input.
+
+    Args:
+        pdf_path: The path to the PDF document.
+        image_save_dir: The directory where extracted images should be saved.
+        image_description_prompt: A prompt to guide Gemini for generating image descriptions.
+        embedding_size: The dimensionality of the embedding vectors.
+        text_emb_text_limit: The maximum number of tokens for text embedding.
+
+    Returns:
+        A tuple containing two DataFrames:
+            * One DataFrame containing the extracted text metadata for each page of the PDF, including the page text, chunked text dictionaries, and chunk embedding dictionaries.
+            * Another DataFrame containing the extracted image metadata for each image in the PDF, including the image path, image description, image embeddings (with and without context), and image description text embedding.
+    """
+
+    text_records: list[dict] = []
+    image_records: list[dict] = []
+
+    for _, _, page_text_records, page_image_records in iter_document_metadata(
+        generative_multimodal_model,
+        pdf_folder_path,
+        image_save_dir,
+        image_description_prompt,
+        embedding_size=embedding_size,
+        generation_config=generation_config,
+        safety_settings=safety_settings,
+        add_sleep_after_page=add_sleep_after_page,
+        sleep_time_after_page=sleep_time_after_page,
+    ):
+        text_records.extend(page_text_records)
+        image_records.extend(page_image_records)
+
+    # Build each DataFrame once instead of concatenating per file
+    text_metadata_df_final = pd.DataFrame(text_records)
+    image_metadata_df_final = pd.DataFrame(image_records)
+
+    return text_metadata_df_final, image_metadata_df_final
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket used to keep concurrent API calls within quota.
+
+    Tokens are refilled continuously at `rate` per second up to `capacity`, and every
+    API request consumes one token, blocking until a token is available.
+
+    Args:
+        rate: Number of requests allowed per second on average.
+        capacity: Maximum burst of requests. Defaults to `rate` (at least 1).
+
+    Raises:
+        ValueError: If `rate` is not positive.
+    """
+
+    def __init__(self, rate: float, capacity: int | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1) -> None:
+        """Blocks until `tokens` tokens are available, then consumes them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._last_refill) * self.rate
+                )
+                self._last_refill = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                wait_time = (tokens - self._tokens) / self.rate
+
+            time.sleep(wait_time)
 
-        text_metadata_df_final = pd.concat(
-            [text_metadata_df_final, text_metadata_df], axis=0
+
+def get_document_metadata_pipelined(
+    generative_multimodal_model,
+    pdf_folder_path: str,
+    image_save_dir: str,
+    image_description_prompt: str,
+    embedding_size: int = 128,
+    generation_config: GenerationConfig | None = GenerationConfig(
+        temperature=0.2, max_output_tokens=2048
+    ),
+    safety_settings: dict | None = {
+        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+    },
+    text_embedding_batch_size: int = 16,
+    max_concurrent_requests: int = 8,
+    requests_per_second: float = 5.0,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Pipelined variant of `get_document_metadata` that overlaps the API calls.
+
+    Pages and images are extracted from the PDFs on the calling thread (PyMuPDF is not
+    thread-safe), while all network work is submitted to a bounded thread pool as soon
+    as it is known, so the calls for pages of several PDFs are in flight at once:
+        * Page and chunk texts are embedded in batches of `text_embedding_batch_size`.
+        * Image descriptions and image embeddings run concurrently.
+        * Every API request goes through a token-bucket rate limiter, which replaces the
+          fixed `add_sleep_after_page` sleep.
+
+    Args:
+        pdf_folder_path: The folder containing the PDF documents.
+        image_save_dir: The directory where extracted images should be saved.
+        image_description_prompt: A prompt to guide Gemini for generating image descriptions.
+        embedding_size: The dimensionality of the image embedding vectors.
+        text_embedding_batch_size: Number of texts sent per text embedding request.
+        max_concurrent_requests: Maximum number of API requests in flight at once.
+        requests_per_second: Average number of API requests allowed per second.
+
+    Returns:
+        The same text and image metadata DataFrames as `get_document_metadata`.
+    """
+
+    rate_limiter = TokenBucketRateLimiter(requests_per_second)
+
+    text_metadata: dict[str, dict[int | str, dict]] = {}
+    image_metadata: dict[str, dict[int | str, dict]] = {}
+
+    # Each pending text is stored with the dict and key that receive its embedding
+    pending_texts: list[tuple[dict, int | str, str]] = []
+    text_batches: list[tuple[list[tuple[dict, int | str]], Future]] = []
+    image_futures: list[tuple[dict, Future]] = []
+
+    def embed_text_batch(texts: list[str]) -> list[list]:
+        # Batches served entirely from the cache do not use a rate limiter token
+        return get_text_embeddings_from_text_embedding_model(
+            texts, before_request=rate_limiter.acquire
+        )
+
+    def describe_and_embed_image(
+        image_for_gemini: Image, image_name: str
+    ) -> tuple[str, list]:
+        rate_limiter.acquire()
+        response = get_gemini_response(
+            generative_multimodal_model,
+            model_input=[image_description_prompt, image_for_gemini],
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            stream=True,
         )
-        image_metadata_df_final = pd.concat(
-            [
-                image_metadata_df_final,
-                image_metadata_df.drop_duplicates(subset=["img_desc"]),
-            ],
-            axis=0,
+
+        rate_limiter.acquire()
+        image_embedding = get_image_embedding_from_multimodal_embedding_model(
+            image_uri=image_name,
+            embedding_size=embedding_size,
         )
 
-        text_metadata_df_final = text_metadata_df_final.reset_index(drop=True)
-        image_metadata_df_final = image_metadata_df_final.reset_index(drop=True)
+        return response, image_embedding
+
+    with ThreadPoolExecutor(max_workers=max_concurrent_requests) as executor:
+
+        def flush_pending_texts() -> None:
+            targets = [(target, key) for target, key, _ in pending_texts]
+            texts = [text for _, _, text in pending_texts]
+            text_batches.append((targets, executor.submit(embed_text_batch, texts)))
+            pending_texts.clear()
+
+        def queue_text(target: dict, key: int | str, text: str) -> None:
+            pending_texts.append((target, key, text))
+            if len(pending_texts) >= text_embedding_batch_size:
+                flush_pending_texts()
+
+        for pdf_path in glob.glob(pdf_folder_path + "/*.pdf"):
+            print(
+                "\n\n",
+                "Processing the file: ---------------------------------",
+                pdf_path,
+                "\n\n",
+            )
+
+            # Open the PDF file
+            doc: fitz.Document = fitz.open(pdf_path)
+
+            file_name = pdf_path.split("/")[-1]
+
+            text_metadata[file_name] = {}
+            image_metadata[file_name] = {}
+
+            for page_num, page in enumerate(doc):
+                print(f"Processing page: {page_num + 1}")
+
+                text = (
+                    page.get_text().encode("ascii", "ignore").decode("utf-8", "ignore")
+                )
+                chunked_text_dict = get_text_overlapping_chunk(text)
+
+                page_metadata: dict = {
+                    "text": text,
+                    "page_text_embeddings": {},
+                    "chunked_text_dict": chunked_text_dict,
+                    "chunk_embeddings_dict": {},
+                }
+                text_metadata[file_name][page_num] = page_metadata
+
+                if text:
+                    queue_text(
+                        page_metadata["page_text_embeddings"], "text_embedding", text
+                    )
+                for chunk_number, chunk_text in chunked_text_dict.items():
+                    queue_text(
+                        page_metadata["chunk_embeddings_dict"], chunk_number, chunk_text
+                    )
+
+                image_metadata[file_name][page_num] = {}
+
+                for image_no, image in enumerate(page.get_images()):
+                    image_number = int(image_no + 1)
+
+                    image_for_gemini, image_name = get_image_for_gemini(
+                        doc, image, image_no, image_save_dir, file_name, page_num
+                    )
+
+                    print(
+                        f"Extracting image from page: {page_num + 1}, saved as: {image_name}"
+                    )
+
+                    image_values = {"img_num": image_number, "img_path": image_name}
+                    image_metadata[file_name][page_num][image_number] = image_values
+                    image_futures.append(
+                        (
+                            image_values,
+                            executor.submit(
+                                describe_and_embed_image, image_for_gemini, image_name
+                            ),
+                        )
+                    )
+
+        # Image descriptions can only be embedded once Gemini has generated them
+        for image_values, future in image_futures:
+            response, image_embedding = future.result()
+            image_values["img_desc"] = response
+            image_values["mm_embedding_from_img_only"] = image_embedding
+            queue_text(image_values, "text_embedding_from_image_description", response)
+
+        if pending_texts:
+            flush_pending_texts()
+
+        for targets, future in text_batches:
+            for (target, key), embedding in zip(targets, future.result()):
+                target[key] = embedding
+
+    text_metadata_dfs = [
+        get_text_metadata_df(file_name, file_text_metadata)
+        for file_name, file_text_metadata in text_metadata.items()
+    ]
+    image_metadata_dfs = [
+        get_image_metadata_df(file_name, file_image_metadata)
+        for file_name, file_image_metadata in image_metadata.items()
+    ]
+    image_metadata_dfs = [
+        df.drop_duplicates(subset=["img_desc"]) for df in image_metadata_dfs if len(df)
+    ]
+
+    text_metadata_df_final = pd.concat(
+        text_metadata_dfs or [pd.DataFrame()], axis=0, ignore_index=True
+    )
+    image_metadata_df_final = pd.concat(
+        image_metadata_dfs or [pd.DataFrame()], axis=0, ignore_index=True
+    )
 
     return text_metadata_df_final, image_metadata_df_final
 
 
+# Sinks for streaming ingestion with resume support
+
+
+class MetadataSink(ABC):
+    """
+    Base class of the sinks that `ingest_document_metadata` writes page records to.
+
+    Subclasses make each written page durable atomically, so that an interrupted
+    ingestion can resume after the last completed page.
+    """
+
+    @abstractmethod
+    def completed_pages(self) -> set[tuple[str, int]]:
+        """Returns the (file name, page number) pairs already written to the sink."""
+
+    @abstractmethod
+    def write_page(
+        self,
+        file_name: str,
+        page_num: int,
+        text_records: list[dict],
+        image_records: list[dict],
+    ) -> None:
+        """Writes the text and image records of one page."""
+
+    @abstractmethod
+    def load(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Reads the records written so far back as text and image metadata DataFrames."""
+
+    def close(self) -> None:
+        """Flushes any buffered records."""
+
+    def __enter__(self) -> "MetadataSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _get_metadata_dfs_from_records(
+    text_records: list[dict], image_records: list[dict]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    text_metadata_df = pd.DataFrame(text_records)
+    image_metadata_df = pd.DataFrame(image_records)
+
+    # A page that was re-processed after an interruption may have been written twice
+    if len(text_metadata_df):
+        text_metadata_df = text_metadata_df.drop_duplicates(
+            subset=["file_name", "page_num", "chunk_number"], keep="last"
+        )
+    if len(image_metadata_df):
+        image_metadata_df = image_metadata_df.drop_duplicates(
+            subset=["file_name", "page_num", "img_num"], keep="last"
+        ).drop_duplicates(subset=["file_name", "img_desc"])
+
+    return (
+        text_metadata_df.reset_index(drop=True),
+        image_metadata_df.reset_index(drop=True),
+    )
+
+
+class JsonlMetadataSink(MetadataSink):
+    """
+    Appends page records to `text_metadata.jsonl` and `image_metadata.jsonl`.
+
+    A page is marked as completed in `pages.jsonl` only after its records are flushed to
+    disk, so records of a page interrupted halfway are written again on resume.
+
+    Args:
+        output_dir: The directory the JSONL files are written to.
+    """
+
+    def __init__(self, output_dir: str) -> None:
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.text_path = os.path.join(output_dir, "text_metadata.jsonl")
+        self.image_path = os.path.join(output_dir, "image_metadata.jsonl")
+        self.pages_path = os.path.join(output_dir, "pages.jsonl")
+
+        self._text_file = open(self.text_path, "a")
+        self._image_file = open(self.image_path, "a")
+        self._pages_file = open(self.pages_path, "a")
+
+    @staticmethod
+    def _read_jsonl(path: str) -> list[dict]:
+        records = []
+        if not os.path.exists(path):
+            return records
+
+        with open(path) as jsonl_file:
+            for line in jsonl_file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Ignore a line torn by an interrupted write
+                    continue
+
+        return records
+
+    def completed_pages(self) -> set[tuple[str, int]]:
+        return {
+            (page["file_name"], page["page_num"])
+            for page in self._read_jsonl(self.pages_path)
+        }
+
+    def write_page(
+        self,
+        file_name: str,
+        page_num: int,
+        text_records: list[dict],
+        image_records: list[dict],
+    ) -> None:
+        for jsonl_file, records in (
+            (self._text_file, text_records),
+            (self._image_file, image_records),
+        ):
+            jsonl_file.writelines(json.dumps(record) + "\n" for record in records)
+            jsonl_file.flush()
+            os.fsync(jsonl_file.fileno())
+
+        self._pages_file.write(
+            json.dumps({"file_name": file_name, "page_num": page_num}) + "\n"
+        )
+        self._pages_file.flush()
+        os.fsync(self._pages_file.fileno())
+
+    def load(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        completed_pages = self.completed_pages()
+
+        def is_completed(record: dict) -> bool:
+            return (record["file_name"], record["page_num"]) in completed_pages
+
+        return _get_metadata_dfs_from_records(
+            list(filter(is_completed, self._read_jsonl(self.text_path))),
+            list(filter(is_completed, self._read_jsonl(self.image_path))),
+        )
+
+    def close(self) -> None:
+        for jsonl_file in (self._text_file, self._image_file, self._pages_file):
+            jsonl_file.close()
+
+
+class ParquetMetadataSink(MetadataSink):
+    """
+    Buffers page records and writes them as Parquet part files.
+
+    Every `pages_per_part` pages, the buffered records are written to
+    `text_metadata-<n>.parquet` and `image_metadata-<n>.parquet`, and then the completed
+    pages are recorded in `pages-<n>.json`. Each file is written to a temporary path and
+    renamed, so part files are never left half-written.
+
+    Args:
+        output_dir: The directory the Parquet part files are written to.
+        pages_per_part: The number of pages buffered in memory per part file.
+    """
+
+    def __init__(self, output_dir: str, pages_per_part: int = 50) -> None:
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.output_dir = output_dir
+        self.pages_per_part = pages_per_part
+
+        self._part_number = len(self._get_part_paths("pages", "json"))
+        self._text_records: list[dict] = []
+        self._image_records: list[dict] = []
+        self._pages: list[tuple[str, int]] = []
+
+    def _get_part_paths(self, prefix: str, extension: str) -> list[str]:
+        return sorted(
+            glob.glob(os.path.join(self.output_dir, f"{prefix}-*.{extension}"))
+        )
+
+    def _get_part_path(self, prefix: str, extension: str) -> str:
+        return os.path.join(
+            self.output_dir, f"{prefix}-{self._part_number:05d}.{extension}"
+        )
+
+    def completed_pages(self) -> set[tuple[str, int]]:
+        completed_pages = set()
+        for pages_path in self._get_part_paths("pages", "json"):
+            with open(pages_path) as pages_file:
+                completed_pages.update(map(tuple, json.load(pages_file)))
+
+        return completed_pages
+
+    def write_page(
+        self,
+        file_name: str,
+        page_num: int,
+        text_records: list[dict],
+        image_records: list[dict],
+    ) -> None:
+        self._text_records.extend(text_records)
+        self._image_records.extend(image_records)
+        self._pages.append((file_name, page_num))
+
+        if len(self._pages) >= self.pages_per_part:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered pages as a new part."""
+        if not self._pages:
+            return
+
+        for prefix, records in (
+            ("text_metadata", self._text_records),
+            ("image_metadata", self._image_records),
+        ):
+            if records:
+                part_path = self._get_part_path(prefix, "parquet")
+                pd.DataFrame(records).to_parquet(part_path + ".tmp", index=False)
+                os.replace(part_path + ".tmp", part_path)
+
+        pages_path = self._get_part_path("pages", "json")
+        with open(pages_path + ".tmp", "w") as pages_file:
+            json.dump(self._pages, pages_file)
+        os.replace(pages_path + ".tmp", pages_path)
+
+        self._part_number += 1
+        self._text_records, self._image_records, self._pages = [], [], []
+
+    def load(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        def read_parts(prefix: str) -> list[dict]:
+            records = []
+            for part_path in self._get_part_paths(prefix, "parquet"):
+                records.extend(pd.read_parquet(part_path).to_dict("records"))
+            return records
+
+        return _get_metadata_dfs_from_records(
+            read_parts("text_metadata"), read_parts("image_metadata")
+        )
+
+    def close(self) -> None:
+        self.flush()
+
+
+def ingest_document_metadata(
+    sink: MetadataSink,
+    generative_multimodal_model,
+    pdf_folder_path: str,
+    image_save_dir: str,
+    image_description_prompt: str,
+    **kwargs,
+) -> None:
+    """
+    Streams the metadata of the PDFs in a folder into a sink with bounded memory.
+
+    Pages already completed in the sink are skipped, so re-running after an interruption
+    resumes from the last completed page. Use `sink.load()` to get the DataFrames.
+
+    Args:
+        sink: The MetadataSink to write the page records to. It is closed on return.
+        pdf_folder_path: The folder containing the PDF documents.
+        image_save_dir: The directory where extracted images should be saved.
+        image_description_prompt: A prompt to guide Gemini for generating image descriptions.
+        **kwargs: Further arguments passed to `iter_document_metadata`.
+    """
+
+    with sink:
+        for file_name, page_num, text_records, image_records in iter_document_metadata(
+            generative_multimodal_model,
+            pdf_folder_path,
+            image_save_dir,
+            image_description_prompt,
+            skip_pages=sink.completed_pages(),
+            **kwargs,
+        ):
+            sink.write_page(file_name, page_num, text_records, image_records)
+
+
+# Functions for saving and loading the document metadata
+
+
+def save_metadata_df(metadata_df: pd.DataFrame, path_prefix: str) -> None:
+    """
+    Saves a text or image metadata DataFrame in a columnar, memory-mappable format.
+
+    Embedding columns (columns holding one list or array per row) are stacked into a
+    contiguous float32 matrix saved as `<path_prefix>.<column>.npy`. All other columns
+    are saved to `<path_prefix>.parquet`, and the column order to `<path_prefix>.json`.
+
+    Args:
+        metadata_df: The text or image metadata DataFrame returned by `get_document_metadata`.
+        path_prefix: The path prefix of the saved files, e.g. "index/text_metadata".
+    """
+
+    output_dir = os.path.dirname(path_prefix)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    embedding_columns = [
+        column
+        for column in metadata_df.columns
+        if len(metadata_df)
+        and isinstance(metadata_df[column].iloc[0], (list, np.ndarray))
+    ]
+
+    for column in embedding_columns:
+        matrix = np.vstack(metadata_df[column].to_numpy()).astype(np.float32)
+        np.save(f"{path_prefix}.{column}.npy", matrix)
+
+    metadata_df.drop(columns=embedding_columns).reset_index(drop=True).to_parquet(
+        f"{path_prefix}.parquet", index=False
+    )
+
+    with open(f"{path_prefix}.json", "w") as manifest_file:
+        json.dump(
+            {
+                "columns": list(metadata_df.columns),
+                "embedding_columns": embedding_columns,
+            },
+            manifest_file,
+        )
+
+
+def load_embedding_matrix(
+    path_prefix: str, column_name: str, mmap: bool = True
+) -> np.ndarray:
+    """
+    Loads an embedding column saved by `save_metadata_df` as a (rows, dimension) matrix.
+
+    Args:
+        path_prefix: The path prefix passed to `save_metadata_df`.
+        column_name: The embedding column to load.
+        mmap: If True, the matrix is memory-mapped read-only instead of read into memory,
+              so that several processes share the same pages.
+
+    Returns:
+        A float32 NumPy array (or read-only memmap) with one embedding per row.
+    """
+
+    return np.load(f"{path_prefix}.{column_name}.npy", mmap_mode="r" if mmap else None)
+
+
+def load_metadata_df(path_prefix: str, mmap: bool = True) -> pd.DataFrame:
+    """
+    Loads a metadata DataFrame saved by `save_metadata_df`.
+
+    Each embedding column holds one row view of the (memory-mapped) embedding matrix per
+    row, so no per-row lists of floats are materialized.
+
+    Args:
+        path_prefix: The path prefix passed to `save_metadata_df`.
+        mmap: If True, the embedding matrices are memory-mapped read-only.
+
+    Returns:
+        The metadata DataFrame, with the same columns as the saved one.
+    """
+
+    with open(f"{path_prefix}.json") as manifest_file:
+        manifest = json.load(manifest_file)
+
+    metadata_df = pd.read_parquet(f"{path_prefix}.parquet")
+
+    for column in manifest["embedding_columns"]:
+        matrix = load_embedding_matrix(path_prefix, column, mmap=mmap)
+        metadata_df[column] = pd.Series(list(matrix), index=metadata_df.index)
+
+    return metadata_df[manifest["columns"]]
+
+
+def save_document_metadata(
+    text_metadata_df: pd.DataFrame,
+    image_metadata_df: pd.DataFrame,
+    output_dir: str,
+) -> None:
+    """
+    Saves the output of `get_document_metadata` to `output_dir`.
+
+    Args:
+        text_metadata_df: The text metadata DataFrame.
+        image_metadata_df: The image metadata DataFrame.
+        output_dir: The directory to save the metadata to.
+    """
+
+    save_metadata_df(text_metadata_df, os.path.join(output_dir, "text_metadata"))
+    save_metadata_df(image_metadata_df, os.path.join(output_dir, "image_metadata"))
+
+
+def load_document_metadata(
+    output_dir: str, mmap: bool = True
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Loads the text and image metadata saved by `save_document_metadata`.
+
+    Args:
+        output_dir: The directory the metadata was saved to.
+        mmap: If True, the embedding matrices are memory-mapped read-only.
+
+    Returns:
+        A tuple containing the text metadata DataFrame and the image metadata DataFrame.
+    """
+
+    return (
+        load_metadata_df(os.path.join(output_dir, "text_metadata"), mmap=mmap),
+        load_metadata_df(os.path.join(output_dir, "image_metadata"), mmap=mmap),
+    )
+
+
 # Helper Functions
 
 
@@ -564,22 +1606,140 @@ def get_user_query_image_embeddings(
     )
 
 
-def get_cosine_score(
-    dataframe: pd.DataFrame, column_name: str, input_text_embed: np.ndarray
-) -> float:
+class EmbeddingIndex:
     """
-    Calculates the cosine similarity between the user query embedding and the dataframe embedding for a specific column.
+    In-memory similarity index over an embedding column of a metadata DataFrame.
+
+    Rows are scored by the dot product of their embedding with the query embedding,
+    which is the cosine similarity for the normalized embeddings returned by the
+    embedding models. The embeddings are stacked once into a contiguous float32
+    matrix, so every query costs a single matrix-vector (or matrix-matrix for a batch
+    of queries) product followed by an `argpartition` top-k selection.
 
     Args:
-        dataframe: The pandas DataFrame containing the data to compare against.
-        column_name: The name of the column containing the embeddings to compare with.
-        input_text_embed: The NumPy array representing the user query embedding.
+        metadata_df: The text or image metadata DataFrame returned by `get_document_metadata`.
+        column_name: The column in `metadata_df` containing the embeddings to search.
+        embeddings: Optional precomputed (rows, dimension) matrix of the `column_name`
+                    embeddings, e.g. a memory-mapped matrix from `load_embedding_matrix`.
+                    A float32 matrix is used as is, without copying.
 
-    Returns:
-        The cosine similarity score (rounded to two decimal places) between the user query embedding and the dataframe embedding.
+    Raises:
+        KeyError: If the specified `column_name` is not present in the `metadata_df`.
+        ValueError: If `embeddings` does not have one row per row of `metadata_df`.
     """
 
-    return round(np.dot(dataframe[column_name], input_text_embed), 2)
+    def __init__(
+        self,
+        metadata_df: pd.DataFrame,
+        column_name: str,
+        embeddings: np.ndarray | None = None,
+    ) -> None:
+        if column_name not in metadata_df.columns:
+            raise KeyError(f"Column '{column_name}' not found in the 'metadata_df'")
+
+        self.metadata_df = metadata_df.reset_index(drop=True)
+        self.column_name = column_name
+
+        if embeddings is not None:
+            if embeddings.shape[0] != len(self.metadata_df):
+                raise ValueError(
+                    "The embeddings must have one row per row of the 'metadata_df'."
+                )
+            matrix = embeddings
+        elif len(self.metadata_df):
+            matrix = np.vstack(self.metadata_df[column_name].to_numpy())
+        else:
+            matrix = np.empty((0, 0))
+        self.embeddings = np.ascontiguousarray(matrix, dtype=np.float32)
+
+    @classmethod
+    def from_saved_metadata(
+        cls, path_prefix: str, column_name: str, mmap: bool = True
+    ) -> "EmbeddingIndex":
+        """
+        Builds an index directly from metadata saved by `save_metadata_df`.
+
+        Args:
+            path_prefix: The path prefix passed to `save_metadata_df`.
+            column_name: The embedding column to search.
+            mmap: If True, the embedding matrix is memory-mapped instead of read into memory.
+
+        Returns:
+            An EmbeddingIndex backed by the saved embedding matrix.
+        """
+
+        return cls(
+            load_metadata_df(path_prefix, mmap=mmap),
+            column_name,
+            embeddings=load_embedding_matrix(path_prefix, column_name, mmap=mmap),
+        )
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    def get_scores(self, query_embeddings: np.ndarray | list) -> np.ndarray:
+        """
+        Calculates the dot product between each query and every indexed embedding.
+
+        Args:
+            query_embeddings: A single query embedding, or a matrix with one query per row.
+
+        Returns:
+            A (number of queries, number of rows) array of similarity scores.
+        """
+
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+
+        if not len(self):
+            return np.empty((queries.shape[0], 0), dtype=np.float32)
+
+        if queries.shape[0] == 1:
+            return (self.embeddings @ queries[0])[np.newaxis, :]
+        return queries @ self.embeddings.T
+
+    def search(
+        self,
+        query_embeddings: np.ndarray | list,
+        top_n: int = 3,
+        max_score: float | None = None,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Finds the top N most similar rows for each query.
+
+        Scores are rounded to two decimal places.
+
+        Args:
+            query_embeddings: A single query embedding, or a matrix with one query per row.
+            top_n: The number of most similar rows to return per query.
+            max_score: If set, rows scoring at or above this value are skipped
+                       (e.g. 1.0 to ignore an exact match of the query image itself).
+
+        Returns:
+            A list with one `(row_indices, scores)` tuple per query, sorted by descending score.
+        """
+
+        scores = np.round(self.get_scores(query_embeddings), 2)
+        if max_score is not None:
+            scores[scores >= max_score] = -np.inf
+
+        results = []
+        top_k = min(top_n, len(self))
+
+        for query_scores in scores:
+            if top_k <= 0:
+                results.append((np.empty(0, dtype=np.int64), np.empty(0)))
+                continue
+
+            # Select the top k in linear time, then only sort those k
+            candidates = np.argpartition(-query_scores, top_k - 1)[:top_k]
+            candidates = candidates[
+                np.argsort(-query_scores[candidates], kind="stable")
+            ]
+            candidates = candidates[np.isfinite(query_scores[candidates])]
+
+            results.append((candidates, query_scores[candidates]))
+
+        return results
 
 
 def print_text_to_image_citation(
@@ -695,6 +1855,7 @@ def get_similar_image_from_query(
     image_emb: bool = True,
     top_n: int = 3,
     embedding_size: int = 128,
+    index: EmbeddingIndex | None = None,
 ) -> dict[int, dict[str, Any]]:
     """
     Finds the top N most similar images from a metadata DataFrame based on a text query or an image query.
@@ -708,86 +1869,67 @@ def get_similar_image_from_query(
         image_emb: Whether to use image embeddings (True) or text captions (False) for comparisons.
         top_n: The number of most similar images to return.
         embedding_size: The dimensionality of the image embeddings (only used if image_emb is True).
+        index: A prebuilt `EmbeddingIndex` over `column_name` of `image_metadata_df`.
+               Building it once and reusing it across queries avoids restacking the embeddings.
 
     Returns:
         A dictionary containing information about the top N most similar images, including cosine scores, image objects, paths, page numbers, text excerpts, and descriptions.
     """
+    if index is None:
+        index = EmbeddingIndex(image_metadata_df, column_name)
+
     # Check if image embedding is used
     if image_emb:
         # Calculate cosine similarity between query image and metadata images
-        user_query_image_embedding = get_user_query_image_embeddings(
+        user_query_embedding = get_user_query_image_embeddings(
             image_query_path, embedding_size
         )
-        cosine_scores = image_metadata_df.apply(
-            lambda x: get_cosine_score(x, column_name, user_query_image_embedding),
-            axis=1,
-        )
     else:
         # Calculate cosine similarity between query text and metadata image captions
-        user_query_text_embedding = get_user_query_text_embeddings(query)
-        cosine_scores = image_metadata_df.apply(
-            lambda x: get_cosine_score(x, column_name, user_query_text_embedding),
-            axis=1,
-        )
+        user_query_embedding = get_user_query_text_embeddings(query)
 
     # Remove same image comparison score when user image is matched exactly with metadata image
-    cosine_scores = cosine_scores[cosine_scores < 1.0]
-
-    # Get top N cosine scores and their indices
-    top_n_cosine_scores = cosine_scores.nlargest(top_n).index.tolist()
-    top_n_cosine_values = cosine_scores.nlargest(top_n).values.tolist()
+    top_n_indices, top_n_scores = index.search(
+        user_query_embedding, top_n=top_n, max_score=1.0
+    )[0]
 
     # Create a dictionary to store matched images and their information
     final_images: dict[int, dict[str, Any]] = {}
 
-    for matched_imageno, indexvalue in enumerate(top_n_cosine_scores):
+    for matched_imageno, (row_index, score) in enumerate(
+        zip(top_n_indices, top_n_scores)
+    ):
+        row = index.metadata_df.iloc[row_index]
+
         # Create a sub-dictionary for each matched image
         final_images[matched_imageno] = {}
 
         # Store cosine score
-        final_images[matched_imageno]["cosine_score"] = top_n_cosine_values[
-            matched_imageno
-        ]
+        final_images[matched_imageno]["cosine_score"] = float(score)
 
         # Load image from file
         final_images[matched_imageno]["image_object"] = Image.load_from_file(
-            image_metadata_df.iloc[indexvalue]["img_path"]
+            row["img_path"]
         )
 
         # Add file name
-        final_images[matched_imageno]["file_name"] = image_metadata_df.iloc[indexvalue][
-            "file_name"
-        ]
+        final_images[matched_imageno]["file_name"] = row["file_name"]
 
         # Store image path
-        final_images[matched_imageno]["img_path"] = image_metadata_df.iloc[indexvalue][
-            "img_path"
-        ]
+        final_images[matched_imageno]["img_path"] = row["img_path"]
 
         # Store page number
-        final_images[matched_imageno]["page_num"] = image_metadata_df.iloc[indexvalue][
-            "page_num"
-        ]
+        final_images[matched_imageno]["page_num"] = row["page_num"]
 
         final_images[matched_imageno]["page_text"] = np.unique(
             text_metadata_df[
-                (
-                    text_metadata_df["page_num"].isin(
-                        [final_images[matched_imageno]["page_num"]]
-                    )
-                )
-                & (
-                    text_metadata_df["file_name"].isin(
-                        [final_images[matched_imageno]["file_name"]]
-                    )
-                )
+                (text_metadata_df["page_num"] == row["page_num"])
+                & (text_metadata_df["file_name"] == row["file_name"])
             ]["text"].values
         )
 
         # Store image description
-        final_images[matched_imageno]["image_description"] = image_metadata_df.iloc[
-            indexvalue
-        ]["img_desc"]
+        final_images[matched_imageno]["image_description"] = row["img_desc"]
 
     return final_images
 
@@ -799,6 +1941,7 @@ def get_similar_text_from_query(
     top_n: int = 3,
     chunk_text: bool = True,
     print_citation: bool = False,
+    index: EmbeddingIndex | None = None,
 ) -> dict[int, dict[str, Any]]:
     """
     Finds the top N most similar text passages from a metadata DataFrame based on a text query.
@@ -811,6 +1954,8 @@ def get_similar_text_from_query(
         embedding_size: The dimensionality of the text embeddings (only used if text embeddings are stored in the column specified by `column_name`).
         chunk_text: Whether to return individual text chunks (True) or the entire page text (False).
         print_citation: Whether to immediately print formatted citations for the matched text passages (True) or just return the dictionary (False).
+        index: A prebuilt `EmbeddingIndex` over `column_name` of `text_metadata_df`.
+               Building it once and reusing it across queries avoids restacking the embeddings.
 
     Returns:
         A dictionary containing information about the top N most similar text passages, including cosine scores, page numbers, chunk numbers (optional), and chunk text or page text (depending on `chunk_text`).
@@ -819,58 +1964,47 @@ def get_similar_text_from_query(
         KeyError: If the specified `column_name` is not present in the `text_metadata_df`.
     """
 
-    if column_name not in text_metadata_df.columns:
-        raise KeyError(f"Column '{column_name}' not found in the 'text_metadata_df'")
+    if index is None:
+        if column_name not in text_metadata_df.columns:
+            raise KeyError(
+                f"Column '{column_name}' not found in the 'text_metadata_df'"
+            )
+        index = EmbeddingIndex(text_metadata_df, column_name)
 
     query_vector = get_user_query_text_embeddings(query)
 
     # Calculate cosine similarity between query text and metadata text
-    cosine_scores = text_metadata_df.apply(
-        lambda row: get_cosine_score(
-            row,
-            column_name,
-            query_vector,
-        ),
-        axis=1,
-    )
-
-    # Get top N cosine scores and their indices
-    top_n_indices = cosine_scores.nlargest(top_n).index.tolist()
-    top_n_scores = cosine_scores.nlargest(top_n).values.tolist()
+    top_n_indices, top_n_scores = index.search(query_vector, top_n=top_n)[0]
 
     # Create a dictionary to store matched text and their information
     final_text: dict[int, dict[str, Any]] = {}
 
-    for matched_textno, index in enumerate(top_n_indices):
+    for matched_textno, (row_index, score) in enumerate(
+        zip(top_n_indices, top_n_scores)
+    ):
+        row = index.metadata_df.iloc[row_index]
+
         # Create a sub-dictionary for each matched text
         final_text[matched_textno] = {}
 
         # Store page number
-        final_text[matched_textno]["file_name"] = text_metadata_df.iloc[index][
-            "file_name"
-        ]
+        final_text[matched_textno]["file_name"] = row["file_name"]
 
         # Store page number
-        final_text[matched_textno]["page_num"] = text_metadata_df.iloc[index][
-            "page_num"
-        ]
+        final_text[matched_textno]["page_num"] = row["page_num"]
 
         # Store cosine score
-        final_text[matched_textno]["cosine_score"] = top_n_scores[matched_textno]
+        final_text[matched_textno]["cosine_score"] = float(score)
 
         if chunk_text:
             # Store chunk number
-            final_text[matched_textno]["chunk_number"] = text_metadata_df.iloc[index][
-                "chunk_number"
-            ]
+            final_text[matched_textno]["chunk_number"] = row["chunk_number"]
 
             # Store chunk text
-            final_text[matched_textno]["chunk_text"] = text_metadata_df["chunk_text"][
-                index
-            ]
+            final_text[matched_textno]["chunk_text"] = row["chunk_text"]
         else:
             # Store page text
-            final_text[matched_textno]["text"] = text_metadata_df["text"][index]
+            final_text[matched_textno]["text"] = row["text"]
 
     # Optionally print citations immediately
     if print_citation:
@@ -0,0 +1,115 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """Groups concurrent predictions into batched model calls.
+
+    Instances submitted while the model is busy, or within max_wait_ms of the
+    first instance of a batch, are predicted together in one call to
+    predict_batch, up to max_batch_size instances. predict_batch runs on a
+    single background thread, so the event loop keeps accepting requests.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[str]], List[str]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10,
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def predict(self, instances: List[str]) -> List[str]:
+        """Returns the predictions for instances, in order."""
+        return list(await asyncio.gather(*(self.submit(i) for i in instances)))
+
+    async def submit(self, instance: str) -> str:
+        """Queues one instance for the next batch and waits for its prediction."""
+        queue = self._queue
+        if queue is None or self._worker is None or self._worker.done():
+            queue = self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run(queue))
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((instance, future))
+        return await future
+
+    async def _next_batch(
+        self, queue: asyncio.Queue
+    ) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 and queue.empty():
+                break
+            try:
+                if timeout > 0:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                else:
+                    item = queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            batch.append(item)
+        return batch
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch(queue)
+            instances = [instance for instance, _ in batch]
+            try:
+                predictions = await loop.run_in_executor(
+                    self._executor, self.predict_batch, instances
+                )
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self._fail(batch, e)
+                continue
+            if len(predictions) != len(batch):
+                self._fail(
+                    batch,
+                    ValueError(
+                        f"predict_batch returned {len(predictions)} predictions "
+                        f"for {len(batch)} instances"
+                    ),
+                )
+                continue
+            for (_, future), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(prediction)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self) -> None:
+        """Stops the worker and the model thread."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown()
@@ -15,7 +15,9 @@
 import logging
 import os
 from pathlib import Path
+from typing import List
 
+from batching import MicroBatcher
 from fastapi import FastAPI, Request
 from fastapi.logger import logger
 from google.cloud import storage
@@ -52,22 +54,37 @@ model = AutoModelForSeq2SeqLM.from_pretrained(model_dir, device_map="auto")
 tokenizer = AutoTokenizer.from_pretrained(model_dir)
 
 
+def generate_batch(instances: List[str]) -> List[str]:
+    inputs = tokenizer(instances, return_tensors="pt", padding=True).to(model.device)
+    with torch.inference_mode():
+        outputs = model.generate(**inputs)
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+# Concurrent requests are padded into one generate call
+batcher = MicroBatcher(
+    generate_batch,
+    max_batch_size=int(os.environ.get("MAX_BATCH_SIZE", "16")),
+    max_wait_ms=float(os.environ.get("MAX_BATCH_WAIT_MS", "10")),
+)
+
+
 @app.get(os.environ["AIP_HEALTH_ROUTE"], status_code=200)
-def health():
+def health() -> dict:
     return {"status": "healthy"}
 
 
 @app.post(os.environ["AIP_PREDICT_ROUTE"])
-async def predict(request: Request):
+async def predict(request: Request) -> dict:
     body = await request.json()
 
     instances = body["instances"]
 
-    outputs = []
-    for instance in instances:
-        input_ids = tokenizer(instance, return_tensors="pt").input_ids
-        output = model.generate(input_ids)
-        prediction = tokenizer.decode(output[0], skip_special_tokens=True)
-        outputs.append(prediction)
+    outputs = await batcher.predict(instances)
 
     return {"predictions": [outputs]}
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await batcher.close()
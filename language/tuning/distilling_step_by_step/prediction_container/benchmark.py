@@ -0,0 +1,108 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""CPU benchmark of the prediction container's micro-batching.
+
+Runs concurrent clients against MicroBatcher with a tiny T5 checkpoint, and
+reports the throughput and the p50/p99 latency per instance. A max batch size
+of 1 runs one generate call per instance, as the container did before.
+
+    pip install -r app/requirements.txt
+    python benchmark.py --clients 32 --requests-per-client 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Tuple
+
+import torch
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+from batching import MicroBatcher  # noqa: E402  # pylint: disable=C0413
+
+PROMPTS = [
+    "Premise: A man is playing a guitar on stage. "
+    "Hypothesis: A man is performing music. Does the premise entail the hypothesis?",
+    "Question: What is the capital of France? Answer the question.",
+    "Translate English to German: The house is wonderful.",
+    "Summarize: The quick brown fox jumps over the lazy dog while the cat sleeps "
+    "in the warm afternoon sun next to the open window.",
+]
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+async def run(
+    batcher: MicroBatcher, clients: int, requests_per_client: int
+) -> Tuple[float, float, float]:
+    latencies: List[float] = []
+
+    async def client(client_id: int) -> None:
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            await batcher.predict([PROMPTS[(client_id + i) % len(PROMPTS)]])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    elapsed = time.perf_counter() - start
+    await batcher.close()
+    p50 = percentile(latencies, 0.5)
+    p99 = percentile(latencies, 0.99)
+    return len(latencies) / elapsed, p50, p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="google/t5-efficient-tiny")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests-per-client", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSeq2SeqLM.from_pretrained(args.model).eval()
+
+    def generate_batch(instances: List[str]) -> List[str]:
+        inputs = tokenizer(instances, return_tensors="pt", padding=True)
+        with torch.inference_mode():
+            outputs = model.generate(**inputs, max_new_tokens=args.max_new_tokens)
+        return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    generate_batch(PROMPTS)  # warm up
+
+    print(f"{'max batch':>10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for max_batch_size in args.batch_sizes:
+        batcher = MicroBatcher(
+            generate_batch, max_batch_size=max_batch_size, max_wait_ms=args.max_wait_ms
+        )
+        throughput, p50, p99 = asyncio.run(
+            run(batcher, args.clients, args.requests_per_client)
+        )
+        print(
+            f"{max_batch_size:>10} {throughput:>8.1f} {p50 * 1000:>8.1f} {p99 * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
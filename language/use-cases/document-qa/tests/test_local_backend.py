@@ -0,0 +1,102 @@
+"""Tests for the local, offline MatchingEngine backend."""
+
+import numpy as np
+import pytest
+from utils.local_backend import LocalBackend
+
+
+def make_datapoint(datapoint_id, vector, **restricts):
+    return {
+        "datapoint_id": datapoint_id,
+        "feature_vector": vector,
+        "restricts": [
+            {"namespace": namespace, "allow_list": allow_list}
+            for namespace, allow_list in restricts.items()
+        ],
+    }
+
+
+def neighbor_ids(neighbors):
+    return [neighbor["datapoint"]["datapointId"] for neighbor in neighbors]
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    backend.upsert_datapoints(
+        [
+            make_datapoint("a", [1.0, 0.0], lang=["en"]),
+            make_datapoint("b", [0.8, 0.6], lang=["fr"]),
+            make_datapoint("c", [0.0, 1.0], lang=["en"]),
+        ]
+    )
+    return backend
+
+
+def test_find_neighbors_orders_by_similarity(backend):
+    neighbors = backend.find_neighbors([[1.0, 0.0], [0.0, 1.0]], 2, [])
+
+    assert [neighbor_ids(n) for n in neighbors] == [["a", "b"], ["c", "b"]]
+    assert neighbors[0][0]["distance"] == pytest.approx(1.0)
+    assert neighbors[0][0]["datapoint"]["restricts"] == [
+        {"namespace": "lang", "allowList": ["en"]}
+    ]
+
+
+def test_find_neighbors_on_empty_backend(tmp_path):
+    assert LocalBackend(str(tmp_path)).find_neighbors([[1.0, 0.0]], 3, []) == [[]]
+
+
+def test_upsert_replaces_existing_datapoint(backend):
+    backend.upsert_datapoints([make_datapoint("c", [2.0, 0.0], lang=["en"])])
+
+    neighbors = backend.find_neighbors([[1.0, 0.0]], 3, [])[0]
+
+    assert neighbor_ids(neighbors) == ["c", "a", "b"]
+
+
+def test_restricts_allow_and_deny_lists(backend):
+    allowed = backend.find_neighbors(
+        [[1.0, 0.0]], 3, [{"namespace": "lang", "allow_list": ["fr"]}]
+    )[0]
+    denied = backend.find_neighbors(
+        [[1.0, 0.0]], 3, [{"namespace": "lang", "allowList": [], "denyList": ["en"]}]
+    )[0]
+    unknown_namespace = backend.find_neighbors(
+        [[1.0, 0.0]], 3, [{"namespace": "topic", "allowList": ["news"]}]
+    )[0]
+
+    assert neighbor_ids(allowed) == ["b"]
+    assert neighbor_ids(denied) == ["b"]
+    assert unknown_namespace == []
+
+
+def test_datapoints_and_documents_persist(backend, tmp_path):
+    backend.upload_document("a", "first document")
+
+    reloaded = LocalBackend(str(tmp_path))
+
+    assert neighbor_ids(reloaded.find_neighbors([[1.0, 0.0]], 1, [])[0]) == ["a"]
+    assert reloaded.download_document("a") == "first document"
+    assert reloaded.download_document("missing") == ""
+
+
+def test_ivf_search_matches_exact_search(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 8))
+    datapoints = [make_datapoint(str(i), list(v)) for i, v in enumerate(vectors)]
+    exact = LocalBackend(str(tmp_path / "exact"), distance_measure="COSINE_DISTANCE")
+    ivf = LocalBackend(
+        str(tmp_path / "ivf"),
+        distance_measure="COSINE_DISTANCE",
+        ivf_lists=4,
+        ivf_probes=4,
+    )
+    exact.upsert_datapoints(datapoints)
+    ivf.upsert_datapoints(datapoints)
+
+    queries = rng.normal(size=(5, 8)).tolist()
+
+    assert [neighbor_ids(n) for n in ivf.find_neighbors(queries, 5, [])] == [
+        neighbor_ids(n) for n in exact.find_neighbors(queries, 5, [])
+    ]
@@ -0,0 +1,298 @@
+"""Local, offline backend of the MatchingEngine vector store."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any
+
+import numpy as np
+
+from .matching_engine import MatchingEngineBackend
+
+logger = logging.getLogger()
+
+DISTANCE_MEASURES = ("DOT_PRODUCT_DISTANCE", "COSINE_DISTANCE")
+
+
+class LocalBackend(MatchingEngineBackend):
+    """Local stand-in for a Vertex AI Matching Engine index and GCS.
+
+    Datapoints are kept in memory and appended to `datapoints.jsonl` in the
+    backend directory, and document bodies are stored as files under
+    `documents/`. Queries are answered by exact brute-force NumPy search or,
+    when `ivf_lists` is set, by an inverted file (IVF) index that only scans
+    the `ivf_probes` clusters closest to the query.
+
+    The results follow the Matching Engine semantics used by
+    :class:`MatchingEngine`: the `distance` is a similarity (higher is
+    closer), so `search_distance` thresholds behave the same, and the query
+    restricts must all be matched: for each namespace in the query, the
+    datapoint must have a token in its allow list and none in its deny list.
+    Datapoints without the namespace do not match.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        distance_measure: str = "DOT_PRODUCT_DISTANCE",
+        ivf_lists: int = 0,
+        ivf_probes: int = 8,
+        ivf_iterations: int = 10,
+        seed: int = 0,
+    ):
+        """Local stand-in for a Vertex AI Matching Engine index and GCS.
+
+        Attributes:
+            directory: The local directory where the datapoints and documents
+            are stored. Existing datapoints are loaded from it.
+            distance_measure: DOT_PRODUCT_DISTANCE or COSINE_DISTANCE.
+            ivf_lists: The number of IVF clusters. 0 uses exact search.
+            ivf_probes: The number of clusters scanned per query.
+            ivf_iterations: The number of k-means iterations of the IVF build.
+            seed: The random seed of the IVF build, for repeatable benchmarks.
+        """
+        if distance_measure not in DISTANCE_MEASURES:
+            raise ValueError(
+                f"Unsupported distance measure {distance_measure}. "
+                f"Expected one of {DISTANCE_MEASURES}."
+            )
+
+        self.directory = directory
+        self.documents_directory = os.path.join(directory, "documents")
+        self.distance_measure = distance_measure
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        self.ivf_iterations = ivf_iterations
+        self.seed = seed
+
+        os.makedirs(self.documents_directory, exist_ok=True)
+        self._datapoints_path = os.path.join(directory, "datapoints.jsonl")
+
+        self._lock = threading.Lock()
+        self._rows: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._vectors: list[list[float]] = []
+        self._restricts: list[list[dict]] = []
+
+        # Search structures, rebuilt lazily after upserts
+        self._matrix: np.ndarray | None = None
+        self._centroids: np.ndarray | None = None
+        self._lists: list[np.ndarray] = []
+
+        self._load_datapoints()
+
+    def _load_datapoints(self) -> None:
+        """Loads the datapoints persisted by previous upserts."""
+        if not os.path.exists(self._datapoints_path):
+            return
+
+        with open(self._datapoints_path) as datapoints_file:
+            for line in datapoints_file:
+                self._add_datapoint(json.loads(line))
+
+        logger.debug(f"Loaded {len(self._ids)} datapoints from {self.directory}.")
+
+    def _add_datapoint(self, datapoint: dict) -> None:
+        """Adds or replaces a datapoint in memory."""
+        datapoint_id = datapoint["datapoint_id"]
+        row = self._rows.get(datapoint_id)
+        if row is None:
+            row = self._rows[datapoint_id] = len(self._ids)
+            self._ids.append(datapoint_id)
+            self._vectors.append(datapoint["feature_vector"])
+            self._restricts.append(datapoint["restricts"])
+        else:
+            self._vectors[row] = datapoint["feature_vector"]
+            self._restricts[row] = datapoint["restricts"]
+
+    @staticmethod
+    def _normalize_restricts(restricts: list | None) -> list[dict]:
+        """Converts restricts to the findNeighbors response format."""
+
+        def get(restrict: Any, *names: str) -> Any:
+            for name in names:
+                if isinstance(restrict, dict) and name in restrict:
+                    return restrict[name]
+                if hasattr(restrict, name):
+                    return getattr(restrict, name)
+            return []
+
+        normalized = []
+        for restrict in restricts or []:
+            item = {
+                "namespace": get(restrict, "namespace"),
+                "allowList": list(get(restrict, "allowList", "allow_list")),
+            }
+            deny_list = list(get(restrict, "denyList", "deny_list"))
+            if deny_list:
+                item["denyList"] = deny_list
+            normalized.append(item)
+
+        return normalized
+
+    def upsert_datapoints(self, datapoints: list[dict]) -> None:
+        records = [
+            {
+                "datapoint_id": datapoint["datapoint_id"],
+                "feature_vector": [float(x) for x in datapoint["feature_vector"]],
+                "restricts": self._normalize_restricts(datapoint.get("restricts")),
+            }
+            for datapoint in datapoints
+        ]
+
+        with self._lock:
+            with open(self._datapoints_path, "a") as datapoints_file:
+                datapoints_file.writelines(
+                    json.dumps(record) + "\n" for record in records
+                )
+
+            for record in records:
+                self._add_datapoint(record)
+
+            self._matrix = None
+
+    def _get_matrix(self) -> np.ndarray:
+        """Returns the datapoint matrix, building the search structures if needed.
+
+        Must be called with the lock held.
+        """
+        if self._matrix is None:
+            matrix = np.asarray(self._vectors, dtype=np.float32)
+            if self.distance_measure == "COSINE_DISTANCE" and len(matrix):
+                matrix = self._normalize(matrix)
+            self._matrix = matrix
+
+            if self.ivf_lists:
+                self._build_ivf(matrix)
+
+        return self._matrix
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _build_ivf(self, matrix: np.ndarray) -> None:
+        """Clusters the datapoints with spherical k-means into IVF lists."""
+        n_lists = min(self.ivf_lists, len(matrix))
+        if n_lists == 0:
+            self._centroids, self._lists = None, []
+            return
+
+        rng = np.random.default_rng(self.seed)
+        initial_rows = rng.choice(len(matrix), n_lists, replace=False)
+        centroids = matrix[initial_rows]
+
+        for _ in range(self.ivf_iterations):
+            assignments = np.argmax(matrix @ centroids.T, axis=1)
+            for cluster in range(n_lists):
+                members = matrix[assignments == cluster]
+                if len(members):
+                    centroids[cluster] = members.mean(axis=0)
+            centroids = self._normalize(centroids)
+
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._lists = [np.flatnonzero(assignments == c) for c in range(n_lists)]
+
+    def _get_filter_mask(self, filters: list[dict]) -> np.ndarray | None:
+        """Returns which datapoints match all the query restricts, or None.
+
+        Must be called with the lock held.
+        """
+        filters = self._normalize_restricts(filters)
+        if not filters:
+            return None
+
+        mask: np.ndarray = np.ones(len(self._ids), dtype=bool)
+        for row, restricts in enumerate(self._restricts):
+            tokens = {
+                restrict["namespace"]: set(restrict["allowList"])
+                for restrict in restricts
+            }
+            for query_restrict in filters:
+                datapoint_tokens = tokens.get(query_restrict["namespace"])
+                if (
+                    datapoint_tokens is None
+                    or (
+                        query_restrict["allowList"]
+                        and not datapoint_tokens & set(query_restrict["allowList"])
+                    )
+                    or datapoint_tokens & set(query_restrict.get("denyList", []))
+                ):
+                    mask[row] = False
+                    break
+
+        return mask
+
+    def find_neighbors(
+        self, embeddings: list[list[float]], n_matches: int, filters: list[dict]
+    ) -> list[list[dict]]:
+        # Upserts rebuild the search structures instead of modifying them,
+        # so a view taken under the lock can be searched outside of it
+        with self._lock:
+            matrix = self._get_matrix()
+            mask = self._get_filter_mask(filters)
+            ids = self._ids[: len(matrix)]
+            datapoint_restricts = self._restricts[: len(matrix)]
+            centroids, lists = self._centroids, self._lists
+
+        if not len(matrix):
+            return [[] for _ in embeddings]
+
+        queries = np.asarray(embeddings, dtype=np.float32)
+        if self.distance_measure == "COSINE_DISTANCE":
+            queries = self._normalize(queries)
+
+        results: list[list[dict]] = []
+        for query in queries:
+            if centroids is not None:
+                probes = np.argsort(-(centroids @ query))[: self.ivf_probes]
+                candidates = np.concatenate([lists[c] for c in probes])
+            else:
+                candidates = np.arange(len(matrix))
+
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+
+            scores = matrix[candidates] @ query
+            top_k = min(n_matches, len(candidates))
+            if top_k == 0:
+                results.append([])
+                continue
+
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top])]
+
+            results.append(
+                [
+                    {
+                        "datapoint": {
+                            "datapointId": ids[candidates[i]],
+                            "restricts": datapoint_restricts[candidates[i]],
+                        },
+                        "distance": float(scores[i]),
+                    }
+                    for i in top
+                ]
+            )
+
+        return results
+
+    def _get_document_path(self, datapoint_id: str) -> str:
+        return os.path.join(self.documents_directory, datapoint_id)
+
+    def upload_document(self, datapoint_id: str, data: str) -> None:
+        with open(self._get_document_path(datapoint_id), "w") as document_file:
+            document_file.write(data)
+
+    def download_document(self, datapoint_id: str) -> str:
+        try:
+            with open(self._get_document_path(datapoint_id)) as document_file:
+                return document_file.read()
+        except OSError:
+            return ""
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+import datetime
 import json
 import logging
+import threading
 from typing import Any
 import uuid
 
@@ -18,10 +23,313 @@ from langchain.embeddings import TensorflowHubEmbeddings
 from langchain.embeddings.base import Embeddings
 from langchain.vectorstores.base import VectorStore
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger()
 
 
+class DocumentCache:
+    """Thread-safe LRU cache of document bodies bounded by their total size.
+
+    Attributes:
+        max_bytes: The maximum total size of the cached document bodies.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._documents: OrderedDict[str, str | bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | bytes | None:
+        """Returns the cached document body, or None if it is not cached."""
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+            return document
+
+    @staticmethod
+    def _size_of(document: str | bytes) -> int:
+        """Returns the size of a document body in bytes."""
+        return len(document.encode()) if isinstance(document, str) else len(document)
+
+    def put(self, key: str, document: str | bytes) -> None:
+        """Caches a document body, evicting the least recently used ones."""
+        size = self._size_of(document)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._documents:
+                self._size -= self._size_of(self._documents.pop(key))
+            self._documents[key] = document
+            self._size += size
+
+            while self._size > self.max_bytes:
+                _, evicted = self._documents.popitem(last=False)
+                self._size -= self._size_of(evicted)
+
+
+class TokenProvider:
+    """Thread-safe access token provider that refreshes credentials only near expiry.
+
+    Attributes:
+        credentials: The Google Cloud credentials to get the access token from.
+        refresh_margin: How long before the expiry the token is refreshed.
+        session: Optional HTTP session used for the refresh requests.
+    """
+
+    def __init__(
+        self,
+        credentials: Credentials,
+        refresh_margin: datetime.timedelta = datetime.timedelta(minutes=5),
+        session: requests.Session | None = None,
+    ):
+        self.credentials = credentials
+        self.refresh_margin = refresh_margin
+        self._request = google.auth.transport.requests.Request(session=session)
+        self._lock = threading.Lock()
+
+    def _needs_refresh(self) -> bool:
+        """Checks whether the token is missing or about to expire."""
+        if not self.credentials.token:
+            return True
+        if self.credentials.expiry is None:
+            return False
+        # google-auth stores the expiry as a naive UTC datetime
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return now >= self.credentials.expiry - self.refresh_margin
+
+    def get_token(self) -> str:
+        """Returns a valid access token, refreshing the credentials if needed."""
+        with self._lock:
+            if self._needs_refresh():
+                logger.debug("Refreshing access token.")
+                self.credentials.refresh(self._request)
+            return self.credentials.token
+
+
+class MatchingEngineBackend(ABC):
+    """Storage and search backend of the MatchingEngine vector store.
+
+    A backend stores the datapoints (embeddings and restricts) and the
+    document bodies, and answers nearest neighbor queries.
+    """
+
+    @abstractmethod
+    def upsert_datapoints(self, datapoints: list[dict]) -> None:
+        """Inserts or updates datapoints.
+
+        Args:
+            datapoints: Dicts with the `datapoint_id`, `feature_vector` and
+            `restricts` of each datapoint.
+        """
+
+    @abstractmethod
+    def find_neighbors(
+        self, embeddings: list[list[float]], n_matches: int, filters: list[dict]
+    ) -> list[list[dict]]:
+        """Finds the nearest neighbors of each query embedding.
+
+        Args:
+            embeddings: The query embeddings.
+            n_matches: The amount of neighbors to return per query.
+            filters: The restricts that the neighbors must match.
+
+        Returns:
+            The neighbors of each query, in the findNeighbors response format:
+            dicts with a `datapoint` (`datapointId`, `restricts`) and a
+            `distance`, best match first.
+        """
+
+    @abstractmethod
+    def upload_document(self, datapoint_id: str, data: str) -> None:
+        """Stores the document body of a datapoint."""
+
+    @abstractmethod
+    def download_document(self, datapoint_id: str) -> str:
+        """Returns the document body of a datapoint, or "" if not found."""
+
+
+class VertexAIBackend(MatchingEngineBackend):
+    """Backend storing datapoints in a deployed Vertex AI Matching Engine
+    index and document bodies in GCS."""
+
+    def __init__(
+        self,
+        index: MatchingEngineIndex,
+        endpoint: MatchingEngineIndexEndpoint,
+        gcs_client: storage.Client,
+        index_client: aiplatform_v1.IndexServiceClient,
+        gcs_bucket_name: str,
+        credentials: Credentials | None = None,
+        max_connections: int = 10,
+    ):
+        """Backend for a deployed Vertex AI Matching Engine index.
+
+        Attributes:
+            index: The created index class.
+            endpoint: The created endpoint class the index is deployed to.
+            gcs_client: The Google Cloud Storage client.
+            index_client: The Matching Engine Index client.
+            gcs_bucket_name: The bucket where the documents are stored.
+            credentials (Optional): Created Google Cloud credentials.
+            max_connections: The size of the HTTP connection pool.
+        """
+        self.index = index
+        self.endpoint = endpoint
+        self.gcs_client = gcs_client
+        self.index_client = index_client
+        self.gcs_bucket_name = gcs_bucket_name
+        self.credentials = credentials
+        self._bucket: storage.Bucket | None = None
+
+        # Reuse connections and access tokens across queries
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=max_connections))
+        self._token_provider = (
+            TokenProvider(credentials, session=self._session) if credentials else None
+        )
+
+    def upsert_datapoints(self, datapoints: list[dict]) -> None:
+        upsert_request = aiplatform_v1.UpsertDatapointsRequest(
+            index=self.index.name,
+            datapoints=[
+                aiplatform_v1.IndexDatapoint(**datapoint) for datapoint in datapoints
+            ],
+        )
+        self.index_client.upsert_datapoints(request=upsert_request)
+
+    def find_neighbors(
+        self, embeddings: list[list[float]], n_matches: int, filters: list[dict]
+    ) -> list[list[dict]]:
+        deployed_index_id = self._get_index_id()
+        logger.debug(f"Deployed Index ID = {deployed_index_id}")
+
+        # TO-DO: Pending query sdk integration
+        # response = self.endpoint.match(
+        #     deployed_index_id=self._get_index_id(),
+        #     queries=embeddings,
+        #     num_neighbors=n_matches,
+        # )
+
+        response = self.get_matches(embeddings, n_matches, self.endpoint, filters)
+
+        if response.status_code == 200:
+            response = response.json().get("nearestNeighbors", [])
+        else:
+            raise Exception(f"Failed to query index {str(response)}")
+
+        # The queries are sent with their position as datapoint id
+        neighbors_by_query: list[list[dict]] = [[] for _ in embeddings]
+        for i, query_response in enumerate(response):
+            neighbors_by_query[int(query_response.get("id", i))] = query_response.get(
+                "neighbors", []
+            )
+
+        return neighbors_by_query
+
+    def get_matches(
+        self,
+        embeddings: list[list[float]],
+        n_matches: int,
+        index_endpoint: MatchingEngineIndexEndpoint,
+        filters: list[dict],
+    ) -> requests.Response:
+        """
+        get matches from matching engine given a vector query
+        Uses public endpoint
+
+        """
+        request_data = {
+            "deployed_index_id": index_endpoint.deployed_indexes[0].id,
+            "return_full_datapoint": True,
+            "queries": [
+                {
+                    "datapoint": {
+                        "datapoint_id": f"{i}",
+                        "feature_vector": emb,
+                        "restricts": filters,
+                    },
+                    "neighbor_count": n_matches,
+                }
+                for i, emb in enumerate(embeddings)
+            ],
+        }
+
+        endpoint_address = self.endpoint.public_endpoint_domain_name
+        rpc_address = f"https://{endpoint_address}/v1beta1/{index_endpoint.resource_name}:findNeighbors"
+        endpoint_json_data = json.dumps(request_data)
+
+        logger.debug(f"Querying Matching Engine Index Endpoint {rpc_address}")
+
+        header = {}
+        if self._token_provider is not None:
+            header["Authorization"] = "Bearer " + self._token_provider.get_token()
+
+        return self._session.post(rpc_address, data=endpoint_json_data, headers=header)
+
+    def _get_index_id(self) -> str:
+        """Gets the correct index id for the endpoint.
+
+        Returns:
+            The index id if found (which should be found) or throws
+            ValueError otherwise.
+        """
+        for index in self.endpoint.deployed_indexes:
+            if index.index == self.index.name:
+                return index.id
+
+        raise ValueError(
+            f"No index with id {self.index.name} "
+            f"deployed on endpoint "
+            f"{self.endpoint.display_name}."
+        )
+
+    def _get_bucket(self) -> storage.Bucket:
+        """Gets the GCS bucket, fetching its metadata only on first use.
+
+        Returns:
+            The GCS bucket where the documents are stored.
+        """
+        if self._bucket is None:
+            self._bucket = self.gcs_client.get_bucket(self.gcs_bucket_name)
+        return self._bucket
+
+    def upload_document(self, datapoint_id: str, data: str) -> None:
+        self._upload_to_gcs(data, f"documents/{datapoint_id}")
+
+    def download_document(self, datapoint_id: str) -> str:
+        return self._download_from_gcs(f"documents/{datapoint_id}")
+
+    def _upload_to_gcs(self, data: str, gcs_location: str) -> None:
+        """Uploads data to gcs_location.
+
+        Args:
+            data: The data that will be stored.
+            gcs_location: The location where the data will be stored.
+        """
+        blob = self._get_bucket().blob(gcs_location)
+        blob.upload_from_string(data)
+
+    def _download_from_gcs(self, gcs_location: str) -> str:
+        """Downloads from GCS in text format.
+
+        Args:
+            gcs_location: The location where the file is located.
+
+        Returns:
+            The string contents of the file.
+        """
+        bucket = self._get_bucket()
+        try:
+            blob = bucket.blob(gcs_location)
+            return blob.download_as_string()
+        except Exception:
+            return ""
+
+
 class MatchingEngine(VectorStore):
     """Vertex AI Matching Engine implementation of the vector store.
 
@@ -49,6 +357,9 @@ class MatchingEngine(VectorStore):
         index_endpoint_client: aiplatform_v1.IndexEndpointServiceClient,
         gcs_bucket_name: str,
         credentials: Credentials | None = None,
+        document_cache_max_bytes: int = 64 * 1024 * 1024,
+        max_download_workers: int = 10,
+        backend: MatchingEngineBackend | None = None,
     ):
         """Vertex AI Matching Engine implementation of the vector store.
 
@@ -76,6 +387,13 @@ class MatchingEngine(VectorStore):
             multilingual TensorFlow Universal Sentence Encoder will be used.
             gcs_client: The Google Cloud Storage client.
             credentials (Optional): Created Google Cloud credentials.
+            document_cache_max_bytes: The maximum total size of the
+            recently fetched documents kept in memory. 0 disables the cache.
+            max_download_workers: The maximum number of documents
+            downloaded from GCS concurrently.
+            backend (Optional): The backend storing the datapoints and
+            documents. Defaults to a :class:`VertexAIBackend` built from the
+            components above. See ~:func:`MatchingEngine.from_local`.
         """
         super().__init__()
         self._validate_google_libraries_installation()
@@ -91,6 +409,17 @@ class MatchingEngine(VectorStore):
         self.gcs_client = gcs_client
         self.credentials = credentials
         self.gcs_bucket_name = gcs_bucket_name
+        self.backend = backend or VertexAIBackend(
+            index=index,
+            endpoint=endpoint,
+            gcs_client=gcs_client,
+            index_client=index_client,
+            gcs_bucket_name=gcs_bucket_name,
+            credentials=credentials,
+            max_connections=max_download_workers,
+        )
+        self.document_cache = DocumentCache(document_cache_max_bytes)
+        self._download_executor = ThreadPoolExecutor(max_workers=max_download_workers)
 
     def _validate_google_libraries_installation(self) -> None:
         """Validates that Google libraries that are needed are installed."""
@@ -108,105 +437,99 @@ class MatchingEngine(VectorStore):
         self,
         texts: Iterable[str],
         metadatas: Iterable[dict] | None,
+        upsert_batch_size: int = 100,
+        max_upload_workers: int = 16,
         **kwargs: Any,
     ) -> list[str]:
         """Run more texts through the embeddings and add to the vectorstore.
 
+        Texts are processed in batches of `upsert_batch_size`: the document
+        bodies of a batch are uploaded to GCS concurrently and its datapoints
+        are upserted in a single request, while the next batch is embedded.
+
         Args:
             texts: Iterable of strings to add to the vectorstore.
             metadatas: Optional list of metadatas associated with the texts.
+            upsert_batch_size: Number of datapoints sent per upsert request.
+            max_upload_workers: Maximum number of concurrent GCS uploads.
             kwargs: vectorstore specific parameters.
 
         Returns:
             List of ids from adding the texts into the vectorstore.
         """
-        logger.debug("Embedding documents.")
-        embeddings = self.embedding.embed_documents(list(texts))
-        insert_datapoints_payload = []
+        texts = list(texts)
+        metadata_list: list[dict | None] = (
+            list(metadatas) if metadatas else [None] * len(texts)
+        )
         ids = []
 
-        # Streaming index update
-        for idx, (embedding, text, metadata) in enumerate(
-            zip(embeddings, texts, metadatas or [])
+        with (
+            ThreadPoolExecutor(max_workers=1) as embedding_executor,
+            ThreadPoolExecutor(max_workers=max_upload_workers) as upload_executor,
         ):
-            id = uuid.uuid4()
-            ids.append(str(id))
-            self._upload_to_gcs(text, f"documents/{id}")
-
-            insert_datapoints_payload.append(
-                aiplatform_v1.IndexDatapoint(
-                    datapoint_id=str(id),
-                    feature_vector=embedding,
-                    restricts=metadata if metadata else [],
-                )
-            )
-            if idx % 100 == 0:
-                upsert_request = aiplatform_v1.UpsertDatapointsRequest(
-                    index=self.index.name, datapoints=insert_datapoints_payload
-                )
-                self.index_client.upsert_datapoints(request=upsert_request)
-                insert_datapoints_payload = []
-        if len(insert_datapoints_payload) > 0:
-            upsert_request = aiplatform_v1.UpsertDatapointsRequest(
-                index=self.index.name, datapoints=insert_datapoints_payload
+            logger.debug("Embedding documents.")
+            next_embeddings = embedding_executor.submit(
+                self.embedding.embed_documents, texts[:upsert_batch_size]
             )
-            _ = self.index_client.upsert_datapoints(request=upsert_request)
+
+            # Streaming index update
+            for start in range(0, len(texts), upsert_batch_size):
+                end = start + upsert_batch_size
+                embeddings = next_embeddings.result()
+
+                # Embed the next batch while this one is uploaded and upserted
+                if end < len(texts):
+                    next_end = end + upsert_batch_size
+                    next_embeddings = embedding_executor.submit(
+                        self.embedding.embed_documents, texts[end:next_end]
+                    )
+
+                batch_ids = [str(uuid.uuid4()) for _ in texts[start:end]]
+                uploads = [
+                    upload_executor.submit(self.backend.upload_document, id, text)
+                    for id, text in zip(batch_ids, texts[start:end])
+                ]
+
+                # Documents must be stored before their datapoints are searchable
+                for upload in uploads:
+                    upload.result()
+
+                insert_datapoints_payload = [
+                    {
+                        "datapoint_id": id,
+                        "feature_vector": embedding,
+                        "restricts": metadata if metadata else [],
+                    }
+                    for id, embedding, metadata in zip(
+                        batch_ids, embeddings, metadata_list[start:end]
+                    )
+                ]
+                self.backend.upsert_datapoints(insert_datapoints_payload)
+                ids.extend(batch_ids)
 
         logger.debug("Updated index with new configuration.")
         logger.info(f"Indexed {len(ids)} documents to Matching Engine.")
 
         return ids
 
-    def _upload_to_gcs(self, data: str, gcs_location: str) -> None:
-        """Uploads data to gcs_location.
-
-        Args:
-            data: The data that will be stored.
-            gcs_location: The location where the data will be stored.
-        """
-        bucket = self.gcs_client.get_bucket(self.gcs_bucket_name)
-        blob = bucket.blob(gcs_location)
-        blob.upload_from_string(data)
-
     def get_matches(
         self,
-        embeddings: list[str],
+        embeddings: list[list[float]],
         n_matches: int,
         index_endpoint: MatchingEngineIndexEndpoint,
-        filters: dict,
-    ):
+        filters: list[dict],
+    ) -> requests.Response:
         """
         get matches from matching engine given a vector query
-        Uses public endpoint
+        Uses public endpoint, only available with the Vertex AI backend.
 
         """
-        request_data = {
-            "deployed_index_id": index_endpoint.deployed_indexes[0].id,
-            "return_full_datapoint": True,
-            "queries": [
-                {
-                    "datapoint": {
-                        "datapoint_id": f"{i}",
-                        "feature_vector": emb,
-                        "restricts": filters,
-                    },
-                    "neighbor_count": n_matches,
-                }
-                for i, emb in enumerate(embeddings)
-            ],
-        }
-
-        endpoint_address = self.endpoint.public_endpoint_domain_name
-        rpc_address = f"https://{endpoint_address}/v1beta1/{index_endpoint.resource_name}:findNeighbors"
-        endpoint_json_data = json.dumps(request_data)
-
-        logger.debug(f"Querying Matching Engine Index Endpoint {rpc_address}")
-
-        request = google.auth.transport.requests.Request()
-        self.credentials.refresh(request)
-        header = {"Authorization": "Bearer " + self.credentials.token}
-
-        return requests.post(rpc_address, data=endpoint_json_data, headers=header)
+        if not isinstance(self.backend, VertexAIBackend):
+            raise NotImplementedError(
+                "get_matches is only available with the Vertex AI backend, "
+                "use similarity_search instead."
+            )
+        return self.backend.get_matches(embeddings, n_matches, index_endpoint, filters)
 
     def similarity_search(
         self,
@@ -227,91 +550,105 @@ class MatchingEngine(VectorStore):
             A list of k matching documents.
         """
 
-        logger.debug(f"Embedding query {query}.")
-        embedding_query = self.embedding.embed_documents([query])
-        deployed_index_id = self._get_index_id()
-        logger.debug(f"Deployed Index ID = {deployed_index_id}")
+        return self.similarity_search_batch([query], k, search_distance, filters)[0]
 
-        # TO-DO: Pending query sdk integration
-        # response = self.endpoint.match(
-        #     deployed_index_id=self._get_index_id(),
-        #     queries=embedding_query,
-        #     num_neighbors=k,
-        # )
+    def similarity_search_batch(
+        self,
+        queries: list[str],
+        k: int = 4,
+        search_distance: float = 0.65,
+        filters={},
+    ) -> list[list[Document]]:
+        """Return docs most similar to each query with a single findNeighbors request.
 
-        response = self.get_matches(embedding_query, k, self.endpoint, filters)
+        Args:
+            queries: The strings that will be used to search for similar documents.
+            k: The amount of neighbors that will be retrieved per query.
+            search_distance: filter search results by search distance by adding a threshold value
 
-        if response.status_code == 200:
-            response = response.json()["nearestNeighbors"]
-        else:
-            raise Exception(f"Failed to query index {str(response)}")
+        Returns:
+            A list with the k matching documents of each query, in the same order.
+        """
 
-        if len(response) == 0:
-            return []
+        logger.debug(f"Embedding queries {queries}.")
+        embedding_queries = self.embedding.embed_documents(queries)
 
-        logger.debug(f"Found {len(response)} matches for the query {query}.")
+        neighbors_by_query = self.backend.find_neighbors(embedding_queries, k, filters)
 
-        results = []
+        logger.debug(
+            f"Found {sum(map(len, neighbors_by_query))} matches for the queries."
+        )
 
-        # I'm only getting the first one because queries receives an array
-        # and the similarity_search method only receives one query. This
-        # means that the match method will always return an array with only
-        # one element.
-        for doc in response[0]["neighbors"]:
-            page_content = self._download_from_gcs(
-                f"documents/{doc['datapoint']['datapointId']}"
+        # Download the documents of all queries at once
+        page_contents = iter(
+            self._get_documents(
+                [
+                    doc["datapoint"]["datapointId"]
+                    for neighbors in neighbors_by_query
+                    for doc in neighbors
+                ]
             )
-            metadata = {}
-            if "restricts" in doc["datapoint"]:
-                metadata = {
-                    item["namespace"]: item["allowList"][0]
-                    for item in doc["datapoint"]["restricts"]
-                }
-            if "distance" in doc:
-                metadata["score"] = doc["distance"]
-                if doc["distance"] >= search_distance:
-                    results.append(
+        )
+
+        results = []
+        for neighbors in neighbors_by_query:
+            query_results = []
+            for doc, page_content in zip(neighbors, page_contents):
+                metadata = {}
+                if "restricts" in doc["datapoint"]:
+                    metadata = {
+                        item["namespace"]: item["allowList"][0]
+                        for item in doc["datapoint"]["restricts"]
+                    }
+                if "distance" in doc:
+                    metadata["score"] = doc["distance"]
+                    if doc["distance"] >= search_distance:
+                        query_results.append(
+                            Document(page_content=page_content, metadata=metadata)
+                        )
+                else:
+                    query_results.append(
                         Document(page_content=page_content, metadata=metadata)
                     )
-            else:
-                results.append(Document(page_content=page_content, metadata=metadata))
+            results.append(query_results)
 
-        logger.debug("Downloaded documents for query.")
+        logger.debug("Downloaded documents for queries.")
 
         return results
 
-    def _get_index_id(self) -> str:
-        """Gets the correct index id for the endpoint.
-
-        Returns:
-            The index id if found (which should be found) or throws
-            ValueError otherwise.
-        """
-        for index in self.endpoint.deployed_indexes:
-            if index.index == self.index.name:
-                return index.id
-
-        raise ValueError(
-            f"No index with id {self.index.name} "
-            f"deployed on endpoint "
-            f"{self.endpoint.display_name}."
-        )
+    def _get_documents(self, datapoint_ids: list[str]) -> list[str | bytes]:
+        """Gets the documents of the datapoints from the cache or the backend.
 
-    def _download_from_gcs(self, gcs_location: str) -> str:
-        """Downloads from GCS in text format.
+        Documents that are not cached are downloaded concurrently.
 
         Args:
-            gcs_location: The location where the file is located.
+            datapoint_ids: The ids of the datapoints.
 
         Returns:
-            The string contents of the file.
+            The contents of the documents, in the same order.
         """
-        bucket = self.gcs_client.get_bucket(self.gcs_bucket_name)
-        try:
-            blob = bucket.blob(gcs_location)
-            return blob.download_as_string()
-        except Exception:
-            return ""
+        documents: list[str | bytes | None] = [
+            self.document_cache.get(datapoint_id) for datapoint_id in datapoint_ids
+        ]
+        downloads = {
+            i: self._download_executor.submit(
+                self.backend.download_document, datapoint_ids[i]
+            )
+            for i, document in enumerate(documents)
+            if document is None
+        }
+
+        for i, download in downloads.items():
+            document = documents[i] = download.result()
+            # Failed downloads return an empty string and are not cached
+            if document:
+                self.document_cache.put(datapoint_ids[i], document)
+
+        return [document or "" for document in documents]
+
+    def close(self) -> None:
+        """Shuts down the threads downloading the documents."""
+        self._download_executor.shutdown()
 
     @classmethod
     def from_texts(
@@ -407,6 +744,43 @@ class MatchingEngine(VectorStore):
             gcs_bucket_name=gcs_bucket_name,
         )
 
+    @classmethod
+    def from_local(
+        cls: type[MatchingEngine],
+        directory: str,
+        embedding: Embeddings | None = None,
+        **kwargs: Any,
+    ) -> MatchingEngine:
+        """Creates a MatchingEngine backed by a local, offline index.
+
+        Useful for testing and benchmarking retrieval without a deployed
+        index or GCS. See :class:`LocalBackend`.
+
+        Args:
+            directory: The local directory where the datapoints and
+            documents are stored.
+            embedding: The :class:`Embeddings` that will be used for
+            embedding the texts.
+            kwargs: Further arguments of :class:`LocalBackend`.
+
+        Returns:
+            A MatchingEngine using a LocalBackend.
+        """
+        from .local_backend import LocalBackend
+
+        return cls(
+            project_id="",
+            region="",
+            index=None,
+            endpoint=None,
+            embedding=embedding or cls._get_default_embeddings(),
+            gcs_client=None,
+            index_client=None,
+            index_endpoint_client=None,
+            gcs_bucket_name="",
+            backend=LocalBackend(directory, **kwargs),
+        )
+
     @classmethod
     def _validate_gcs_bucket(cls, gcs_bucket_name: str) -> str:
         """Validates the gcs_bucket_name as a bucket name.
@@ -28,7 +28,11 @@ from typing import Any
 from flask import Flask, Request, jsonify, request
 import functions_framework
 from google.api_core.exceptions import GoogleAPICallError
-from vertex_ai_search_client import VertexAISearchClient, VertexAISearchConfig
+from vertex_ai_search_client import (
+    InMemorySearchResultCache,
+    VertexAISearchClient,
+    VertexAISearchConfig,
+)
 
 # Load environment variables
 project_id = os.getenv("PROJECT_ID", "your-project")
@@ -37,6 +41,15 @@ data_store_id = os.getenv("DATA_STORE_ID", "your-data-store")
 engine_data_type = os.getenv("ENGINE_DATA_TYPE", "UNSTRUCTURED")
 engine_chunk_type = os.getenv("ENGINE_CHUNK_TYPE", "CHUNK")
 summary_type = os.getenv("SUMMARY_TYPE", "VERTEX_AI_SEARCH")
+log_payloads = os.getenv("LOG_SEARCH_PAYLOADS", "true").lower() == "true"
+# Optional result cache, disabled when the TTL is 0
+cache_ttl_seconds = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "0"))
+cache_stale_ttl_seconds = float(os.getenv("SEARCH_CACHE_STALE_TTL_SECONDS", "0"))
+cache_max_size = int(os.getenv("SEARCH_CACHE_MAX_SIZE", "256"))
+# Cloud Functions throttle CPU after the response, so refresh within the request
+background_revalidation = (
+    os.getenv("SEARCH_CACHE_BACKGROUND_REVALIDATION", "false").lower() == "true"
+)
 
 # Create VertexAISearchConfig
 config = VertexAISearchConfig(
@@ -48,8 +61,21 @@ config = VertexAISearchConfig(
     summary_type=summary_type,
 )
 
+cache = None
+if cache_ttl_seconds > 0:
+    cache = InMemorySearchResultCache(
+        max_size=cache_max_size,
+        ttl_seconds=cache_ttl_seconds,
+        stale_ttl_seconds=cache_stale_ttl_seconds,
+    )
+
 # Initialize VertexAISearchClient
-vertex_ai_search_client = VertexAISearchClient(config)
+vertex_ai_search_client = VertexAISearchClient(
+    config,
+    cache=cache,
+    log_payloads=log_payloads,
+    background_revalidation=background_revalidation,
+)
 
 
 @functions_framework.http
@@ -23,6 +23,7 @@ ensure that the client correctly handles various scenarios and data structures.
 """
 
 import json
+import threading
 from unittest.mock import MagicMock, patch
 
 from google.cloud import discoveryengine_v1alpha as discoveryengine
@@ -31,7 +32,12 @@ from google.cloud.discoveryengine_v1alpha.services.search_service.pagers import
 )
 from google.cloud.discoveryengine_v1alpha.types import Document, SearchResponse
 import pytest
-from vertex_ai_search_client import VertexAISearchClient, VertexAISearchConfig
+from vertex_ai_search_client import (
+    InMemorySearchResultCache,
+    SearchResultCache,
+    VertexAISearchClient,
+    VertexAISearchConfig,
+)
 
 
 # Test helper functions
@@ -334,5 +340,148 @@ def test_search(
     assert results_json == '{"simplified_results": [{"id": "doc1"}]}'
 
 
+class FakeClock:
+    """A manually advanced clock for cache expiry tests."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Fixture to create a FakeClock instance for testing."""
+    return FakeClock()
+
+
+@pytest.fixture
+def cached_search_client(
+    search_config: VertexAISearchConfig, clock: FakeClock
+) -> VertexAISearchClient:
+    """Fixture to create a VertexAISearchClient with a result cache."""
+    cache = InMemorySearchResultCache(
+        max_size=2, ttl_seconds=10, stale_ttl_seconds=20, clock=clock
+    )
+    with patch(
+        "vertex_ai_search_client.discoveryengine.SearchServiceClient"
+    ) as mock_client:
+        mock_client.return_value.serving_config_path.return_value = (
+            "projects/test-project/locations/us-central1/dataStores/test-data-store/"
+            "servingConfigs/default_config"
+        )
+        client = VertexAISearchClient(search_config, cache=cache, log_payloads=False)
+    client.client.search.return_value = create_mock_search_pager_result()
+    return client
+
+
+def test_search_cache_hit(cached_search_client: VertexAISearchClient) -> None:
+    """Test that repeated searches with a normalized query hit the cache."""
+    first = cached_search_client.search("Test  Query")
+    first["simplified_results"].clear()
+    second = cached_search_client.search("test query ")
+
+    cached_search_client.client.search.assert_called_once()
+    assert len(second["simplified_results"]) == 1
+
+
+def test_search_cache_key_includes_page_size(
+    cached_search_client: VertexAISearchClient,
+) -> None:
+    """Test that searches with different page sizes are cached separately."""
+    cached_search_client.search("test query", page_size=10)
+    cached_search_client.search("test query", page_size=20)
+
+    assert cached_search_client.client.search.call_count == 2
+
+
+def test_search_cache_lru_eviction(cached_search_client: VertexAISearchClient) -> None:
+    """Test that the least recently used search is evicted."""
+    cached_search_client.search("query 1")
+    cached_search_client.search("query 2")
+    cached_search_client.search("query 1")
+    cached_search_client.search("query 3")
+    cached_search_client.search("query 1")
+    assert cached_search_client.client.search.call_count == 3
+
+    cached_search_client.search("query 2")
+    assert cached_search_client.client.search.call_count == 4
+
+
+def test_search_cache_stale_while_revalidate(
+    cached_search_client: VertexAISearchClient, clock: FakeClock
+) -> None:
+    """Test that stale results are served while refreshed, and expire later."""
+    cached_search_client.background_revalidation = True
+    cached_search_client.search("test query")
+
+    clock.now = 15
+    refreshed = threading.Event()
+    original_set = cached_search_client.cache.set
+
+    def set_and_notify(key: str, value: dict) -> None:
+        original_set(key, value)
+        refreshed.set()
+
+    with patch.object(cached_search_client.cache, "set", side_effect=set_and_notify):
+        results = cached_search_client.search("test query")
+        assert "simplified_results" in results
+        assert refreshed.wait(timeout=5)
+    assert cached_search_client.client.search.call_count == 2
+
+    clock.now = 50
+    cached_search_client.search("test query")
+    assert cached_search_client.client.search.call_count == 3
+
+
+def test_search_cache_refresh_within_request(
+    cached_search_client: VertexAISearchClient, clock: FakeClock
+) -> None:
+    """Test that stale results are refreshed before responding when not in background."""
+    cached_search_client.search("test query")
+
+    clock.now = 15
+    with patch("vertex_ai_search_client.threading.Thread") as mock_thread:
+        cached_search_client.search("test query")
+    mock_thread.assert_not_called()
+    assert cached_search_client.client.search.call_count == 2
+
+    clock.now = 20
+    cached_search_client.search("test query")
+    assert cached_search_client.client.search.call_count == 2
+
+
+def test_search_cache_refresh_failure_serves_stale(
+    cached_search_client: VertexAISearchClient, clock: FakeClock
+) -> None:
+    """Test that a failed refresh within the request serves the stale result."""
+    first = cached_search_client.search("test query")
+
+    clock.now = 15
+    cached_search_client.client.search.side_effect = RuntimeError("unavailable")
+    assert cached_search_client.search("test query") == first
+
+
+def test_search_result_cache_is_abstract() -> None:
+    """Test that the cache base class cannot be instantiated."""
+    with pytest.raises(TypeError):
+        SearchResultCache()
+
+
+def test_search_log_payloads(
+    search_client: VertexAISearchClient, capsys: pytest.CaptureFixture
+) -> None:
+    """Test that the full payload prints can be turned off."""
+    search_client.client.search.return_value = create_mock_search_pager_result()
+
+    search_client.search("test query")
+    assert "<response>" in capsys.readouterr().out
+
+    search_client.log_payloads = False
+    search_client.search("test query")
+    assert "<response>" not in capsys.readouterr().out
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -30,11 +30,21 @@ Example usage:
     client = VertexAISearchClient(config)
     results = client.search("your search query")
     print(results)
+
+To cache the simplified results, pass a cache such as
+`InMemorySearchResultCache(max_size=256, ttl_seconds=300)` to the client.
 """
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+import copy
 from dataclasses import dataclass
+import hashlib
 import html
 import json
 import re
+import threading
+import time
 from typing import Any, Literal
 
 from google.api_core.client_options import ClientOptions
@@ -97,6 +107,81 @@ class VertexAISearchConfig:
         }
 
 
+class SearchResultCache(ABC):
+    """
+    Base class for pluggable caches of simplified search results.
+
+    Subclasses decide where entries are stored and when they expire.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> tuple[dict[str, Any], bool] | None:
+        """
+        Get a cached search result.
+
+        Args:
+            key (str): The cache key of the search.
+
+        Returns:
+            tuple | None: The cached result and whether it is stale, or None on
+            a miss. Stale results are served while they are being refreshed.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        """
+        Store a search result.
+
+        Args:
+            key (str): The cache key of the search.
+            value (Dict[str, Any]): The simplified search result.
+        """
+
+
+class InMemorySearchResultCache(SearchResultCache):
+    """
+    An in-process LRU cache of search results with a TTL.
+
+    Entries are fresh for `ttl_seconds`, then served stale while they are
+    revalidated for a further `stale_ttl_seconds`, after which they expire.
+    At most `max_size` entries are kept, evicting the least recently used.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl_seconds: float = 300,
+        stale_ttl_seconds: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[dict[str, Any], bool] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            age = self._clock() - created_at
+            if age >= self.ttl_seconds + self.stale_ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, age >= self.ttl_seconds
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
 class VertexAISearchClient:
     """
     A client for interacting with Google Cloud Vertex AI Search.
@@ -106,14 +191,30 @@ class VertexAISearchClient:
     configurations.
     """
 
-    def __init__(self, config: VertexAISearchConfig):
+    def __init__(
+        self,
+        config: VertexAISearchConfig,
+        cache: SearchResultCache | None = None,
+        log_payloads: bool = True,
+        background_revalidation: bool = False,
+    ):
         """
         Initialize the VertexAISearchClient.
 
         Args:
             config (VertexAISearchConfig): The configuration for the Vertex AI Search client.
+            cache (SearchResultCache | None): Optional cache of the simplified results.
+            log_payloads (bool): Whether to print the full request and response.
+            background_revalidation (bool): Whether stale results are refreshed
+                in a background thread after being served, or within the
+                request. Use False where CPU is throttled between requests.
         """
         self.config = config
+        self.cache = cache
+        self.log_payloads = log_payloads
+        self.background_revalidation = background_revalidation
+        self._revalidating: set[str] = set()
+        self._revalidating_lock = threading.Lock()
         self.client = self._create_client()
         self.serving_config = self._get_serving_config()
 
@@ -155,13 +256,90 @@ class VertexAISearchClient:
         Returns:
             dict: Parsed and simplified search results.
         """
+        cache = self.cache
+        if cache is None:
+            return self._search(query, page_size)
+
+        key = self.get_cache_key(query, page_size)
+        cached = cache.get(key)
+        if cached is not None:
+            result, is_stale = cached
+            if is_stale and not self.background_revalidation:
+                return self._refresh(cache, key, query, page_size, result)
+            if is_stale:
+                self._revalidate(cache, key, query, page_size)
+            return copy.deepcopy(result)
+
+        result = self._search(query, page_size)
+        cache.set(key, copy.deepcopy(result))
+        return result
+
+    def _search(self, query: str, page_size: int) -> dict[str, Any]:
+        """Perform a search query against the API, without the cache."""
         request = self.build_search_request(query, page_size)
-        print(f"<request> {request} </request>")
+        if self.log_payloads:
+            print(f"<request> {request} </request>")
         search_pager = self.client.search(request)
         response = self.map_search_pager_to_dict(search_pager)
-        print(f"<response> {response} </response>")
+        if self.log_payloads:
+            print(f"<response> {response} </response>")
         return self.simplify_search_results(response)
 
+    def get_cache_key(self, query: str, page_size: int) -> str:
+        """
+        Get the cache key of a search, from the normalized query, the client
+        config and the page size.
+
+        Args:
+            query (str): The search query.
+            page_size (int): Number of results to return per page.
+
+        Returns:
+            str: The cache key.
+        """
+        normalized_query = " ".join(query.split()).casefold()
+        key_data = [normalized_query, self.config.to_dict(), page_size]
+        return hashlib.sha256(
+            json.dumps(key_data, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _refresh(
+        self,
+        cache: SearchResultCache,
+        key: str,
+        query: str,
+        page_size: int,
+        stale_result: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Refresh a stale cache entry within the request, serving it on failure."""
+        try:
+            result = self._search(query, page_size)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"Warning: Failed to refresh cached search: {e}")
+            return copy.deepcopy(stale_result)
+        cache.set(key, copy.deepcopy(result))
+        return result
+
+    def _revalidate(
+        self, cache: SearchResultCache, key: str, query: str, page_size: int
+    ) -> None:
+        """Refresh a stale cache entry in the background, once at a time per key."""
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def refresh() -> None:
+            try:
+                cache.set(key, self._search(query, page_size))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Warning: Failed to revalidate cached search: {e}")
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
     def build_search_request(
         self, query: str, page_size: int
     ) -> discoveryengine.SearchRequest:
@@ -0,0 +1,109 @@
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""API Client Registry and Request Coalescing"""
+from collections.abc import Callable
+from concurrent.futures import Future
+import functools
+import hashlib
+import json
+import threading
+from typing import Any, TypeVar
+
+ClientT = TypeVar("ClientT")
+
+_clients: dict[type, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(client_class: type[ClientT]) -> ClientT:
+    """
+    Return the process-wide instance of an API client class.
+    Clients are thread-safe, so every request shares one gRPC channel
+    instead of opening a new channel and re-authenticating.
+    """
+    client = _clients.get(client_class)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(client_class)
+            if client is None:
+                client = _clients[client_class] = client_class()
+    return client
+
+
+def warm_up_clients(*client_classes: type) -> None:
+    """
+    Create the clients at startup, so the first requests
+    do not pay for channel creation and credential loading.
+    """
+    for client_class in client_classes:
+        get_client(client_class)
+
+
+class RequestCoalescer:
+    """
+    Share one upstream call between concurrent identical requests.
+    The first caller for a key runs the call, and callers arriving
+    while it is in flight wait for and receive the same result or exception.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if future is None:
+                future = self._in_flight[key] = Future()
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            future.set_result(func())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
+
+
+def _request_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    def encode(value: Any) -> str:
+        if isinstance(value, bytes):
+            return hashlib.sha256(value).hexdigest()
+        return repr(value)
+
+    payload = json.dumps(
+        [func.__qualname__, args, kwargs], sort_keys=True, default=encode
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def coalesce_requests(func: Callable) -> Callable:
+    """
+    Decorator coalescing concurrent calls with the same arguments.
+    Callers share the returned objects, so they must not mutate them.
+    """
+    coalescer = RequestCoalescer()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = _request_key(func, args, kwargs)
+        return coalescer.run(key, lambda: func(*args, **kwargs))
+
+    return wrapper
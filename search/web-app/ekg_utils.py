@@ -16,12 +16,17 @@
 from collections.abc import Sequence
 import json
 
+from client_utils import coalesce_requests, get_client
 from google.cloud import enterpriseknowledgegraph as ekg
 
 JSON_INDENT = 2
 
+# API clients used by this module, to warm up at startup
+CLIENT_CLASSES = (ekg.EnterpriseKnowledgeGraphServiceClient,)
+
 
 # pylint: disable=too-many-arguments
+@coalesce_requests
 def search_public_kg(
     project_id: str,
     location: str,
@@ -33,7 +38,7 @@ def search_public_kg(
     """
     Make API Request to Public Knowledge Graph.
     """
-    client = ekg.EnterpriseKnowledgeGraphServiceClient()
+    client = get_client(ekg.EnterpriseKnowledgeGraphServiceClient)
 
     # Fully qualified location string, e.g. projects/{project_id}/locations/{location}
     parent = client.common_location_path(project=project_id, location=location)
@@ -19,6 +19,7 @@ import os
 import re
 from urllib.parse import urlparse
 
+from client_utils import warm_up_clients
 from consts import (
     CUSTOM_UI_ENGINE_IDS,
     LOCATION,
@@ -29,8 +30,10 @@ from consts import (
     IMAGE_SEARCH_ENGINE_IDs,
     RECOMMENDATIONS_DATASTORE_IDs,
 )
+import ekg_utils
 from ekg_utils import search_public_kg
 from flask import Flask, render_template, request
+import vais_utils
 from vais_utils import (
     list_documents,
     recommend_personalize,
@@ -42,6 +45,9 @@ from werkzeug.exceptions import HTTPException
 
 app = Flask(__name__)
 
+# Open the API channels once per process, before serving requests
+warm_up_clients(*vais_utils.CLIENT_CLASSES, *ekg_utils.CLIENT_CLASSES)
+
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # Set maximum upload size to 16MB
 
 FORM_OPTIONS = {
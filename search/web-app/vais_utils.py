@@ -15,17 +15,26 @@
 """Vertex AI Search Utilities"""
 from os.path import basename
 
+from client_utils import coalesce_requests, get_client
 from google.cloud import discoveryengine_v1alpha as discoveryengine
 
 JSON_INDENT = 2
 
+# API clients used by this module, to warm up at startup
+CLIENT_CLASSES = (
+    discoveryengine.DocumentServiceClient,
+    discoveryengine.SearchServiceClient,
+    discoveryengine.RecommendationServiceClient,
+)
 
+
+@coalesce_requests
 def list_documents(
     project_id: str,
     location: str,
     datastore_id: str,
 ) -> list[dict[str, str]]:
-    client = discoveryengine.DocumentServiceClient()
+    client = get_client(discoveryengine.DocumentServiceClient)
 
     parent = client.branch_path(
         project=project_id,
@@ -44,6 +53,7 @@ def list_documents(
     ]
 
 
+@coalesce_requests
 def search_enterprise_search(
     project_id: str,
     location: str,
@@ -58,8 +68,8 @@ def search_enterprise_search(
     if bool(search_query) == bool(image_bytes):
         raise ValueError("Cannot provide both search_query and image_bytes")
 
-    # Create a client
-    client = discoveryengine.SearchServiceClient()
+    # Reuse the process-wide client
+    client = get_client(discoveryengine.SearchServiceClient)
 
     serving_config = f"projects/{project_id}/locations/{location}/collections/default_collection/engines/{engine_id}/servingConfigs/default_config"
 
@@ -202,6 +212,7 @@ def get_enterprise_search_results(
     ]
 
 
+@coalesce_requests
 def recommend_personalize(
     project_id: str,
     location: str,
@@ -211,8 +222,8 @@ def recommend_personalize(
     user_pseudo_id: str | None = "xxxxxxxxxxx",
     attribution_token: str | None = None,
 ) -> tuple:
-    # Create a client
-    client = discoveryengine.RecommendationServiceClient()
+    # Reuse the process-wide client
+    client = get_client(discoveryengine.RecommendationServiceClient)
 
     # The full resource name of the search engine serving config
     # e.g. projects/{project_id}/locations/{location}